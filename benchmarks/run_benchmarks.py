@@ -0,0 +1,219 @@
+"""
+Benchmark the data hot paths on a synthetic guild and compare against baselines.
+
+Usage:
+    python benchmarks/run_benchmarks.py                     # small + medium, compare
+    python benchmarks/run_benchmarks.py --scale large       # 1k companies, 100k listings
+    python benchmarks/run_benchmarks.py --update-baseline   # record new baselines
+
+Data and exports go to a temporary directory and git autosave is disabled,
+so the repository is never touched. Exits with status 1 when a case is
+slower than its baseline by more than the threshold.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_FILE = BENCHMARK_DIR / "baselines.json"
+
+# (companies, goods per company)
+SCALES = {
+    "small": (100, 10),
+    "medium": (1000, 10),
+    "large": (1000, 100),
+}
+DEFAULT_SCALES = ["small", "medium"]
+
+# A case fails when it is this much slower than its baseline (0.5 = 50%)
+DEFAULT_THRESHOLD = 0.5
+
+# Cases faster than this are too noisy to fail on
+MIN_COMPARABLE_SECONDS = 0.005
+
+
+def _configure_environment(work_dir: Path) -> None:
+    """Point the app's data and export directories at work_dir, without git."""
+    os.environ["GT_GUILD_DATA_DIR"] = str(work_dir / "data")
+    os.environ["GT_GUILD_EXPORT_DIR"] = str(work_dir / "api_exports")
+    os.environ["GT_GUILD_GIT_AUTOSAVE"] = "0"
+    (work_dir / "data").mkdir(parents=True, exist_ok=True)
+
+
+def time_case(fn: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, float]:
+    """Run fn repeat times (after setup each time) and return min/median seconds."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        # The app's progress prints are not part of what is measured
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def build_cases(n_companies: int, goods_per_company: int, work_dir: Path,
+                seed: int) -> List[Tuple[str, Callable[[], Any], Optional[Callable[[], Any]]]]:
+    """The benchmark cases for one scale as (name, fn, setup)."""
+    from synthetic_guild import generate_companies, generate_price_data, guild_sheet_csv
+    from core.data_manager import (
+        feather_to_companies, companies_to_feather, load_data, save_data, prepare_goods_dataframe
+    )
+    from business.filters import apply_all_filters
+    from business.stats import calculate_unique_goods, calculate_average_discount, get_unique_professions
+    from business.price_calculator import update_live_prices, calculate_all_guildees_prices
+    from integrations.google_sheets import read_sheet_csv, parse_guild_sheet
+    from integrations.json_exporter import export_to_public_json
+    from core.data_manager import load_game_materials
+
+    companies = generate_companies(n_companies, goods_per_company, seed)
+    price_data = generate_price_data(seed)
+    feather_df = companies_to_feather(companies)
+    sheet_csv = guild_sheet_csv(companies)
+    valid_materials = set(load_game_materials())
+    with contextlib.redirect_stdout(io.StringIO()):
+        save_data(companies)
+
+    search_company = companies[0]['name'].split()[0].lower()
+    search_good = companies[0]['goods'][0]['Produced Goods'][:3] if companies[0]['goods'] else ""
+    professions = companies[0]['professions'][:1]
+
+    def price_all():
+        for company in companies:
+            goods_df = prepare_goods_dataframe(company['goods'])
+            goods_df = update_live_prices(goods_df, price_data)
+            calculate_all_guildees_prices(goods_df)
+
+    def import_sheet():
+        return parse_guild_sheet(read_sheet_csv(sheet_csv), valid_materials)
+
+    def stats():
+        calculate_unique_goods(companies)
+        calculate_average_discount(companies)
+        get_unique_professions(companies)
+
+    export_runs = iter(range(10 ** 6))
+    cold_dir = {}
+
+    def fresh_export_dir():
+        cold_dir['path'] = str(work_dir / "exports" / f"cold_{next(export_runs)}")
+
+    warm_dir = str(work_dir / "exports" / "warm")
+    with contextlib.redirect_stdout(io.StringIO()):
+        export_to_public_json(companies, warm_dir)
+
+    return [
+        ("feather_to_companies", lambda: feather_to_companies(feather_df), None),
+        ("companies_to_feather", lambda: companies_to_feather(companies), None),
+        ("load_data", load_data, None),
+        ("save_data", lambda: save_data(companies), None),
+        ("apply_all_filters", lambda: apply_all_filters(companies, professions, search_company, search_good), None),
+        ("stats", stats, None),
+        ("pricing", price_all, None),
+        ("import_sheet", import_sheet, None),
+        ("export_cold", lambda: export_to_public_json(companies, cold_dir['path']), fresh_export_dir),
+        ("export_unchanged", lambda: export_to_public_json(companies, warm_dir), None),
+    ]
+
+
+def run_scale(scale: str, repeat: int, seed: int, work_dir: Path) -> Dict[str, Dict[str, float]]:
+    """Time every case at one scale."""
+    n_companies, goods_per_company = SCALES[scale]
+    print(f"\n{scale}: {n_companies} companies x {goods_per_company} goods "
+          f"({n_companies * goods_per_company} listings)")
+    results = {}
+    for name, fn, setup in build_cases(n_companies, goods_per_company, work_dir / scale, seed):
+        results[name] = time_case(fn, repeat, setup)
+        print(f"  {name:<22} min {results[name]['min'] * 1000:9.2f} ms   "
+              f"median {results[name]['median'] * 1000:9.2f} ms")
+    return results
+
+
+def load_baselines(path: Path = BASELINE_FILE) -> Dict[str, Any]:
+    """Baseline file contents, or an empty baseline set."""
+    if not path.exists():
+        return {"threshold": DEFAULT_THRESHOLD, "thresholds": {}, "results": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, Dict[str, Dict[str, float]]], baselines: Dict[str, Any],
+            threshold: Optional[float] = None) -> List[str]:
+    """
+    Regressions as messages: cases whose min time exceeds baseline * (1 + threshold).
+
+    Per-case thresholds in baselines["thresholds"] override the default.
+    """
+    default = threshold if threshold is not None else baselines.get("threshold", DEFAULT_THRESHOLD)
+    regressions = []
+    for scale, cases in results.items():
+        recorded = baselines.get("results", {}).get(scale, {})
+        for name, timing in cases.items():
+            baseline = recorded.get(name)
+            if baseline is None or baseline < MIN_COMPARABLE_SECONDS:
+                continue
+            limit = baseline * (1 + baselines.get("thresholds", {}).get(name, default))
+            if timing["min"] > limit:
+                regressions.append(f"{scale}/{name}: {timing['min'] * 1000:.2f} ms "
+                                   f"> {limit * 1000:.2f} ms (baseline {baseline * 1000:.2f} ms)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES),
+                        help="scale to run (repeatable; default: small and medium)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default: 5)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic guild seed (default: 0)")
+    parser.add_argument("--threshold", type=float, help="allowed slowdown, overrides the baseline file")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="record these results as the baseline")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="gt_guild_bench_") as tmp:
+        work_dir = Path(tmp)
+        _configure_environment(work_dir)
+        # Imported only now so config picks up the environment above
+        sys.path.insert(0, str(BENCHMARK_DIR))
+        import synthetic_guild  # noqa: F401  (puts gt_guild_app on the path)
+
+        results = {scale: run_scale(scale, args.repeat, args.seed, work_dir)
+                   for scale in args.scale or DEFAULT_SCALES}
+
+    baselines = load_baselines(args.baseline)
+    if args.update_baseline:
+        baselines.setdefault("threshold", DEFAULT_THRESHOLD)
+        baselines.setdefault("thresholds", {})
+        baselines.setdefault("results", {})
+        for scale, cases in results.items():
+            baselines["results"][scale] = {name: round(timing["min"], 6) for name, timing in cases.items()}
+        baselines["environment"] = {"python": platform.python_version(), "machine": platform.machine()}
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Baselines written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.threshold)
+    if regressions:
+        print("\n❌ Regressions:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\n✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
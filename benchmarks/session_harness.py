@@ -0,0 +1,373 @@
+"""
+Measure end-to-end rerun latency of the app with concurrent sessions.
+
+Drives app.py headlessly through Streamlit's AppTest against a synthetic
+guild, with the price API, Google Sheets, GitHub and git stubbed out. Each
+session makes filter changes and company edits; the report gives p50/p95
+rerun latency and peak RSS per scenario. Every scenario runs in its own
+subprocess so the RSS figures do not bleed into each other.
+
+AppTest keeps a process-global runtime, so script runs are serialized; the
+app's own background threads still run alongside. Two latencies are
+reported: service time (the rerun itself) and response time (from the user's
+action until the rerun finishes, including waiting for other sessions),
+which is what a user feels when N sessions share one GIL-bound process.
+
+Usage:
+    python benchmarks/session_harness.py                          # default scenarios
+    python benchmarks/session_harness.py --scenario medium-10     # one scenario
+    python benchmarks/session_harness.py --rounds 20 --json out.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+BENCHMARK_DIR = Path(__file__).parent
+APP_FILE = BENCHMARK_DIR.parent / "gt_guild_app" / "app.py"
+
+# name: (companies, goods per company, concurrent sessions)
+SCENARIOS = {
+    "small-1": (100, 10, 1),
+    "small-5": (100, 10, 5),
+    "medium-1": (1000, 10, 1),
+    "medium-5": (1000, 10, 5),
+    "medium-10": (1000, 10, 10),
+    "large-5": (1000, 100, 5),
+}
+DEFAULT_SCENARIOS = ["small-1", "small-5", "medium-1", "medium-5"]
+
+SHEET_URL = "https://docs.google.com/spreadsheets/d/benchmark-sheet/edit#gid=0"
+
+# Seconds allowed for a single AppTest run
+RUN_TIMEOUT = 300
+
+# AppTest runs cannot overlap (see module docstring)
+_run_lock = threading.Lock()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile of values (fraction in [0, 1])."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class StubEndpoints:
+    """
+    Stand-ins for every network and git call the app makes.
+
+    requests.Session.request is routed here for the price API, the sheet CSV
+    export and the GitHub API; git commands run through subprocess return
+    success without touching the repository. latency seconds are added to
+    each network call to mimic a real round trip.
+    """
+
+    def __init__(self, prices_json: bytes, sheet_csv: bytes, latency: float = 0.0):
+        self.prices_json = prices_json
+        self.sheet_csv = sheet_csv
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def _sha(self) -> str:
+        with self._lock:
+            self._counter += 1
+            return f"{self._counter:040x}"
+
+    def _github(self, method: str, url: str) -> Dict[str, Any]:
+        path = url.split("/repos/", 1)[-1]
+        if method == "GET" and "/git/ref/" in path:
+            return {"object": {"sha": "0" * 40}}
+        if method == "GET" and "/git/commits/" in path:
+            return {"tree": {"sha": "1" * 40}}
+        if method == "GET" and "/git/trees/" in path:
+            return {"tree": []}
+        if method == "GET" and "/contents/" in path:
+            return {"sha": "2" * 40}
+        if method == "PUT" and "/contents/" in path:
+            return {"content": {"sha": self._sha()}}
+        return {"sha": self._sha(), "object": {"sha": self._sha()}}
+
+    def request(self, session, method, url, *args, **kwargs):
+        import requests
+        if self.latency:
+            time.sleep(self.latency)
+        response = requests.Response()
+        response.url = url
+        response.status_code = 200
+        response.encoding = "utf-8"
+        if "mat-prices" in url:
+            self._count("prices")
+            response._content = self.prices_json
+        elif "docs.google.com" in url:
+            self._count("sheets")
+            response._content = self.sheet_csv
+        elif "api.github.com" in url:
+            self._count("github")
+            response.status_code = 201 if method == "POST" else 200
+            response._content = json.dumps(self._github(method.upper(), url)).encode()
+        else:
+            self._count("other")
+            response.status_code = 404
+            response._content = b"{}"
+        return response
+
+    def install(self) -> None:
+        """Patch requests and subprocess for the rest of the process."""
+        import requests
+
+        stub = self
+
+        def request(session, method, url, *args, **kwargs):
+            return stub.request(session, method, url, *args, **kwargs)
+
+        requests.sessions.Session.request = request
+
+        real_run, real_popen = subprocess.run, subprocess.Popen
+
+        def run(args, *rest, **kwargs):
+            if isinstance(args, (list, tuple)) and args and args[0] == "git":
+                self._count("git")
+                return subprocess.CompletedProcess(args, 0, b"" if not kwargs.get("text") else "",
+                                                   b"" if not kwargs.get("text") else "")
+            return real_run(args, *rest, **kwargs)
+
+        class Popen(real_popen):
+            def __init__(popen_self, args, *rest, **kwargs):
+                if isinstance(args, (list, tuple)) and args and args[0] == "git":
+                    self._count("git")
+                    args = [sys.executable, "-c", "pass"]
+                super().__init__(args, *rest, **kwargs)
+
+        subprocess.run = run
+        subprocess.Popen = Popen
+
+
+def _prepare_guild(n_companies: int, goods_per_company: int, work_dir: Path, seed: int,
+                   latency: float) -> StubEndpoints:
+    """Write the synthetic guild to the data dir and build the stubs."""
+    sys.path.insert(0, str(BENCHMARK_DIR))
+    from run_benchmarks import _configure_environment
+    _configure_environment(work_dir)
+    os.environ["GITHUB_TOKEN"] = "benchmark-token"
+
+    from synthetic_guild import generate_companies, generate_price_data, guild_sheet_csv
+    from core.data_manager import save_data
+
+    companies = generate_companies(n_companies, goods_per_company, seed)
+    save_data(companies)
+    prices = generate_price_data(seed)
+    prices_json = json.dumps({"prices": [
+        {"matId": p["id"], "matName": name, "currentPrice": int(p["currentPrice"] * 100),
+         "avgPrice": int(p["avgPrice"] * 100)}
+        for name, p in prices.items()
+    ]}).encode()
+    # The sheet carries the same guild, with a few companies changed
+    sheet = generate_companies(n_companies, goods_per_company, seed)
+    for company in sheet[::max(1, n_companies // 20)]:
+        company['goods'][0]['Guild % Discount'] = 30
+    return StubEndpoints(prices_json, guild_sheet_csv(sheet), latency)
+
+
+def _new_session():
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(str(APP_FILE), default_timeout=RUN_TIMEOUT)
+    at.secrets["GOOGLE_SHEET_URL"] = SHEET_URL
+    return at
+
+
+def _timed_run(at, action=None) -> Tuple[float, float]:
+    """Apply action (if any) and rerun; returns (response, service) seconds."""
+    requested = time.perf_counter()
+    with _run_lock:
+        if action is not None:
+            action()
+        start = time.perf_counter()
+        at.run()
+        end = time.perf_counter()
+        if at.exception:
+            raise RuntimeError(f"App raised: {at.exception[0].value}")
+    return end - requested, end - start
+
+
+def _random_action(at, rng: random.Random) -> str:
+    """Apply one user interaction to the session's widgets; returns its kind."""
+    sidebar_boxes = {box.key: box for box in at.sidebar.selectbox if box.key}
+    tz_boxes = [box for box in at.selectbox if box.key and box.key.startswith("tz_")]
+    kind = rng.choice(["profession", "company", "material", "edit"])
+
+    if kind == "profession" and at.sidebar.multiselect:
+        options = at.sidebar.multiselect[0].options
+        at.sidebar.multiselect[0].set_value(rng.sample(options, rng.randint(0, min(2, len(options)))))
+    elif kind == "company" and "search_company" in sidebar_boxes:
+        box = sidebar_boxes["search_company"]
+        box.set_value(rng.choice(box.options))
+    elif kind == "material" and "search_goods" in sidebar_boxes:
+        box = sidebar_boxes["search_goods"]
+        box.set_value(rng.choice(box.options))
+    elif tz_boxes:
+        # st.data_editor cells cannot be edited through AppTest; the company
+        # editor's timezone takes the same save, export and push path
+        box = rng.choice(tz_boxes)
+        box.set_value(rng.choice(box.options))
+        kind = "edit"
+    else:
+        kind = "rerun"
+    return kind
+
+
+def _session_loop(index: int, rounds: int, seed: int, think: float) -> Dict[str, Any]:
+    """One simulated user: open the app, let startup land, then interact."""
+    rng = random.Random(seed * 1000 + index)
+    with _run_lock:
+        at = _new_session()
+    first, _ = _timed_run(at)
+    # Apply the background startup results (the polling fragment does not
+    # tick under AppTest)
+    deadline = time.monotonic() + RUN_TIMEOUT
+    while True:
+        with _run_lock:
+            done = at.session_state["startup_applied"] == set(at.session_state["startup_tasks"])
+        if done:
+            break
+        if time.monotonic() > deadline:
+            raise RuntimeError("startup tasks did not finish")
+        time.sleep(0.05)
+        _timed_run(at)
+
+    response: Dict[str, List[float]] = {}
+    service: Dict[str, List[float]] = {}
+    for _ in range(rounds):
+        if think:
+            time.sleep(rng.expovariate(1 / think))
+        kinds = []
+        total, own = _timed_run(at, lambda: kinds.append(_random_action(at, rng)))
+        response.setdefault(kinds[0], []).append(total)
+        service.setdefault(kinds[0], []).append(own)
+    return {"first_render": first, "response": response, "service": service}
+
+
+def run_scenario(name: str, rounds: int, seed: int, latency: float, think: float) -> Dict[str, Any]:
+    """Run one scenario in this process and return its measurements."""
+    n_companies, goods_per_company, sessions = SCENARIOS[name]
+    with tempfile.TemporaryDirectory(prefix="gt_guild_sessions_") as tmp:
+        stubs = _prepare_guild(n_companies, goods_per_company, Path(tmp), seed, latency)
+        stubs.install()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            results = list(pool.map(lambda i: _session_loop(i, rounds, seed, think), range(sessions)))
+        wall = time.perf_counter() - start
+
+    def pooled(key: str) -> Dict[str, List[float]]:
+        by_kind: Dict[str, List[float]] = {}
+        for r in results:
+            for kind, values in r[key].items():
+                by_kind.setdefault(kind, []).extend(values)
+        return by_kind
+
+    response, service = pooled("response"), pooled("service")
+    reruns = [t for values in response.values() for t in values]
+    own = [t for values in service.values() for t in values]
+    first = [r["first_render"] for r in results]
+
+    return {
+        "scenario": name,
+        "companies": n_companies,
+        "listings": n_companies * goods_per_company,
+        "sessions": sessions,
+        "rounds": rounds,
+        "first_render_p50": percentile(first, 0.5),
+        "first_render_max": max(first),
+        "rerun_p50": percentile(reruns, 0.5),
+        "rerun_p95": percentile(reruns, 0.95),
+        "rerun_max": max(reruns) if reruns else 0.0,
+        "service_p50": percentile(own, 0.5),
+        "service_p95": percentile(own, 0.95),
+        "by_action": {kind: {"count": len(values), "p50": percentile(values, 0.5),
+                             "p95": percentile(values, 0.95),
+                             "service_p50": percentile(service[kind], 0.5)}
+                      for kind, values in sorted(response.items())},
+        "wall_seconds": wall,
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform != "darwin" else 1024 ** 2),
+        "stub_calls": stubs.calls,
+    }
+
+
+def _run_in_subprocess(name: str, rounds: int, seed: int, latency: float, think: float) -> Dict[str, Any]:
+    """Run a scenario in a fresh interpreter and parse its JSON result."""
+    command = [sys.executable, str(Path(__file__).resolve()), "--child", name, "--rounds", str(rounds),
+               "--seed", str(seed), "--latency", str(latency), "--think", str(think)]
+    result = subprocess.run(command, capture_output=True, text=True)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"Scenario {name} failed:\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def print_report(results: List[Dict[str, Any]]) -> None:
+    """Print a table of the scenario results (response time, service time, RSS)."""
+    print(f"\n{'scenario':<12}{'listings':>9}{'sessions':>9}{'first p50':>11}"
+          f"{'rerun p50':>11}{'rerun p95':>11}{'svc p50':>11}{'peak RSS':>11}")
+    for r in results:
+        print(f"{r['scenario']:<12}{r['listings']:>9}{r['sessions']:>9}"
+              f"{r['first_render_p50'] * 1000:>9.0f}ms{r['rerun_p50'] * 1000:>9.0f}ms"
+              f"{r['rerun_p95'] * 1000:>9.0f}ms{r['service_p50'] * 1000:>9.0f}ms{r['peak_rss_mb']:>9.0f}MB")
+        for kind, stats in r["by_action"].items():
+            print(f"    {kind:<10} n={stats['count']:<4} p50 {stats['p50'] * 1000:7.0f}ms"
+                  f"   p95 {stats['p95'] * 1000:7.0f}ms   svc p50 {stats['service_p50'] * 1000:7.0f}ms")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable)")
+    parser.add_argument("--rounds", type=int, default=10, help="interactions per session (default: 10)")
+    parser.add_argument("--seed", type=int, default=0, help="synthetic guild and action seed")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds added to each stubbed network call (default: 0.05)")
+    parser.add_argument("--think", type=float, default=0.5,
+                        help="mean seconds a user waits between interactions (default: 0.5)")
+    parser.add_argument("--json", type=Path, help="also write the results to this file")
+    parser.add_argument("--child", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_scenario(args.child, args.rounds, args.seed, args.latency, args.think)
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for name in args.scenario or DEFAULT_SCENARIOS:
+        print(f"Running {name}...", flush=True)
+        results.append(_run_in_subprocess(name, args.rounds, args.seed, args.latency, args.think))
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""Seeded synthetic guild data for benchmarks, using real material and planet names."""
+import csv
+import io
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add gt_guild_app directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'gt_guild_app'))
+
+from config import PROFESSIONS, TIMEZONE_OPTIONS
+from core.data_manager import load_game_materials, load_game_planets
+from integrations.google_sheets import SHEET_COLUMNS
+
+
+COMPANY_WORDS = [
+    "Astro", "Nova", "Quasar", "Nebula", "Orbital", "Stellar", "Void", "Comet",
+    "Pulsar", "Zenith", "Ion", "Flux", "Vector", "Helix", "Photon", "Aurora"
+]
+COMPANY_SUFFIXES = ["Industries", "Co", "Works", "Holdings", "Logistics", "Labs", "Foundry", "Farms"]
+
+# Timezones as the sheet stores them (without the city names)
+TIMEZONES = [option.split(" (")[0] for option in TIMEZONE_OPTIONS]
+
+
+def generate_companies(n_companies: int, goods_per_company: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generate companies in the app's nested format (whole-number prices, as
+    the sheet importer produces).
+
+    The same seed always gives the same guild. Goods and planets are drawn
+    from gamedata.json; a company lists each material at most once unless it
+    has more goods than there are materials.
+    """
+    rng = random.Random(seed)
+    materials = load_game_materials()
+    planets = load_game_planets()
+    if not materials or not planets:
+        raise RuntimeError("gamedata.json has no materials or planets")
+
+    companies = []
+    for index in range(n_companies):
+        name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)} {index + 1}"
+        professions = rng.sample(PROFESSIONS, rng.randint(1, 3))
+        if goods_per_company <= len(materials):
+            produced = rng.sample(materials, goods_per_company)
+        else:
+            produced = [rng.choice(materials) for _ in range(goods_per_company)]
+
+        goods = []
+        for material in produced:
+            guild_max = rng.choice([0, 0, rng.randint(50, 5000)])
+            goods.append({
+                'Produced Goods': material,
+                'Planet Produced': rng.choice(planets),
+                'Guildees Pay:': 0,
+                'Live EXC Price': 0,
+                'Live AVG Price': 0,
+                'Guild Max': guild_max,
+                'Guild Min': int(guild_max * rng.uniform(0.3, 0.9)) if guild_max else 0,
+                'Guild % Discount': rng.choice([0, 5, 10, 15, 20, 25]),
+                'Guild Fixed Discount': rng.choice([0, 0, 0, rng.randint(1, 50)])
+            })
+
+        companies.append({
+            'name': name,
+            'industry': ', '.join(professions),
+            'professions': professions,
+            'timezone': rng.choice(TIMEZONES),
+            'local_time': 'N/A',
+            'goods': goods
+        })
+    return companies
+
+
+def generate_price_data(seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """Exchange prices for every material, shaped like fetch_material_prices()."""
+    rng = random.Random(seed)
+    prices = {}
+    for index, material in enumerate(load_game_materials()):
+        current = round(rng.uniform(1, 20000), 2)
+        prices[material] = {
+            "id": index + 1,
+            "currentPrice": current,
+            "avgPrice": round(current * rng.uniform(0.8, 1.2), 2)
+        }
+    return prices
+
+
+def guild_sheet_csv(companies: List[Dict[str, Any]], title_rows: int = 27) -> bytes:
+    """
+    Render companies as the guild sheet's CSV export.
+
+    Title rows come first, then the "Company Name" header row. Each company
+    row carries its first good; the remaining goods follow on rows of their
+    own, as in the real sheet.
+    """
+    ncols = max(SHEET_COLUMNS.values()) + 1
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def write(cells: Dict[str, Any]) -> None:
+        row = [''] * ncols
+        for name, value in cells.items():
+            row[SHEET_COLUMNS[name]] = value
+        writer.writerow(row)
+
+    for row_number in range(title_rows):
+        write({'company': 'Guild Sheet'} if row_number == 0 else {})
+    write({'company': 'Company Name', 'industry': 'Profession', 'timezone': 'Timezone', 'good': 'Produced Goods'})
+
+    for company in companies:
+        for position, good in enumerate(company['goods']):
+            cells = {
+                'good': good['Produced Goods'],
+                'planet': good['Planet Produced'],
+                'guild_max': f"${good['Guild Max']:,}",
+                'guild_min': f"${good['Guild Min']:,}",
+                'guild_discount': f"{good['Guild % Discount']}%",
+                'guild_fixed_discount': f"${good['Guild Fixed Discount']:,}"
+            }
+            if position == 0:
+                cells.update(company=company['name'], industry=company['industry'], timezone=company['timezone'])
+            write(cells)
+    return buffer.getvalue().encode('utf-8')
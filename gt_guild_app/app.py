@@ -9,21 +9,38 @@ import pandas as pd
 warnings.filterwarnings('ignore', category=FutureWarning, module='streamlit.elements.widgets.data_editor')
 
 # Import local modules
-from config import APP_TITLE, APP_ICON, APP_SUBTITLE, CSS_FILE, PROFESSIONS, TIMEZONE_OPTIONS
+from config import APP_TITLE, APP_ICON, APP_SUBTITLE, CSS_FILE, DATA_FILE, EXPORT_DIR, PROFESSIONS, TIMEZONE_OPTIONS, METRICS_FILE, METRICS_PORT, SHIPPING_RATE
 from core.data_manager import (
     load_game_materials, load_game_planets, load_data, save_data, 
     prepare_goods_dataframe, load_contracts, save_contracts,
-    load_company_config, save_company_config
+    load_company_config, save_company_config, load_pricing_rules,
+    load_google_sheets_data, save_google_sheets_data, run_git
 )
+from core.change_set import compute_change_set, apply_change_set, is_empty, summarize_change_set
 from integrations.api_client import fetch_material_prices
-from business.price_calculator import update_live_prices, calculate_all_guildees_prices
+from business.price_calculator import update_live_prices, calculate_all_guildees_prices, configure_pricing_rules
+from business.recipe_graph import load_recipe_graph, production_costs, add_production_cost, PRODUCTION_COST_COLUMN
+from business.bom import raw_material_demand, explode_contracts
+from business.planet_index import load_planet_index, best_planets, nearest_suppliers, delivery_options
+from business.shipping import load_distance_matrix, landed_costs
+from business.sourcing import propose_sourcing, apply_sourcing, SOLVER_GREEDY, SOLVER_LP
 from core.validators import validate_goods
 from business.stats import calculate_unique_goods, calculate_average_discount, get_unique_professions
 from business.filters import apply_all_filters
 from ui.ui_components import render_sidebar_filters, render_stats_row, get_column_config
 from integrations.timezone_utils import update_company_local_times, get_local_time
-from integrations.google_sheets import import_from_google_sheet
+from integrations.google_sheets import (
+    import_from_google_sheets_if_changed, commit_import, parse_sheet_sources, IMPORT_CHANGED, IMPORT_UNCHANGED
+)
+from integrations.push_worker import get_push_worker, PUSH_IDLE
+from integrations.startup import start_startup_tasks, ready_results, pending_tasks, STARTUP_POLL_SECONDS
+from core.profiling import span, trace_rerun, PROFILE_HISTORY
+from core.metrics import start_metrics_export, record_data_size, LISTINGS_WITHOUT_PRICE
+from ui.profiling_panel import profiling_requested, render_profiling_panel
+from ui.memory_panel import memory_report_requested, sample_session_memory, render_memory_panel
+from collections import deque
 from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
 
 # ============================================================================
@@ -42,91 +59,88 @@ def export_json_if_needed():
         from integrations.api_client import fetch_material_prices
         from integrations.json_exporter import export_to_public_json
         
-        price_data, _ = fetch_material_prices()
+        with span("price fetch"):
+            price_data, _ = fetch_material_prices()
         
         if price_data and st.session_state.companies:
             # Update all companies with current prices
             companies_copy = []
-            for company in st.session_state.companies:
-                company_copy = company.copy()
-                goods_df = prepare_goods_dataframe(company["goods"])
-                goods_df = update_live_prices(goods_df, price_data)
-                goods_df = calculate_all_guildees_prices(goods_df)
-                company_copy["goods"] = goods_df.to_dict('records')
-                companies_copy.append(company_copy)
+            with span("repricing"):
+                for company in st.session_state.companies:
+                    company_copy = company.copy()
+                    goods_df = prepare_goods_dataframe(company["goods"])
+                    goods_df = update_live_prices(goods_df, price_data)
+                    goods_df = calculate_all_guildees_prices(goods_df)
+                    company_copy["goods"] = goods_df.to_dict('records')
+                    companies_copy.append(company_copy)
+            # Listings that would be published at a zero exchange price
+            LISTINGS_WITHOUT_PRICE.set(sum(
+                1 for company in companies_copy for good in company["goods"] if not good.get("Live EXC Price")
+            ))
             
-            # Export to public JSON
-            export_to_public_json(companies_copy)
-            print("✅ Exported JSON after data change")
+            # Export to public JSON (files are left alone when the data is unchanged)
+            with span("export"):
+                exported = export_to_public_json(companies_copy, str(EXPORT_DIR))
+            if exported:
+                print("✅ Exported JSON after data change")
+                get_push_worker(push_to_github_now).notify_changed()
     except Exception as e:
         print(f"Error exporting JSON: {e}")
 
 
-def push_to_github_now(force=False):
-    """Push JSON to GitHub if 2 minutes have passed or if forced. Returns (success, message)."""
+def push_to_github_now():
+    """
+    Push the exported JSON to GitHub. Returns (success, message).
+    
+    Runs on the background push worker (see get_push_worker), so it must not
+    touch st.session_state.
+    """
     from pathlib import Path
-    from integrations.github_uploader import push_to_github
-    import subprocess
+    from integrations.github_uploader import push_files_to_github, repo_relative_path
+    from integrations.json_exporter import exported_files, SHARD_DIRS
     
     now = datetime.now(timezone.utc)
     
-    # Check if we should push (2 minutes = 120 seconds)
-    if not force:
-        if 'last_github_push' in st.session_state and st.session_state.last_github_push:
-            time_since_push = (now - st.session_state.last_github_push).total_seconds()
-            if time_since_push < 120:
-                print(f"⏱️ Skipping push, only {int(time_since_push)}s since last push")
-                return False, f"Skipped (last push {int(time_since_push)}s ago)"
-    
     try:
         # Try GitHub API first (works remotely with token in secrets)
         repo_root = Path(__file__).parent.parent
-        all_goods_path = repo_root / "api_exports" / "all_goods.json"
-        all_companies_path = repo_root / "api_exports" / "all_companies.json"
-        
-        # Push both files via GitHub API
-        success_goods = push_to_github(
-            file_path=str(all_goods_path),
-            repo_owner="VincentvanderLinden",
-            repo_name="gt_guild_app",
-            commit_message=f"Auto-update guild data - {now.strftime('%Y-%m-%d %H:%M')}"
-        )
-        
-        success_companies = push_to_github(
-            file_path=str(all_companies_path),
-            repo_owner="VincentvanderLinden",
-            repo_name="gt_guild_app",
-            commit_message=f"Auto-update guild data - {now.strftime('%Y-%m-%d %H:%M')}"
-        )
+        export_paths = exported_files(EXPORT_DIR)
+        export_prefix = repo_relative_path(EXPORT_DIR)
         
-        success = success_goods and success_companies
+        # Push all export files in one commit via the GitHub API; shards that
+        # no longer exist locally are removed remotely
+        with span("github push"):
+            success = bool(export_paths) and push_files_to_github(
+                file_paths=[str(p) for p in export_paths],
+                repo_owner="VincentvanderLinden",
+                repo_name="gt_guild_app",
+                commit_message=f"Auto-update guild data - {now.strftime('%Y-%m-%d %H:%M')}",
+                prune_prefixes=[f"{export_prefix}/{directory}/" for directory in SHARD_DIRS.values()]
+            )
         
         # Fallback to git command (works locally)
         if not success:
             try:
-                # Add both JSON files
-                subprocess.run(
-                    ["git", "add", "api_exports/all_goods.json", "api_exports/all_companies.json"],
+                # Add the export files, including removed shards
+                run_git(
+                    ["add", "-A", str(EXPORT_DIR)],
                     cwd=repo_root,
-                    capture_output=True,
                     timeout=5
                 )
                 
                 # Commit them
-                result = subprocess.run(
-                    ["git", "commit", "-m", f"Auto-update guild data - {now.strftime('%Y-%m-%d %H:%M')}"],
+                result = run_git(
+                    ["commit", "-m", f"Auto-update guild data - {now.strftime('%Y-%m-%d %H:%M')}"],
                     cwd=repo_root,
-                    capture_output=True,
                     timeout=5
                 )
                 
                 # Check if commit succeeded or there was nothing to commit
                 if result.returncode == 0:
                     # New commit created, try to push
-                    push_result = subprocess.run(
-                        ["git", "push"],
+                    push_result = run_git(
+                        ["push"],
                         cwd=repo_root,
-                        capture_output=True,
                         timeout=10
                     )
                     if push_result.returncode == 0:
@@ -138,9 +152,9 @@ def push_to_github_now(force=False):
                         # Try to recover by fetching and retrying
                         if b"rejected" in push_result.stderr or b"fetch first" in push_result.stderr:
                             print("Attempting to fetch and merge...")
-                            subprocess.run(["git", "fetch"], cwd=repo_root, capture_output=True, timeout=10)
-                            subprocess.run(["git", "merge", "origin/main", "--no-edit"], cwd=repo_root, capture_output=True, timeout=10)
-                            retry_push = subprocess.run(["git", "push"], cwd=repo_root, capture_output=True, timeout=10)
+                            run_git(["fetch"], cwd=repo_root, timeout=10)
+                            run_git(["merge", "origin/main", "--no-edit"], cwd=repo_root, timeout=10)
+                            retry_push = run_git(["push"], cwd=repo_root, timeout=10)
                             if retry_push.returncode == 0:
                                 success = True
                                 print("✅ Pushed to GitHub after merge")
@@ -150,10 +164,9 @@ def push_to_github_now(force=False):
                             return False, f"Git push failed: {error_msg[:100]}"
                 elif result.returncode == 1 and b"nothing to commit" in result.stdout:
                     # No changes, but try to push any unpushed commits
-                    push_result = subprocess.run(
-                        ["git", "push"],
+                    push_result = run_git(
+                        ["push"],
                         cwd=repo_root,
-                        capture_output=True,
                         timeout=10
                     )
                     if push_result.returncode == 0:
@@ -172,8 +185,8 @@ def push_to_github_now(force=False):
                 return False, f"Exception: {str(git_error)[:100]}"
         
         if success:
-            st.session_state.last_github_push = now
             return True, "Successfully pushed to GitHub"
+        return False, "Push failed"
     except Exception as e:
         print(f"Error pushing to GitHub: {e}")
         return False, f"Error: {str(e)[:100]}"
@@ -181,18 +194,17 @@ def push_to_github_now(force=False):
 
 def pull_from_github():
     """Pull latest changes from GitHub before loading data."""
-    import subprocess
     from pathlib import Path
     
     try:
         repo_root = Path(__file__).parent.parent
-        result = subprocess.run(
-            ["git", "pull", "--rebase"],
-            cwd=repo_root,
-            capture_output=True,
-            timeout=10,
-            text=True
-        )
+        with span("git pull"):
+            result = run_git(
+                ["pull", "--rebase"],
+                cwd=repo_root,
+                timeout=10,
+                text=True
+            )
         # Silently succeed/fail - app will use whatever data is available
         return result.returncode == 0
     except Exception as e:
@@ -230,18 +242,28 @@ def initialize_session_state():
     if 'planets' not in st.session_state:
         st.session_state.planets = load_game_planets()
     
+    if 'pricing_rules' not in st.session_state:
+        st.session_state.pricing_rules = load_pricing_rules()
+        try:
+            configure_pricing_rules(st.session_state.pricing_rules)
+        except ValueError as e:
+            print(f"Invalid pricing rules, using defaults: {e}")
+            configure_pricing_rules(None)
+    
     if 'last_sheet_refresh' not in st.session_state:
         st.session_state.last_sheet_refresh = None
     
-    if 'last_github_push' not in st.session_state:
-        st.session_state.last_github_push = None
+    if 'sheet_refresh_status' not in st.session_state:
+        st.session_state.sheet_refresh_status = None
     
-    if 'sheet_url' not in st.session_state:
-        # Read Google Sheet URL from secrets
+    if 'sheet_urls' not in st.session_state:
+        # Read Google Sheet sources from secrets (GOOGLE_SHEET_URLS takes a list
+        # of sheets/tabs, GOOGLE_SHEET_URL a single one)
         try:
-            st.session_state.sheet_url = st.secrets.get("GOOGLE_SHEET_URL", "")
+            sources = st.secrets.get("GOOGLE_SHEET_URLS") or st.secrets.get("GOOGLE_SHEET_URL", "")
         except:
-            st.session_state.sheet_url = ""
+            sources = ""
+        st.session_state.sheet_urls = parse_sheet_sources(sources)
     
     if 'data_version' not in st.session_state:
         st.session_state.data_version = None
@@ -285,45 +307,11 @@ def refresh_from_google_sheets():
        (now - st.session_state.last_sheet_refresh) > timedelta(minutes=10):
         
         try:
-            # Import from Google Sheets
-            companies = import_from_google_sheet(st.session_state.sheet_url)
-            
-            if companies:
-                # Update local times
-                companies = update_company_local_times(companies)
-                
-                # Save to main data file
-                save_data(companies)
-                
-                # Update session state
-                st.session_state.companies = companies
-                st.session_state.last_sheet_refresh = now
-                st.session_state.data_version = get_data_version(companies)
-                
-                # Export to JSON whenever we refresh from Google Sheets
-                try:
-                    # Get current price data
-                    from integrations.api_client import fetch_material_prices
-                    from integrations.json_exporter import export_to_public_json
-                    price_data, _ = fetch_material_prices()
-                    
-                    if price_data:
-                        # Update all companies with current prices
-                        companies_copy = []
-                        for company in companies:
-                            company_copy = company.copy()
-                            goods_df = prepare_goods_dataframe(company["goods"])
-                            goods_df = update_live_prices(goods_df, price_data)
-                            goods_df = calculate_all_guildees_prices(goods_df)
-                            company_copy["goods"] = goods_df.to_dict('records')
-                            companies_copy.append(company_copy)
-                        
-                        # Export to public JSON (push will happen via auto-push every 2 mins)
-                        export_to_public_json(companies_copy)
-                except Exception as e:
-                    print(f"Error exporting JSON: {e}")
-                
-                return True
+            # Import all configured sheets/tabs concurrently (parsing is skipped
+            # for sources whose content is unchanged)
+            with span("sheet import"):
+                companies, status = import_from_google_sheets_if_changed(st.session_state.sheet_urls)
+            return apply_sheet_import(companies, status)
         except Exception as e:
             print(f"Error refreshing from Google Sheets: {e}")
             return False
@@ -331,6 +319,126 @@ def refresh_from_google_sheets():
     return False
 
 
+def apply_sheet_import(companies, status):
+    """Apply the result of a Google Sheets import to the session. Returns True if data changed."""
+    now = datetime.now(timezone.utc)
+    
+    if status == IMPORT_UNCHANGED:
+        st.session_state.last_sheet_refresh = now
+        st.session_state.sheet_refresh_status = "no change"
+        return False
+    
+    if status == IMPORT_CHANGED and companies:
+        # Diff against the previous import so in-session edits the sheet
+        # did not touch survive; fall back to the session data on first run
+        base = load_google_sheets_data()
+        if base is None:
+            base = st.session_state.companies or []
+        # The feather snapshot drops companies without goods; don't re-add them every import
+        changes = compute_change_set(base, companies, skip_empty_added=True)
+        save_google_sheets_data(companies)
+        
+        st.session_state.last_sheet_refresh = now
+        st.session_state.last_sheet_changes = changes
+        
+        if is_empty(changes):
+            commit_import(st.session_state.sheet_urls)
+            st.session_state.sheet_refresh_status = "no change"
+            return False
+        
+        # Apply only the delta to the session data
+        if st.session_state.companies is None:
+            st.session_state.companies = []
+        apply_change_set(st.session_state.companies, changes)
+        update_company_local_times(st.session_state.companies)
+        
+        # Save to main data file
+        save_data(st.session_state.companies)
+        
+        # Only now is the import done; until here a failure re-imports on the next poll
+        commit_import(st.session_state.sheet_urls)
+        
+        st.session_state.sheet_refresh_status = f"updated {summarize_change_set(changes)}"
+        st.session_state.data_version = get_data_version(st.session_state.companies)
+        
+        # Export to JSON whenever we refresh from Google Sheets
+        # (the push worker picks up the change)
+        export_json_if_needed()
+        
+        return True
+    
+    return False
+
+
+def _file_signature(path):
+    """(mtime, size) of a file, or None if it does not exist."""
+    try:
+        stat = Path(path).stat()
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def pull_data_from_github():
+    """Pull from GitHub. Returns True if the local guild data file changed."""
+    before = _file_signature(DATA_FILE)
+    pull_from_github()
+    return _file_signature(DATA_FILE) != before
+
+
+def _timed_sheet_import(sheet_urls):
+    with span("sheet import"):
+        return import_from_google_sheets_if_changed(sheet_urls)
+
+
+def start_background_startup():
+    """Start the git pull, sheet import and price fetch concurrently (once per session)."""
+    if 'startup_tasks' in st.session_state:
+        return
+    sheet_urls = st.session_state.sheet_urls
+    st.session_state.startup_tasks = start_startup_tasks({
+        "pull": pull_data_from_github,
+        "sheets": lambda: _timed_sheet_import(sheet_urls),
+        "prices": fetch_material_prices
+    })
+    st.session_state.startup_applied = set()
+
+
+def apply_startup_results():
+    """Apply finished startup tasks to the session. Returns True if anything was applied."""
+    results = ready_results(st.session_state.startup_tasks, st.session_state.startup_applied)
+    for name, result in results:
+        st.session_state.startup_applied.add(name)
+        if name == "pull" and result:
+            # Newer data came in with the pull; reload the local snapshot
+            st.session_state.companies = update_company_local_times(load_data())
+            st.session_state.data_version = get_data_version(st.session_state.companies)
+        elif name == "sheets":
+            if result is None:
+                st.session_state.last_sheet_refresh = None
+            else:
+                apply_sheet_import(*result)
+        # Prices need no handling: the fetch filled fetch_material_prices' cache
+    return bool(results)
+
+
+def startup_pending():
+    """Names of startup tasks whose results have not been applied yet."""
+    if 'startup_tasks' not in st.session_state:
+        return []
+    return pending_tasks(st.session_state.startup_tasks, st.session_state.startup_applied)
+
+
+@st.fragment(run_every=STARTUP_POLL_SECONDS)
+def render_startup_progress():
+    """Poll the startup tasks and rerun the app as each result lands."""
+    if apply_startup_results():
+        st.rerun(scope="app")
+    pending = startup_pending()
+    if pending:
+        st.caption(f"⏳ Syncing in the background: {', '.join(pending)}")
+
+
 def render_company_editor(company, idx, materials, price_data, all_professions_list, search_goods=""):
     """Render the editor interface for a single company."""
     # Format professions display
@@ -407,11 +515,16 @@ def render_company_editor(company, idx, materials, price_data, all_professions_l
         if search_goods:
             goods_df = goods_df[goods_df['Produced Goods'].str.contains(search_goods, case=False, na=False)]
         
-        # Update live prices
-        goods_df = update_live_prices(goods_df, price_data)
+        with span("repricing"):
+            # Update live prices
+            goods_df = update_live_prices(goods_df, price_data)
+            
+            # Calculate Guildees Pay
+            goods_df = calculate_all_guildees_prices(goods_df)
         
-        # Calculate Guildees Pay
-        goods_df = calculate_all_guildees_prices(goods_df)
+        # Input-cost rollup of each good at live prices (shared across companies)
+        with span("production cost"):
+            goods_df = add_production_cost(goods_df, production_costs(price_data))
         
         # Reset index to ensure it's a range index for data editor
         goods_df = goods_df.reset_index(drop=True)
@@ -427,7 +540,7 @@ def render_company_editor(company, idx, materials, price_data, all_professions_l
             height=table_height,
             num_rows="dynamic",
             key=f"table_{company['name']}_{idx}",
-            disabled=["Guildees Pay:", "Live EXC Price", "Live AVG Price"],
+            disabled=["Guildees Pay:", "Live EXC Price", PRODUCTION_COST_COLUMN, "Live AVG Price"],
             column_config=get_column_config(materials, st.session_state.planets)
         )
         
@@ -449,14 +562,18 @@ def render_companies_fragment(filtered_companies, materials, price_data, profess
         # Check if data was modified by another user
         if st.session_state.data_version and latest_version != st.session_state.data_version:
             st.warning("⚠️ Data was updated by another user or process. Showing latest version.")
-            st.session_state.companies = latest_companies
+            # Apply only what changed so untouched companies keep their state
+            changes = compute_change_set(st.session_state.companies or [], latest_companies)
+            if st.session_state.companies is None:
+                st.session_state.companies = []
+            apply_change_set(st.session_state.companies, changes)
             st.session_state.data_version = latest_version
             
             # Update filtered companies with latest data
             from business.filters import apply_all_filters
             # Re-apply filters to get fresh filtered list - read from widget session state
             filtered_companies = apply_all_filters(
-                latest_companies,
+                st.session_state.companies,
                 st.session_state.get('professions_filter', []),
                 st.session_state.get('search_company', ''),
                 st.session_state.get('search_goods', '')
@@ -464,11 +581,15 @@ def render_companies_fragment(filtered_companies, materials, price_data, profess
     
     # Render company editors
     for idx, company in enumerate(filtered_companies):
-        render_company_editor(company, idx, materials, price_data, professions_list, search_goods)
+        with span("render_company_editor"):
+            render_company_editor(company, idx, materials, price_data, professions_list, search_goods)
 
 
 def handle_goods_changes(company, edited_goods, price_data):
     """Handle changes to company goods data."""
+    # Production cost is derived from live prices, not stored
+    edited_goods = edited_goods.drop(columns=[PRODUCTION_COST_COLUMN], errors='ignore')
+    
     # Filter out rows with empty "Produced Goods"
     edited_goods = edited_goods[
         edited_goods['Produced Goods'].notna() & 
@@ -519,15 +640,19 @@ def handle_goods_changes(company, edited_goods, price_data):
 
 def main():
     """Main application logic."""
-    # Pull latest data from GitHub first (once per session)
-    if 'github_pull_done' not in st.session_state:
-        pull_from_github()
-        st.session_state.github_pull_done = True
-    
     # Setup
     initialize_page()
     initialize_session_state()
     
+    # Operational metrics (textfile and/or /metrics, when configured)
+    start_metrics_export(METRICS_FILE, METRICS_PORT)
+    
+    # Pull from GitHub, import the sheets and fetch prices in the background;
+    # the page renders from the local snapshot meanwhile
+    start_background_startup()
+    apply_startup_results()
+    pending = startup_pending()
+    
     # Load data and CSS first
     all_companies = st.session_state.companies
     materials = st.session_state.materials
@@ -540,43 +665,25 @@ def main():
     # Filter out removed companies
     companies = [company for company in all_companies if company['name'] not in removed_companies]
     
-    # Show loading spinner for initial app load
-    if 'initial_refresh_done' not in st.session_state:
-        st.session_state.initial_refresh_done = False
-    
-    if 'initial_push_done' not in st.session_state:
-        st.session_state.initial_push_done = False
-    
-    # Show loading indicator during initial setup
-    if not st.session_state.initial_refresh_done:
-        with st.spinner("⏳ Loading guild data and market prices..."):
-            # Force Google Sheets refresh on startup
-            st.session_state.last_sheet_refresh = None
-            refresh_from_google_sheets()
-            
-            # Fetch live prices
-            price_data, last_update = fetch_material_prices()
-            
-            st.session_state.initial_refresh_done = True
-            st.rerun()  # Rerun to show the actual content
-    
-    # Refresh from Google Sheets if needed (background refresh, not on initial load)
-    refresh_from_google_sheets()
+    # Refresh from Google Sheets if needed (the startup import covers the first one)
+    if "sheets" not in pending:
+        refresh_from_google_sheets()
     
     # Update local times (in case time has changed)
     if st.session_state.companies:
         st.session_state.companies = update_company_local_times(st.session_state.companies)
+    record_data_size(st.session_state.companies or [])
     
-    # Push to GitHub on app startup (once per session)
-    if not st.session_state.initial_push_done:
-        result = push_to_github_now(force=True)
-        # Result might be bool or tuple, handle both
-        if not isinstance(result, bool):
-            success, _ = result
-        st.session_state.initial_push_done = True
+    # One push worker per process: pushes once on startup, then whenever the
+    # exports change (debounced and rate limited across all sessions)
+    push_worker = get_push_worker(push_to_github_now)
     
-    # Fetch live prices (cached for 10 minutes)
-    price_data, last_update = fetch_material_prices()
+    # Fetch live prices (cached for 10 minutes; empty until the startup fetch lands)
+    if "prices" in pending:
+        price_data, last_update = {}, None
+    else:
+        with span("price fetch"):
+            price_data, last_update = fetch_material_prices()
     
     # Collect all professions from companies
     all_professions = set(PROFESSIONS)  # Start with the base list
@@ -614,29 +721,33 @@ def main():
     company_list = [company['name'] for company in all_companies]
     
     # Render sidebar and get filter values
+    push_status = push_worker.status()
     selected_professions, search_company, search_goods, push_button = render_sidebar_filters(
         professions_list, price_data, last_update, materials, material_counts, company_list, company_goods_counts,
-        st.session_state.last_sheet_refresh, st.session_state.last_github_push
+        st.session_state.last_sheet_refresh, push_status["last_push"],
+        st.session_state.sheet_refresh_status,
+        push_status["state"] if push_status["state"] != PUSH_IDLE else None
     )
     
-    # Handle manual push button
+    # Keep checking for startup results until all have landed
+    if pending:
+        with st.sidebar:
+            render_startup_progress()
+    
+    # Timing breakdown of recent reruns (opt-in with ?profile=1)
+    if profiling_requested():
+        render_profiling_panel(list(st.session_state.get('profile_traces', [])))
+    
+    # Session state size (sampled every few minutes; report with ?memory=1)
+    memory_report = memory_report_requested()
+    sample_session_memory(force=memory_report)
+    if memory_report:
+        render_memory_panel()
+    
+    # Handle manual push button (the worker pushes in the background)
     if push_button:
-        with st.spinner("Pushing to GitHub..."):
-            success, message = push_to_github_now(force=True)
-            if success:
-                st.success(f"✅ {message}")
-                st.info("Note: GitHub raw CDN may take 1-2 minutes to update")
-            else:
-                st.error(f"❌ {message}")
-    
-    # Auto-push every 2 minutes
-    result = push_to_github_now(force=False)
-    # Result might be bool (old code) or tuple (new code), handle both
-    if not isinstance(result, bool):
-        success, _ = result
-        # If auto-push succeeded, refresh to update sidebar times
-        if success:
-            st.rerun()
+        push_worker.request_push()
+        st.info("🚀 Push queued. Note: GitHub raw CDN may take 1-2 minutes to update")
     
     # Create tabs
     tab0, tab1, tab2, tab3 = st.tabs(["🏠 Welcome", "📋 Guild Offers", "🔄 Contract Manager", "⚙️ Configuration"])
@@ -690,17 +801,19 @@ def render_welcome_tab():
 def render_guild_offers_tab(companies, selected_professions, search_company, search_goods, materials, price_data, professions_list):
     """Render the main guild offers tab."""
     # Apply filters
-    filtered_companies = apply_all_filters(
-        companies, selected_professions, search_company, search_goods
-    )
-    
-    # Sort companies alphabetically by name
-    filtered_companies = sorted(filtered_companies, key=lambda c: c['name'])
+    with span("filters"):
+        filtered_companies = apply_all_filters(
+            companies, selected_professions, search_company, search_goods
+        )
+        
+        # Sort companies alphabetically by name
+        filtered_companies = sorted(filtered_companies, key=lambda c: c['name'])
     
     # Calculate and display statistics
-    total_unique_goods = calculate_unique_goods(filtered_companies)
-    avg_discount = calculate_average_discount(filtered_companies)
-    all_professions_used = get_unique_professions(filtered_companies)
+    with span("stats"):
+        total_unique_goods = calculate_unique_goods(filtered_companies)
+        avg_discount = calculate_average_discount(filtered_companies)
+        all_professions_used = get_unique_professions(filtered_companies)
     
     render_stats_row(
         len(filtered_companies),
@@ -762,6 +875,30 @@ def render_recurring_contracts_tab(price_data, all_companies):
     # Get materials and planets for dropdowns
     materials = st.session_state.materials if 'materials' in st.session_state else []
     planets = st.session_state.planets if 'planets' in st.session_state else []
+    planet_index = load_planet_index()
+    
+    # Guild listings at guild prices, for landed costs at delivery locations and the
+    # sourcing plan (only built once some company has a contract)
+    delivery_locations = {
+        line.get('Delivery Location') for goods in st.session_state.player_companies.values()
+        for contract in goods.values() for line in contract.get('lines', [])
+        if isinstance(line.get('Delivery Location'), str) and line['Delivery Location'].strip()
+    }
+    listings, listings_by_good, distance_matrix = pd.DataFrame(), {}, None
+    if any(st.session_state.player_companies.values()):
+        with span("landed cost"):
+            listings = guild_listings(all_companies, price_data)
+            if not listings.empty:
+                listings_by_good = dict(tuple(listings.groupby('Produced Goods', sort=False)))
+                if delivery_locations and planet_index is not None:
+                    distance_matrix = load_distance_matrix(
+                        delivery_locations | set(listings['Planet Produced'].dropna()))
+    
+    # Upstream raw materials all contracts need, recomputed as contracts change
+    render_raw_material_demand(st.session_state.player_companies, planet_index)
+    
+    # Cheapest guild offers for every contract's remaining need
+    render_sourcing_plan(st.session_state.player_companies, listings, distance_matrix)
     
     # Sort companies: by number of contracts (highest first), then alphabetically for zero contracts
     def get_sort_key(company_name):
@@ -890,6 +1027,11 @@ def render_recurring_contracts_tab(price_data, all_companies):
                         # Column configuration for contract lines
                         # Convert to list for selectbox options
                         company_options = sorted(list(available_company_names))
+                        delivery_location = next(
+                            (location for location in lines_df.get('Delivery Location', pd.Series(dtype=object)).dropna()
+                             if str(location).strip()),
+                            None
+                        )
                         
                         lines_column_config = {
                             'Company': st.column_config.SelectboxColumn(
@@ -899,7 +1041,7 @@ def render_recurring_contracts_tab(price_data, all_companies):
                             ),
                             'Delivery Location': st.column_config.SelectboxColumn(
                                 'Delivery Location',
-                                options=planets,
+                                options=delivery_options(planet_index, planets, near=delivery_location),
                                 required=False
                             ),
                             'Fulfilled Amount': st.column_config.NumberColumn(
@@ -923,6 +1065,10 @@ def render_recurring_contracts_tab(price_data, all_companies):
                             column_config=lines_column_config
                         )
                         
+                        if delivery_location and planet_index is not None:
+                            render_nearest_suppliers(planet_index, distance_matrix, good_name, delivery_location,
+                                                     listings_by_good.get(good_name))
+                        
                         # Handle changes
                         if not lines_df.equals(edited_lines):
                             # Filter out empty rows
@@ -1003,6 +1149,136 @@ def render_recurring_contracts_tab(price_data, all_companies):
                 st.rerun()
 
 
+def render_raw_material_demand(contracts, planet_index=None):
+    """Render the guild-wide raw material demand implied by all contracts, with where each is mined best."""
+    with st.expander("📦 Raw Material Demand", expanded=False):
+        st.caption("Each contracted good broken down through its recipes into the mined and gathered "
+                   "materials it takes per day (first catalog recipe for every intermediate).")
+        col_remaining, col_breakdown = st.columns(2)
+        with col_remaining:
+            remaining_only = st.toggle("Unfulfilled only", key="bom_remaining_only",
+                                       help="Only the part of each daily amount not yet covered by contract lines")
+        with col_breakdown:
+            by_contract = st.toggle("Per contract", key="bom_by_contract")
+        
+        with span("bom explosion"):
+            if by_contract:
+                demand = explode_contracts(contracts, remaining_only=remaining_only)
+            else:
+                demand = raw_material_demand(contracts, remaining_only=remaining_only)
+        
+        if demand.empty:
+            st.info("No contract demand yet.")
+            return
+        if planet_index is not None:
+            richest = {material: best_planets(planet_index, material, limit=1)
+                       for material in demand["Material"].unique()}
+            demand["Richest Planet"] = demand["Material"].map(
+                lambda material: f"{richest[material][0][0]} ({richest[material][0][1]})" if richest[material] else None
+            )
+        st.dataframe(
+            demand,
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "Daily Units": st.column_config.NumberColumn("Daily Units", format="%.1f"),
+                "Weight": st.column_config.NumberColumn("Weight / day", format="%.0f"),
+            }
+        )
+
+
+def render_sourcing_plan(contracts, listings, distance_matrix):
+    """Render the proposed supplier for every contract's remaining need."""
+    with st.expander("🧭 Sourcing Plan", expanded=False):
+        st.caption("Cheapest guild offers (Guildees Pay plus estimated shipping to the delivery location) "
+                   "for what each contract still needs.")
+        exact = st.toggle("Exact solver (LP)", key="sourcing_lp",
+                          help="Solve with linear programming when scipy is installed; otherwise the greedy solver is used")
+        
+        with span("sourcing"):
+            plan = propose_sourcing(contracts, listings, distance_matrix, load_recipe_graph(),
+                                    solver=SOLVER_LP if exact else SOLVER_GREEDY)
+        
+        if plan.lines.empty and plan.unsourced.empty:
+            st.info("Every contract is fulfilled.")
+            return
+        if exact and plan.solver != SOLVER_LP:
+            st.caption("⚠️ scipy is not installed, showing the greedy plan.")
+        
+        if not plan.lines.empty:
+            st.metric("Daily Cost", f"${plan.total_cost:,.0f}")
+            st.dataframe(
+                plan.lines,
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    "Fulfilled Amount": st.column_config.NumberColumn("Amount", format="%d"),
+                    "Guildees Pay:": st.column_config.NumberColumn("Guildees Pay", format="$%d"),
+                    "Shipping": st.column_config.NumberColumn("Shipping", format="$%.0f"),
+                    "Landed Cost": st.column_config.NumberColumn("Landed Cost", format="$%.0f"),
+                    "Total Cost": st.column_config.NumberColumn("Total Cost", format="$%.0f"),
+                }
+            )
+            if st.button("➕ Add proposed lines to contracts", key="apply_sourcing"):
+                apply_sourcing(contracts, plan.lines)
+                save_contracts(contracts)
+                st.rerun()
+        
+        if not plan.unsourced.empty:
+            st.caption("No guild offer for:")
+            st.dataframe(plan.unsourced, hide_index=True, width="stretch")
+
+
+def guild_listings(all_companies, price_data):
+    """All guild listings with their company and current Guildees Pay."""
+    listings = pd.DataFrame([
+        {**good, 'Company': company['name']}
+        for company in all_companies for good in company.get('goods', []) if good.get('Produced Goods')
+    ])
+    if listings.empty:
+        return listings
+    listings = update_live_prices(listings, price_data)
+    return calculate_all_guildees_prices(listings)
+
+
+def render_nearest_suppliers(planet_index, distance_matrix, good_name, location, listings):
+    """Render guild offers by landed cost and the closest mining planets for a delivery location."""
+    with span("nearest suppliers"):
+        offers = None
+        if listings is not None and distance_matrix is not None:
+            graph = load_recipe_graph()
+            position = graph.index.get(good_name) if graph is not None else None
+            weight = float(graph.weights[position]) if position is not None else 0.0
+            offers = landed_costs(listings, distance_matrix, location, weight).head(5)
+        planets = nearest_suppliers(planet_index, good_name, location)
+    if (offers is None or offers.empty) and not planets:
+        return
+    
+    st.caption(f"📍 Closest to {location} (shipping estimated at ${SHIPPING_RATE:g} per weight unit per LY)")
+    col_offers, col_planets = st.columns(2)
+    with col_offers:
+        if offers is not None and not offers.empty:
+            st.dataframe(
+                offers,
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    "Guildees Pay:": st.column_config.NumberColumn("Guildees Pay", format="$%d"),
+                    "Distance (LY)": st.column_config.NumberColumn("Distance (LY)", format="%.1f"),
+                    "Shipping": st.column_config.NumberColumn("Shipping", format="$%.0f"),
+                    "Landed Cost": st.column_config.NumberColumn("Landed Cost", format="$%.0f"),
+                }
+            )
+    with col_planets:
+        if planets:
+            st.dataframe(
+                pd.DataFrame(planets, columns=["Planet", "Distance (LY)", "Abundance"]),
+                hide_index=True,
+                width="stretch",
+                column_config={"Distance (LY)": st.column_config.NumberColumn("Distance (LY)", format="%.1f")}
+            )
+
+
 def render_configuration_tab(all_companies):
     """Render the configuration tab for managing companies."""
     col_header, col_help = st.columns([6, 1])
@@ -1096,5 +1372,18 @@ def render_configuration_tab(all_companies):
             st.rerun()
 
 
+def run_traced(entry_point):
+    """Run one rerun with timing spans; keep the last traces for the profiling panel."""
+    profiling = profiling_requested()
+    with trace_rerun(profile=profiling and st.session_state.get('profile_capture', False)) as trace:
+        try:
+            entry_point()
+        finally:
+            if profiling:
+                if 'profile_traces' not in st.session_state:
+                    st.session_state.profile_traces = deque(maxlen=PROFILE_HISTORY)
+                st.session_state.profile_traces.append(trace)
+
+
 if __name__ == "__main__":
-    main()
+    run_traced(main)
@@ -0,0 +1,167 @@
+"""Bill-of-materials explosion of contract demand through the recipe graph.
+
+Each made material is assigned one recipe, which gives an input-coefficient
+matrix A (units of input i per unit of output j). The total requirements for
+a final demand d are x = (I - A)^-1 d, so the inverse is computed once per
+recipe choice and every contract is exploded with one matrix multiply.
+"""
+import hashlib
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from business.recipe_graph import RecipeGraph, load_recipe_graph
+
+
+class BomMatrix(NamedTuple):
+    """Input coefficients and total requirements for one recipe choice."""
+    graph: RecipeGraph
+    recipe_rows: np.ndarray     # (M,) recipe row making each material, -1 if bought/extracted
+    coefficients: np.ndarray    # (M, M) A[i, j]: units of i per unit of j
+    requirements: np.ndarray    # (M, M) (I - A)^-1: units of i in one finished unit of j
+    raw: np.ndarray             # (M,) bool: materials not made from other materials
+
+
+def primary_recipes(graph: RecipeGraph) -> np.ndarray:
+    """The first catalog recipe with inputs for each material, -1 for raw materials."""
+    rows = np.full(len(graph.material_names), -1, dtype="int64")
+    for row in np.flatnonzero(graph.has_inputs)[::-1]:
+        rows[graph.output_index[row]] = row
+    return rows
+
+
+def compile_bom(graph: RecipeGraph, recipe_rows: Optional[np.ndarray] = None) -> BomMatrix:
+    """
+    Build the coefficient matrix for the chosen recipes and invert (I - A).
+
+    recipe_rows defaults to primary_recipes(graph); make_or_buy's best
+    recipes can be passed to explode along the cheapest routes instead.
+    Raises ValueError when the chosen recipes form a cycle that consumes
+    more of a material than it makes (I - A singular).
+    """
+    n = len(graph.material_names)
+    rows = primary_recipes(graph) if recipe_rows is None else np.asarray(recipe_rows, dtype="int64")
+    made = np.flatnonzero(rows >= 0)
+
+    coefficients = np.zeros((n + 1, n), dtype="float64")  # extra row absorbs input padding
+    recipe = rows[made]
+    per_unit = graph.input_amount[recipe] / graph.output_amount[recipe][:, None]
+    np.add.at(coefficients, (graph.input_index[recipe], np.repeat(made[:, None], per_unit.shape[1], axis=1)),
+              per_unit)
+    coefficients = coefficients[:n]
+
+    try:
+        requirements = np.linalg.inv(np.eye(n) - coefficients)
+    except np.linalg.LinAlgError:
+        raise ValueError("Recipe choice is not productive: a cycle consumes more than it makes")
+    if (requirements < -1e-9).any():
+        raise ValueError("Recipe choice is not productive: a cycle consumes more than it makes")
+
+    return BomMatrix(graph=graph, recipe_rows=rows, coefficients=coefficients,
+                     requirements=np.clip(requirements, 0, None), raw=rows < 0)
+
+
+@lru_cache(maxsize=4)
+def _cached_bom(graph_key: str, rows_key: bytes) -> BomMatrix:
+    graph = load_recipe_graph()
+    rows = np.frombuffer(rows_key, dtype="int64") if rows_key else None
+    return compile_bom(graph, rows)
+
+
+def _graph_key(graph: RecipeGraph) -> str:
+    digest = hashlib.sha256()
+    for array in (graph.material_ids, graph.recipe_ids, graph.output_index, graph.output_amount,
+                  graph.input_index, graph.input_amount):
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def load_bom(recipe_rows: Optional[np.ndarray] = None) -> Optional[BomMatrix]:
+    """The catalog's BOM matrix, cached by recipe data and recipe choice."""
+    graph = load_recipe_graph()
+    if graph is None:
+        return None
+    rows_key = np.asarray(recipe_rows, dtype="int64").tobytes() if recipe_rows is not None else b""
+    return _cached_bom(_graph_key(graph), rows_key)
+
+
+def demand_matrix(contracts: Dict[str, Dict[str, Any]], graph: RecipeGraph,
+                  remaining_only: bool = False) -> Tuple[List[Tuple[str, str]], np.ndarray]:
+    """
+    Final demand per contract as columns of an (M, C) matrix.
+
+    Contracts are {company: {good: {daily_amount, lines}}}; with
+    remaining_only the fulfilled amounts of the contract lines are
+    subtracted. Goods missing from the catalog are skipped.
+    """
+    index = graph.index
+    labels: List[Tuple[str, str]] = []
+    entries: List[Tuple[int, float]] = []
+    for company, goods in contracts.items():
+        for good, contract in (goods or {}).items():
+            position = index.get(good)
+            if position is None:
+                continue
+            amount = float(contract.get("daily_amount", 0) or 0)
+            if remaining_only:
+                fulfilled = sum(float(line.get("Fulfilled Amount", 0) or 0) for line in contract.get("lines", []))
+                amount = max(0.0, amount - fulfilled)
+            labels.append((company, good))
+            entries.append((position, amount))
+
+    demand = np.zeros((len(graph.material_names), len(labels)), dtype="float64")
+    for column, (position, amount) in enumerate(entries):
+        demand[position, column] = amount
+    return labels, demand
+
+
+def explode_contracts(contracts: Dict[str, Dict[str, Any]], bom: Optional[BomMatrix] = None,
+                      remaining_only: bool = False) -> pd.DataFrame:
+    """
+    Raw-material demand per day implied by every contract, one row per
+    (company, good, raw material) with a positive amount.
+
+    All contracts are exploded together: requirements @ demand.
+    """
+    columns = ["Company", "Good", "Material", "Daily Units"]
+    bom = bom or load_bom()
+    if bom is None or not contracts:
+        return pd.DataFrame(columns=columns)
+
+    labels, demand = demand_matrix(contracts, bom.graph, remaining_only)
+    if not labels:
+        return pd.DataFrame(columns=columns)
+    totals = bom.requirements @ demand                 # (M, C)
+    raw_totals = np.where(bom.raw[:, None], totals, 0.0)
+    material, contract = np.nonzero(raw_totals > 1e-9)
+    names = np.array(bom.graph.material_names, dtype=object)
+    return pd.DataFrame({
+        "Company": [labels[c][0] for c in contract],
+        "Good": [labels[c][1] for c in contract],
+        "Material": names[material],
+        "Daily Units": raw_totals[material, contract],
+    }, columns=columns)
+
+
+def raw_material_demand(contracts: Dict[str, Dict[str, Any]], bom: Optional[BomMatrix] = None,
+                        remaining_only: bool = False) -> pd.DataFrame:
+    """
+    Guild-wide raw-material demand per day over all contracts, largest first.
+
+    Columns: Material, Daily Units, Weight (total weight per day) and
+    Contracts (how many contracts need it).
+    """
+    exploded = explode_contracts(contracts, bom, remaining_only)
+    columns = ["Material", "Daily Units", "Weight", "Contracts"]
+    if exploded.empty:
+        return pd.DataFrame(columns=columns)
+    bom = bom or load_bom()
+    weights = dict(zip(bom.graph.material_names, bom.graph.weights))
+    summary = exploded.groupby("Material", sort=False).agg(
+        **{"Daily Units": ("Daily Units", "sum"), "Contracts": ("Good", "size")}
+    ).reset_index()
+    summary["Weight"] = summary["Daily Units"] * summary["Material"].map(weights).fillna(0)
+    return summary[columns].sort_values("Daily Units", ascending=False, ignore_index=True)
@@ -0,0 +1,222 @@
+"""Spatial index over the game's planets and their resource abundances.
+
+Planets are bucketed into a uniform grid (one cell per galaxy hex width), with
+each cell's planets stored contiguously, so a nearest-planet query only looks
+at the cells around a point. Planets that yield each raw material are kept
+ranked by abundance for "where is this mined best / closest" lookups.
+"""
+import json
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import GAMEDATA_FILE
+
+
+# Galaxy pixels per light year and grid cell size when gamedata has no galaxyConfig
+DEFAULT_PX_TO_LY = 45
+DEFAULT_CELL_SIZE = 150
+
+# Planets listed ahead of the rest in delivery location choices
+NEARBY_OPTIONS = 20
+
+
+class PlanetIndex(NamedTuple):
+    """Planet coordinates bucketed by grid cell, plus per-material planet rankings."""
+    names: Tuple[str, ...]          # (P,)
+    systems: Tuple[str, ...]        # (P,) system name of each planet
+    x: np.ndarray                   # (P,) galaxy pixels
+    y: np.ndarray                   # (P,)
+    tier: np.ndarray                # (P,)
+    px_to_ly: float
+    cell_size: float
+    columns: int                    # grid width in cells
+    rows: int
+    cell_order: np.ndarray          # (P,) planet positions sorted by cell
+    cell_start: np.ndarray          # (rows * columns + 1,) start of each cell in cell_order
+    material_planets: Dict[str, Tuple[np.ndarray, np.ndarray]]  # name -> (positions, abundance), best first
+    material_abundance: Dict[str, np.ndarray]                   # name -> (P,) abundance, -1 where not mined
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return _name_index(self.names)
+
+
+@lru_cache(maxsize=4)
+def _name_index(names: Tuple[str, ...]) -> Dict[str, int]:
+    return {name: position for position, name in enumerate(names)}
+
+
+def compile_planet_index(systems: List[Dict[str, Any]], materials: List[Dict[str, Any]],
+                         galaxy: Optional[Dict[str, Any]] = None) -> PlanetIndex:
+    """
+    Build a PlanetIndex from gamedata systems, materials and galaxyConfig.
+
+    Systems without planets are skipped; abundances of materials missing
+    from the catalog are ignored.
+    """
+    galaxy = galaxy or {}
+    cell_size = float(galaxy.get("hexSize") or DEFAULT_CELL_SIZE)
+    material_names = {m["id"]: m["name"] for m in materials}
+
+    names, system_names, xs, ys, tiers = [], [], [], [], []
+    yields: Dict[str, List[Tuple[int, int]]] = {}
+    for system in systems:
+        for planet in system.get("planets") or []:
+            position = len(names)
+            names.append(planet["name"])
+            system_names.append(system.get("name", ""))
+            xs.append(planet.get("x", system.get("x", 0)))
+            ys.append(planet.get("y", system.get("y", 0)))
+            tiers.append(planet.get("tier", 0))
+            for deposit in planet.get("mats") or []:
+                name = material_names.get(deposit["id"])
+                if name is not None:
+                    yields.setdefault(name, []).append((position, deposit.get("ab", 0)))
+
+    x = np.array(xs, dtype="float64")
+    y = np.array(ys, dtype="float64")
+    columns = int(x.max() // cell_size) + 1 if len(x) else 1
+    rows = int(y.max() // cell_size) + 1 if len(y) else 1
+    cells = (y // cell_size).astype("int64") * columns + (x // cell_size).astype("int64")
+    cell_order = np.argsort(cells, kind="stable")
+    cell_start = np.searchsorted(cells[cell_order], np.arange(rows * columns + 1))
+
+    material_planets, material_abundance = {}, {}
+    for name, deposits in yields.items():
+        positions = np.array([position for position, _ in deposits], dtype="int64")
+        abundance = np.array([ab for _, ab in deposits], dtype="int64")
+        ranked = np.lexsort((positions, -abundance))
+        material_planets[name] = (positions[ranked], abundance[ranked])
+        material_abundance[name] = np.full(len(names), -1, dtype="int64")
+        material_abundance[name][positions] = abundance
+
+    return PlanetIndex(
+        names=tuple(names), systems=tuple(system_names), x=x, y=y,
+        tier=np.array(tiers, dtype="int64"),
+        px_to_ly=float(galaxy.get("pxToLY") or DEFAULT_PX_TO_LY),
+        cell_size=cell_size, columns=columns, rows=rows,
+        cell_order=cell_order, cell_start=cell_start,
+        material_planets=material_planets, material_abundance=material_abundance,
+    )
+
+
+@lru_cache(maxsize=2)
+def _load_index(path: str, mtime_ns: int) -> PlanetIndex:
+    with open(path) as f:
+        gamedata = json.load(f)
+    return compile_planet_index(gamedata.get("systems", []), gamedata.get("materials", []),
+                                gamedata.get("galaxyConfig"))
+
+
+def load_planet_index(path: Path = GAMEDATA_FILE) -> Optional[PlanetIndex]:
+    """The catalog's planet index, rebuilt only when gamedata.json changes."""
+    try:
+        return _load_index(str(path), Path(path).stat().st_mtime_ns)
+    except Exception as e:
+        print(f"⚠️ Could not load planets: {e}")
+        return None
+
+
+def _ring(index: PlanetIndex, column: int, row: int, radius: int) -> List[np.ndarray]:
+    """Planet positions in the cells exactly radius cells away from (column, row)."""
+    found = []
+    first, last = max(column - radius, 0), min(column + radius, index.columns - 1)
+    for r in range(max(row - radius, 0), min(row + radius, index.rows - 1) + 1):
+        base = r * index.columns
+        if abs(r - row) == radius:
+            # Top and bottom rows of the ring are one contiguous run of cells
+            spans = [(first, last)]
+        else:
+            spans = [(c, c) for c in (column - radius, column + radius) if 0 <= c < index.columns]
+        for start, end in spans:
+            if start <= end:
+                found.append(index.cell_order[index.cell_start[base + start]:index.cell_start[base + end + 1]])
+    return found
+
+
+def _nearest(index: PlanetIndex, x: float, y: float, limit: int, exclude: Optional[int] = None,
+             abundance: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions and pixel distances of the limit planets closest to (x, y),
+    closest first. With abundance (per planet), only planets where it is
+    at least 0 count and equally distant ones go most abundant first.
+    """
+    column = min(max(int(x // index.cell_size), 0), index.columns - 1)
+    row = min(max(int(y // index.cell_size), 0), index.rows - 1)
+    candidates: List[np.ndarray] = []
+    count = 0
+    for radius in range(max(index.columns, index.rows)):
+        for cells in _ring(index, column, row, radius):
+            if exclude is not None:
+                cells = cells[cells != exclude]
+            if abundance is not None:
+                cells = cells[abundance[cells] >= 0]
+            candidates.append(cells)
+            count += len(cells)
+        # Cells beyond this ring are at least radius cells away
+        if count >= limit > 0:
+            positions = np.concatenate(candidates)
+            distances = np.hypot(index.x[positions] - x, index.y[positions] - y)
+            if np.partition(distances, limit - 1)[limit - 1] <= radius * index.cell_size:
+                break
+    positions = np.concatenate(candidates) if candidates else np.empty(0, dtype="int64")
+    distances = np.hypot(index.x[positions] - x, index.y[positions] - y)
+    ties = -abundance[positions] if abundance is not None else positions
+    order = np.lexsort((positions, ties, distances))[:max(limit, 0)]
+    return positions[order], distances[order]
+
+
+def nearest_planets(index: PlanetIndex, location: str, limit: int = 5) -> List[Tuple[str, float]]:
+    """The limit planets closest to a planet, as (name, light years), closest first."""
+    position = index.index.get(location)
+    if position is None:
+        return []
+    positions, distances = _nearest(index, index.x[position], index.y[position], limit, exclude=position)
+    return [(index.names[p], float(d) / index.px_to_ly) for p, d in zip(positions, distances)]
+
+
+def best_planets(index: PlanetIndex, material: str, limit: int = 10) -> List[Tuple[str, int]]:
+    """Planets yielding a raw material, as (name, abundance), most abundant first."""
+    positions, abundance = index.material_planets.get(material, (np.empty(0, dtype="int64"),) * 2)
+    return [(index.names[p], int(a)) for p, a in zip(positions[:limit], abundance[:limit])]
+
+
+def nearest_suppliers(index: PlanetIndex, material: str, location: str,
+                      limit: int = 5) -> List[Tuple[str, float, int]]:
+    """
+    Planets yielding a raw material closest to a delivery location, as
+    (name, light years, abundance); equally distant planets are ordered by
+    abundance.
+    """
+    target = index.index.get(location)
+    abundance = index.material_abundance.get(material)
+    if target is None or abundance is None:
+        return []
+    positions, distances = _nearest(index, index.x[target], index.y[target], limit, abundance=abundance)
+    return [(index.names[p], float(d) / index.px_to_ly, int(abundance[p]))
+            for p, d in zip(positions, distances)]
+
+
+def delivery_options(index: Optional[PlanetIndex], planets: Sequence[str],
+                     near: Optional[str] = None, nearby: int = NEARBY_OPTIONS) -> List[str]:
+    """
+    Delivery location choices grouped by system in planet order ("Vega 2"
+    before "Vega 10"). When near is a known planet, it and the nearby
+    planets closest to it come first.
+    """
+    def planet_order(name: str) -> Tuple[str, int, str]:
+        system, _, number = name.rpartition(" ")
+        return (system, int(number), name) if number.isdigit() else (name, 0, name)
+
+    ordered = sorted(planets, key=planet_order)
+    if index is None or near not in index.index:
+        return ordered
+
+    choices = set(planets)
+    closest = [name for name in [near] + [name for name, _ in nearest_planets(index, near, nearby)]
+               if name in choices]
+    first = set(closest)
+    return closest + [name for name in ordered if name not in first]
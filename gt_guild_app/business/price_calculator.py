@@ -1,78 +1,248 @@
-"""Price calculation and rounding logic."""
-import math
+"""Price calculation and rounding logic.
+
+Pricing rules are plain data (see ``assets/data/pricing_rules.json``): a table of
+rounding tiers plus the precedence of discounts and bounds. They are compiled
+once into NumPy lookup arrays so whole goods columns can be priced at once.
+"""
+import json
+import numpy as np
 import pandas as pd
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, NamedTuple, Optional
+
+
+# Rounding tables: each tier applies to prices strictly below ``below``;
+# the last tier (``below`` = None) catches everything above.
+ROUNDING_PRESETS = {
+    # Rounds up to the next step - the long-standing Guildees Pay behaviour
+    "guildees_pay": {
+        "mode": "ceil",
+        "tiers": [
+            {"below": 50, "step": 0.5},
+            {"below": 100, "step": 1},
+            {"below": 1000, "step": 10},
+            {"below": 5000, "step": 50},
+            {"below": 10000, "step": 100},
+            {"below": 50000, "step": 500},
+            {"below": None, "step": 1000},
+        ],
+    },
+    # The 7-tier smart rounding table from the README, rounding to nearest
+    "smart": {
+        "mode": "nearest",
+        "tiers": [
+            {"below": 100, "step": 0.5},
+            {"below": 500, "step": 1},
+            {"below": 1000, "step": 5},
+            {"below": 5000, "step": 10},
+            {"below": 10000, "step": 50},
+            {"below": 50000, "step": 100},
+            {"below": None, "step": 500},
+        ],
+    },
+}
+
+DEFAULT_PRICING_RULES = {
+    "rounding": "guildees_pay",
+    # First discount that is set (> 0) wins; the last entry is the fallback
+    "discount_precedence": ["fixed", "percent"],
+    # Discount kinds whose result is passed through the rounding table
+    "rounded_discounts": ["percent"],
+    # Bound checked first wins when both would apply
+    "bounds_precedence": ["min", "max"],
+}
+
+DISCOUNT_COLUMNS = {
+    "fixed": "Guild Fixed Discount",
+    "percent": "Guild % Discount",
+}
+
+BOUND_COLUMNS = {
+    "min": "Guild Min",
+    "max": "Guild Max",
+}
+
+ROUNDING_MODES = ("ceil", "floor", "nearest")
+
+
+class CompiledPricingRules(NamedTuple):
+    """Pricing rules compiled into arrays for vectorized lookups."""
+    boundaries: np.ndarray
+    steps: np.ndarray
+    mode: str
+    discount_precedence: tuple
+    rounded_discounts: frozenset
+    bounds_precedence: tuple
+
+
+def _compile_rounding(rounding: Any):
+    """Resolve a preset name or inline table into (boundaries, steps, mode)."""
+    if isinstance(rounding, str):
+        if rounding not in ROUNDING_PRESETS:
+            raise ValueError(f"Unknown rounding preset: {rounding}")
+        rounding = ROUNDING_PRESETS[rounding]
+
+    mode = rounding.get("mode", "ceil")
+    if mode not in ROUNDING_MODES:
+        raise ValueError(f"Unknown rounding mode: {mode}")
+
+    tiers = rounding.get("tiers", [])
+    if not tiers or tiers[-1].get("below") is not None:
+        raise ValueError("Rounding tiers must end with an open-ended tier (below: null)")
+
+    boundaries = [float(tier["below"]) for tier in tiers[:-1]]
+    if any(upper <= lower for lower, upper in zip(boundaries, boundaries[1:])):
+        raise ValueError("Rounding tier boundaries must be strictly increasing")
+    steps = [float(tier["step"]) for tier in tiers]
+    if any(step <= 0 for step in steps):
+        raise ValueError("Rounding steps must be positive")
+
+    return np.array(boundaries, dtype='float64'), np.array(steps, dtype='float64'), mode
+
+
+@lru_cache(maxsize=16)
+def _compile_cached(rules_json: str) -> CompiledPricingRules:
+    rules = {**DEFAULT_PRICING_RULES, **json.loads(rules_json)}
+    boundaries, steps, mode = _compile_rounding(rules["rounding"])
+
+    discount_precedence = tuple(rules["discount_precedence"])
+    bounds_precedence = tuple(rules["bounds_precedence"])
+    unknown = [k for k in discount_precedence if k not in DISCOUNT_COLUMNS]
+    unknown += [k for k in bounds_precedence if k not in BOUND_COLUMNS]
+    if unknown or not discount_precedence:
+        raise ValueError(f"Invalid pricing precedence: {unknown or 'empty discount list'}")
+
+    return CompiledPricingRules(
+        boundaries=boundaries,
+        steps=steps,
+        mode=mode,
+        discount_precedence=discount_precedence,
+        rounded_discounts=frozenset(rules["rounded_discounts"]),
+        bounds_precedence=bounds_precedence,
+    )
+
+
+def compile_pricing_rules(rules: Optional[Dict[str, Any]] = None) -> CompiledPricingRules:
+    """
+    Compile a pricing rules dict into vectorized lookup tables.
+    Missing keys fall back to DEFAULT_PRICING_RULES; identical rules are compiled once.
+    """
+    return _compile_cached(json.dumps(rules or {}, sort_keys=True))
+
+
+_active_rules = compile_pricing_rules()
 
 
-def calculate_guildees_pay(live_price: float, discount_percent: float) -> float:
+def configure_pricing_rules(rules: Optional[Dict[str, Any]]) -> CompiledPricingRules:
+    """Set the guild's pricing rules used when no explicit rules are passed."""
+    global _active_rules
+    _active_rules = compile_pricing_rules(rules)
+    return _active_rules
+
+
+def get_pricing_rules() -> CompiledPricingRules:
+    """Return the currently active compiled pricing rules."""
+    return _active_rules
+
+
+def round_prices(prices: np.ndarray, rules: Optional[CompiledPricingRules] = None) -> np.ndarray:
+    """Apply the tiered rounding table to an array of prices."""
+    rules = rules or _active_rules
+    prices = np.asarray(prices, dtype='float64')
+    steps = rules.steps[np.searchsorted(rules.boundaries, prices, side='right')]
+
+    if rules.mode == "ceil":
+        return np.ceil(prices / steps) * steps
+    if rules.mode == "floor":
+        return np.floor(prices / steps) * steps
+    return np.floor(prices / steps + 0.5) * steps
+
+
+def smart_round_price(price: float, rules: Optional[CompiledPricingRules] = None) -> float:
+    """Round a single price with the README's 7-tier smart table (or the given rules)."""
+    rules = rules or compile_pricing_rules({"rounding": "smart"})
+    return float(round_prices(np.array([price]), rules)[0])
+
+
+def calculate_guildees_pay(live_price: float, discount_percent: float,
+                           rules: Optional[CompiledPricingRules] = None) -> float:
     """
     Calculate guildees pay from live price and discount percentage.
     Applies smart rounding based on price ranges.
     """
-    # Apply discount
     price = live_price * (1 - discount_percent / 100)
-    
-    # Apply tiered rounding rules
-    if price < 50:
-        return math.ceil(price * 2) / 2  # Round to nearest 0.5
-    elif price < 100:
-        return math.ceil(price)  # Round to nearest 1
-    elif price < 1000:
-        return math.ceil(price / 10) * 10  # Round to nearest 10
-    elif price < 5000:
-        return math.ceil(price / 50) * 50  # Round to nearest 50
-    elif price < 10000:
-        return math.ceil(price / 100) * 100  # Round to nearest 100
-    elif price < 50000:
-        return math.ceil(price / 500) * 500  # Round to nearest 500
-    elif price < 100000:
-        return math.ceil(price / 1000) * 1000  # Round to nearest 1000
-    else:
-        return math.ceil(price / 1000) * 1000  # Round to nearest 1000
-
-
-def apply_price_bounds(price: float, guild_min: float, guild_max: float) -> float:
+    return float(round_prices(np.array([price]), rules)[0])
+
+
+def apply_price_bounds(price: float, guild_min: float, guild_max: float,
+                       rules: Optional[CompiledPricingRules] = None) -> float:
     """Apply guild min/max bounds to calculated price."""
-    if guild_min > 0 and price < guild_min:
-        return guild_min
-    elif guild_max > 0 and price > guild_max:
-        return guild_max
-    return price
+    bounded = _apply_bounds(
+        np.array([price], dtype='float64'),
+        {"min": np.array([guild_min], dtype='float64'), "max": np.array([guild_max], dtype='float64')},
+        rules or _active_rules
+    )
+    return bounded[0].item()
+
+
+def _apply_bounds(prices: np.ndarray, bounds: Dict[str, np.ndarray],
+                  rules: CompiledPricingRules) -> np.ndarray:
+    """Clamp prices to the set (> 0) bounds; earlier bounds in the precedence win."""
+    result = prices
+    for kind in reversed(rules.bounds_precedence):
+        limit = bounds[kind]
+        if kind == "min":
+            hit = (limit > 0) & (prices < limit)
+        else:
+            hit = (limit > 0) & (prices > limit)
+        result = np.where(hit, limit, result)
+    return result
+
+
+def _numeric_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Return a column as float array, treating missing columns and NaN as 0."""
+    if column not in df.columns:
+        return np.zeros(len(df), dtype='float64')
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype='float64')
 
 
 def update_live_prices(goods_df: pd.DataFrame, price_data: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
     """Update DataFrame with live prices from API."""
     if not price_data:
         return goods_df
-    
+
     for idx, row in goods_df.iterrows():
         material_name = row.get('Produced Goods', '')
         if material_name in price_data:
             goods_df.at[idx, 'Live EXC Price'] = int(price_data[material_name]['currentPrice'])
             goods_df.at[idx, 'Live AVG Price'] = int(price_data[material_name]['avgPrice'])
-    
+
     return goods_df
 
 
-def calculate_all_guildees_prices(goods_df: pd.DataFrame) -> pd.DataFrame:
+def calculate_all_guildees_prices(goods_df: pd.DataFrame,
+                                  rules: Optional[CompiledPricingRules] = None) -> pd.DataFrame:
     """Calculate Guildees Pay for all goods based on live prices and discounts."""
-    for idx, row in goods_df.iterrows():
-        live_price = row.get('Live EXC Price', 0)
-        discount_percent = row.get('Guild % Discount', 0)
-        fixed_discount = row.get('Guild Fixed Discount', 0)
-        guild_min = row.get('Guild Min', 0)
-        guild_max = row.get('Guild Max', 0)
-        
-        # If fixed discount is set, use it instead of percentage
-        if fixed_discount > 0:
-            calculated_price = live_price - fixed_discount
+    if goods_df.empty:
+        return goods_df
+
+    rules = rules or _active_rules
+    live_price = _numeric_column(goods_df, 'Live EXC Price')
+
+    # Walk the precedence list backwards so earlier discount kinds override later ones
+    price = None
+    for kind in reversed(rules.discount_precedence):
+        amount = _numeric_column(goods_df, DISCOUNT_COLUMNS[kind])
+        if kind == "fixed":
+            discounted = live_price - amount
         else:
-            # Calculate base price with percentage discount and rounding
-            calculated_price = calculate_guildees_pay(live_price, discount_percent)
-        
-        # Apply bounds
-        final_price = apply_price_bounds(calculated_price, guild_min, guild_max)
-        
-        goods_df.at[idx, 'Guildees Pay:'] = final_price
-    
+            discounted = live_price * (1 - amount / 100)
+        if kind in rules.rounded_discounts:
+            discounted = round_prices(discounted, rules)
+
+        price = discounted if price is None else np.where(amount > 0, discounted, price)
+
+    bounds = {kind: _numeric_column(goods_df, column) for kind, column in BOUND_COLUMNS.items()}
+    goods_df['Guildees Pay:'] = _apply_bounds(price, bounds, rules)
+
     return goods_df
@@ -0,0 +1,208 @@
+"""Recipe graph from the game catalog and production costs at live prices.
+
+The catalog's recipes are compiled once into padded NumPy arrays (one row per
+recipe, one column per input slot), so every recipe's input cost can be
+evaluated in one vectorized step. Production costs are then found by sweeping
+make-or-buy decisions through the graph until nothing gets cheaper.
+"""
+import json
+import threading
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import GAMEDATA_FILE
+
+
+PRODUCTION_COST_COLUMN = "Production Cost"
+
+# Upper bound on make-or-buy sweeps; an acyclic catalog settles in (depth + 1)
+MAX_SWEEPS = 100
+
+# Price snapshots whose production costs are kept
+COST_CACHE_SIZE = 8
+
+
+class RecipeGraph(NamedTuple):
+    """Recipes compiled into arrays indexed by material position."""
+    material_ids: np.ndarray        # (M,) game ids
+    material_names: Tuple[str, ...]  # (M,)
+    weights: np.ndarray             # (M,) weight per unit
+    recipe_ids: np.ndarray          # (R,)
+    output_index: np.ndarray        # (R,) material position produced
+    output_amount: np.ndarray       # (R,) units produced per run
+    input_index: np.ndarray         # (R, K) input positions, padded with M (a zero-cost slot)
+    input_amount: np.ndarray        # (R, K) units consumed per run, 0 in padding
+    time_minutes: np.ndarray        # (R,)
+    has_inputs: np.ndarray          # (R,) False for extraction recipes
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return _name_index(self.material_names)
+
+
+@lru_cache(maxsize=4)
+def _name_index(names: Tuple[str, ...]) -> Dict[str, int]:
+    return {name: position for position, name in enumerate(names)}
+
+
+def compile_recipe_graph(materials: List[Dict[str, Any]], recipes: List[Dict[str, Any]]) -> RecipeGraph:
+    """
+    Compile catalog materials and recipes into a RecipeGraph.
+
+    Recipes referring to unknown materials are skipped.
+    """
+    material_ids = np.array([m["id"] for m in materials], dtype="int64")
+    position = {int(mid): i for i, mid in enumerate(material_ids)}
+    padding = len(materials)
+
+    usable = [r for r in recipes
+              if r["output"]["id"] in position and all(i["id"] in position for i in r["inputs"])]
+    slots = max((len(r["inputs"]) for r in usable), default=0) or 1
+    input_index = np.full((len(usable), slots), padding, dtype="int64")
+    input_amount = np.zeros((len(usable), slots), dtype="float64")
+    for row, recipe in enumerate(usable):
+        for slot, item in enumerate(recipe["inputs"]):
+            input_index[row, slot] = position[item["id"]]
+            input_amount[row, slot] = item["a"]
+
+    return RecipeGraph(
+        material_ids=material_ids,
+        material_names=tuple(m["name"] for m in materials),
+        weights=np.array([m.get("weight", 0) for m in materials], dtype="float64"),
+        recipe_ids=np.array([r["id"] for r in usable], dtype="int64"),
+        output_index=np.array([position[r["output"]["id"]] for r in usable], dtype="int64"),
+        output_amount=np.array([r["output"]["a"] for r in usable], dtype="float64"),
+        input_index=input_index,
+        input_amount=input_amount,
+        time_minutes=np.array([r.get("timeMinutes", 0) for r in usable], dtype="float64"),
+        has_inputs=np.array([bool(r["inputs"]) for r in usable], dtype=bool),
+    )
+
+
+@lru_cache(maxsize=2)
+def _load_graph(path: str, mtime_ns: int) -> RecipeGraph:
+    with open(path) as f:
+        gamedata = json.load(f)
+    return compile_recipe_graph(gamedata.get("materials", []), gamedata.get("recipes", []))
+
+
+def load_recipe_graph(path: Path = GAMEDATA_FILE) -> Optional[RecipeGraph]:
+    """The catalog's recipe graph, recompiled only when gamedata.json changes."""
+    try:
+        return _load_graph(str(path), Path(path).stat().st_mtime_ns)
+    except Exception as e:
+        print(f"⚠️ Could not load recipes: {e}")
+        return None
+
+
+def price_vector(graph: RecipeGraph, price_data: Dict[str, Dict[str, Any]]) -> np.ndarray:
+    """Exchange price per material position; inf where there is no (non-zero) price."""
+    prices = np.full(len(graph.material_names), np.inf)
+    index = graph.index
+    for name, entry in price_data.items():
+        position = index.get(name)
+        price = entry.get("currentPrice") or 0
+        if position is not None and price > 0:
+            prices[position] = price
+    return prices
+
+
+def make_or_buy(graph: RecipeGraph, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Cheapest unit cost per material, choosing for every input whether to
+    buy it at the exchange or make it from its own inputs.
+
+    Extraction recipes (no inputs) are not a "make" option, since their
+    buildings and labour are not priced; raw materials are bought.
+
+    Returns (unit_cost, make_cost, best_recipe): unit_cost is min(buy, make),
+    make_cost the cheapest recipe's input cost per unit, and best_recipe that
+    recipe's row (-1 where no recipe with inputs can be costed). Unpriced,
+    unmakeable materials are inf.
+
+    All recipes are costed at once per sweep; sweeps repeat until no cost
+    drops. The catalog has a few cycles (e.g. titanium ore mined with
+    titanium carbide drills), where costs settle as the cycle's cheaper path
+    propagates.
+    """
+    n = len(graph.material_names)
+    makeable = graph.has_inputs
+    unit_cost = np.append(prices.astype("float64"), 0.0)  # padding slot costs nothing
+    make_cost = np.full(n, np.inf)
+
+    for _ in range(MAX_SWEEPS):
+        per_unit = (graph.input_amount * unit_cost[graph.input_index]).sum(axis=1) / graph.output_amount
+        per_unit = np.where(makeable, per_unit, np.inf)
+        make_cost = np.full(n, np.inf)
+        np.minimum.at(make_cost, graph.output_index, per_unit)
+        updated = np.minimum(prices, make_cost)
+        if np.allclose(updated, unit_cost[:n], rtol=1e-12, atol=0, equal_nan=True):
+            break
+        unit_cost[:n] = updated
+
+    # Recipe rows achieving each material's make cost
+    per_unit = (graph.input_amount * unit_cost[graph.input_index]).sum(axis=1) / graph.output_amount
+    per_unit = np.where(makeable, per_unit, np.inf)
+    best_recipe = np.full(n, -1, dtype="int64")
+    cheapest = np.flatnonzero(np.isfinite(per_unit) & (per_unit <= make_cost[graph.output_index]))
+    best_recipe[graph.output_index[cheapest]] = cheapest
+    return unit_cost[:n], make_cost, best_recipe
+
+
+_cost_cache: Dict[bytes, Dict[str, float]] = {}
+_cost_cache_lock = threading.Lock()
+# (price_data, costs) of the last call, so a rerun's companies skip even the lookup
+_last_snapshot: Optional[Tuple[Dict, Dict[str, float]]] = None
+
+
+def production_costs(price_data: Dict[str, Dict[str, Any]],
+                     graph: Optional[RecipeGraph] = None) -> Dict[str, float]:
+    """
+    Production cost per material name at the given exchange prices: the
+    input cost of its cheapest recipe per unit produced, each input made or
+    bought, whichever is cheaper.
+
+    Memoized per price snapshot, so the companies on a page share one rollup.
+    Materials without a costable recipe are left out.
+    """
+    global _last_snapshot
+    if not price_data:
+        return {}
+    last = _last_snapshot
+    if graph is None and last is not None and last[0] is price_data:
+        return last[1]
+    graph_used = graph or load_recipe_graph()
+    if graph_used is None:
+        return {}
+
+    prices = price_vector(graph_used, price_data)
+    key = graph_used.material_ids.tobytes() + prices.tobytes()
+    with _cost_cache_lock:
+        costs = _cost_cache.get(key)
+    if costs is None:
+        _, make_cost, _ = make_or_buy(graph_used, prices)
+        costs = {name: float(cost) for name, cost in zip(graph_used.material_names, make_cost)
+                 if np.isfinite(cost)}
+        with _cost_cache_lock:
+            if len(_cost_cache) >= COST_CACHE_SIZE:
+                _cost_cache.pop(next(iter(_cost_cache)))
+            _cost_cache[key] = costs
+    if graph is None:
+        _last_snapshot = (price_data, costs)
+    return costs
+
+
+def add_production_cost(goods_df: pd.DataFrame, costs: Dict[str, float]) -> pd.DataFrame:
+    """Insert the Production Cost column (whole dollars, blank if unknown) after Live EXC Price."""
+    if 'Produced Goods' not in goods_df.columns:
+        return goods_df
+    values = goods_df['Produced Goods'].map(costs).round(0).astype("float64")
+    goods_df = goods_df.drop(columns=[PRODUCTION_COST_COLUMN], errors='ignore')
+    position = (goods_df.columns.get_loc('Live EXC Price') + 1
+                if 'Live EXC Price' in goods_df.columns else len(goods_df.columns))
+    goods_df.insert(position, PRODUCTION_COST_COLUMN, values)
+    return goods_df
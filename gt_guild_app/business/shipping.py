@@ -0,0 +1,110 @@
+"""Distances between trading planets and the shipping cost of guild offers.
+
+Only planets that matter to the guild (where goods are listed and where
+contracts deliver) get a distance matrix, in light years as float32. It is
+rebuilt when gamedata.json or that set of planets changes. Shipping is
+estimated as weight x distance x rate, so offers can be compared by landed
+cost (price plus shipping) rather than price alone.
+"""
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import GAMEDATA_FILE, SHIPPING_RATE
+from business.planet_index import PlanetIndex, load_planet_index
+
+
+LANDED_COLUMNS = ["Company", "Planet", "Guildees Pay:", "Distance (LY)", "Shipping", "Landed Cost"]
+
+
+class DistanceMatrix(NamedTuple):
+    """Pairwise distances between a set of planets."""
+    planets: Tuple[str, ...]        # (N,)
+    light_years: np.ndarray         # (N, N) float32
+
+    @property
+    def index(self) -> Dict[str, int]:
+        return _planet_positions(self.planets)
+
+
+@lru_cache(maxsize=4)
+def _planet_positions(planets: Tuple[str, ...]) -> Dict[str, int]:
+    return {name: position for position, name in enumerate(planets)}
+
+
+def compute_distance_matrix(index: PlanetIndex, planets: Iterable[str]) -> DistanceMatrix:
+    """Distance matrix of the given planets; names the index doesn't know are left out."""
+    positions = index.index
+    known = tuple(sorted({name for name in planets if name in positions}))
+    rows = np.array([positions[name] for name in known], dtype="int64")
+    x, y = index.x[rows], index.y[rows]
+    light_years = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :]) / index.px_to_ly
+    return DistanceMatrix(planets=known, light_years=light_years.astype("float32"))
+
+
+@lru_cache(maxsize=4)
+def _cached_matrix(planets: Tuple[str, ...], path: str, mtime_ns: int) -> Optional[DistanceMatrix]:
+    index = load_planet_index(Path(path))
+    return compute_distance_matrix(index, planets) if index is not None else None
+
+
+def load_distance_matrix(planets: Iterable[str], path: Path = GAMEDATA_FILE) -> Optional[DistanceMatrix]:
+    """Distance matrix of the planets, cached until gamedata.json or the planet set changes."""
+    try:
+        mtime_ns = Path(path).stat().st_mtime_ns
+    except OSError as e:
+        print(f"⚠️ Could not load planets: {e}")
+        return None
+    return _cached_matrix(tuple(sorted({name for name in planets if name})), str(path), mtime_ns)
+
+
+def distances(matrix: DistanceMatrix, origins: Sequence[str], destinations: Sequence[str]) -> np.ndarray:
+    """(len(origins), len(destinations)) light years; NaN where a planet is unknown."""
+    positions = matrix.index
+    rows = np.array([positions.get(name, -1) for name in origins], dtype="int64")
+    columns = np.array([positions.get(name, -1) for name in destinations], dtype="int64")
+    if not len(matrix.planets):
+        return np.full((len(rows), len(columns)), np.nan, dtype="float32")
+    result = matrix.light_years[np.ix_(rows, columns)]
+    result[(rows < 0)[:, None] | (columns < 0)[None, :]] = np.nan
+    return result
+
+
+def shipping_costs(matrix: DistanceMatrix, origins: Sequence[str], destinations: Sequence[str],
+                   weights: Sequence[float], rate: float = SHIPPING_RATE) -> np.ndarray:
+    """
+    Estimated shipping cost per unit of each listing (origin planet and
+    material weight) to each destination, as a (listings, destinations) array.
+    """
+    weights = np.asarray(weights, dtype="float64")
+    return weights[:, None] * distances(matrix, origins, destinations) * rate
+
+
+def landed_costs(listings: pd.DataFrame, matrix: DistanceMatrix, location: str,
+                 weight: float, rate: float = SHIPPING_RATE) -> pd.DataFrame:
+    """
+    Guild offers of one good ranked by landed cost at a delivery location.
+
+    listings holds Company, Planet Produced and Guildees Pay: columns.
+    Landed Cost is Guildees Pay: plus shipping per unit; offers whose
+    planet can't be located (e.g. "Exchange Station") come last without one.
+    """
+    if listings.empty:
+        return pd.DataFrame(columns=LANDED_COLUMNS)
+    planets = listings['Planet Produced'].fillna('').astype(str).tolist()
+    price = pd.to_numeric(listings['Guildees Pay:'], errors='coerce').fillna(0).to_numpy(dtype="float64")
+    distance = distances(matrix, planets, [location])[:, 0].astype("float64")
+    shipping = shipping_costs(matrix, planets, [location], np.full(len(planets), weight), rate)[:, 0]
+
+    ranked = pd.DataFrame({
+        "Company": listings['Company'].to_numpy(),
+        "Planet": planets,
+        "Guildees Pay:": price,
+        "Distance (LY)": distance,
+        "Shipping": shipping,
+        "Landed Cost": price + shipping,
+    }, columns=LANDED_COLUMNS)
+    return ranked.sort_values(["Landed Cost", "Guildees Pay:"], na_position="last", ignore_index=True)
@@ -0,0 +1,239 @@
+"""Propose which guild offers should fill each contract's remaining need.
+
+Every (contract, offer of the same good) pair is costed at once as landed
+cost: Guildees Pay plus shipping to the contract's delivery location. The
+greedy solver then hands each contract its cheapest offer, a round at a
+time, so offers with a limited daily capacity are shared cheapest-first.
+Without capacities this is the exact minimum-cost assignment. With scipy
+installed, an LP mode solves the capacitated case exactly.
+"""
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from config import SHIPPING_RATE
+from business.recipe_graph import RecipeGraph
+from business.shipping import DistanceMatrix, distances
+
+try:
+    from scipy.optimize import linprog
+except ImportError:  # Optional exact solver
+    linprog = None
+
+
+SOLVER_GREEDY = "greedy"
+SOLVER_LP = "lp"
+
+LINE_COLUMNS = ["Contract Company", "Good", "Company", "Delivery Location", "Fulfilled Amount",
+                "Guildees Pay:", "Shipping", "Landed Cost", "Total Cost"]
+UNSOURCED_COLUMNS = ["Contract Company", "Good", "Remaining"]
+
+
+class SourcingPlan(NamedTuple):
+    """Proposed fulfillment lines and the need no offer could cover."""
+    lines: pd.DataFrame         # LINE_COLUMNS, one row per contract and supplier
+    unsourced: pd.DataFrame     # UNSOURCED_COLUMNS
+    total_cost: float
+    solver: str                 # the solver actually used
+
+
+class _Contracts(NamedTuple):
+    company: List[str]
+    good: List[str]
+    location: List[str]         # first delivery location of the contract, "" if none
+    need: np.ndarray            # (C,) remaining daily amount
+
+
+def remaining_needs(contracts: Dict[str, Dict[str, Any]]) -> _Contracts:
+    """Each contract's unfulfilled daily amount and delivery location (contracts with no need are left out)."""
+    company, good, location, need = [], [], [], []
+    for company_name, goods in contracts.items():
+        for good_name, contract in (goods or {}).items():
+            lines = contract.get("lines", [])
+            fulfilled = sum(float(line.get("Fulfilled Amount", 0) or 0) for line in lines)
+            remaining = float(contract.get("daily_amount", 0) or 0) - fulfilled
+            if remaining <= 0:
+                continue
+            company.append(company_name)
+            good.append(good_name)
+            location.append(next((line["Delivery Location"] for line in lines
+                                  if isinstance(line.get("Delivery Location"), str)
+                                  and line["Delivery Location"].strip()), ""))
+            need.append(remaining)
+    return _Contracts(company, good, location, np.array(need, dtype="float64"))
+
+
+def _pairs(contract_goods: Sequence[str], listing_goods: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """(contract, listing) positions of every listing of each contract's good."""
+    codes = {name: code for code, name in enumerate(dict.fromkeys(listing_goods))}
+    listing_code = np.array([codes[name] for name in listing_goods], dtype="int64")
+    order = np.argsort(listing_code, kind="stable")
+    bounds = np.searchsorted(listing_code[order], np.arange(len(codes) + 1))
+
+    contract_code = np.array([codes.get(name, -1) for name in contract_goods], dtype="int64")
+    known = contract_code >= 0
+    starts = np.where(known, bounds[np.maximum(contract_code, 0)], 0)
+    counts = np.where(known, bounds[np.maximum(contract_code, 0) + 1] - starts, 0)
+
+    pair_contract = np.repeat(np.arange(len(contract_goods)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return pair_contract, order[np.repeat(starts, counts) + offsets]
+
+
+def _greedy(need: np.ndarray, capacity: np.ndarray, pair_contract: np.ndarray,
+            pair_listing: np.ndarray, cost: np.ndarray) -> np.ndarray:
+    """
+    Units assigned to each pair. Each round, every contract still short asks
+    its cheapest offer with capacity left; an offer serves its cheapest
+    requests first. Rounds end when needs are met or no offer can help.
+    """
+    need = need.copy()
+    capacity = capacity.copy()
+    assigned = np.zeros(len(cost))
+    by_cost = np.lexsort((pair_contract, cost))
+
+    while True:
+        open_pairs = by_cost[(need[pair_contract[by_cost]] > 0) & (capacity[pair_listing[by_cost]] > 0)]
+        if not len(open_pairs):
+            break
+        # Cheapest open pair of each contract (open_pairs is in cost order)
+        _, first = np.unique(pair_contract[open_pairs], return_index=True)
+        chosen = open_pairs[first]
+        chosen = chosen[np.lexsort((cost[chosen], pair_listing[chosen]))]
+
+        contract, listing = pair_contract[chosen], pair_listing[chosen]
+        request = need[contract]
+        before = np.cumsum(request) - request
+        group_start = np.r_[0, np.flatnonzero(np.diff(listing)) + 1]
+        before -= np.repeat(before[group_start], np.diff(np.r_[group_start, len(chosen)]))
+        granted = np.clip(capacity[listing] - before, 0, request)
+
+        assigned[chosen] += granted
+        np.subtract.at(need, contract, granted)
+        np.subtract.at(capacity, listing, granted)
+    return assigned
+
+
+def _lp(need: np.ndarray, capacity: np.ndarray, pair_contract: np.ndarray,
+        pair_listing: np.ndarray, cost: np.ndarray) -> Optional[np.ndarray]:
+    """Exact minimum-cost assignment via linprog, or None if it fails."""
+    pairs, contracts = len(cost), len(need)
+    # One slack per contract for need no offer can cover, dearer than any offer
+    penalty = (cost.max() if pairs else 0) * 10 + 1
+    objective = np.r_[cost, np.full(contracts, penalty)]
+    equality = np.zeros((contracts, pairs + contracts))
+    equality[pair_contract, np.arange(pairs)] = 1
+    equality[np.arange(contracts), pairs + np.arange(contracts)] = 1
+
+    limited = np.flatnonzero(np.isfinite(capacity))
+    upper = np.zeros((len(limited), pairs + contracts))
+    row = {listing: i for i, listing in enumerate(limited)}
+    for pair, listing in enumerate(pair_listing):
+        if listing in row:
+            upper[row[listing], pair] = 1
+
+    result = linprog(objective, A_ub=upper if len(limited) else None,
+                     b_ub=capacity[limited] if len(limited) else None,
+                     A_eq=equality, b_eq=need, bounds=(0, None), method="highs")
+    if not result.success:
+        print(f"⚠️ Sourcing LP failed ({result.message}), using greedy")
+        return None
+    return np.round(result.x[:pairs], 6)
+
+
+def propose_sourcing(contracts: Dict[str, Dict[str, Any]], listings: pd.DataFrame,
+                     matrix: Optional[DistanceMatrix] = None, graph: Optional[RecipeGraph] = None,
+                     capacities: Optional[Sequence[float]] = None, solver: str = SOLVER_GREEDY,
+                     rate: float = SHIPPING_RATE) -> SourcingPlan:
+    """
+    Minimum-cost assignment of guild offers to every contract's remaining need.
+
+    listings holds Company, Produced Goods, Planet Produced and Guildees Pay:
+    (priced, e.g. by calculate_all_guildees_prices); unpriced listings and a
+    company's own listings for its contracts are skipped. capacities gives
+    each listing's daily units (default unlimited). Shipping needs matrix
+    (distances) and graph (material weights); offers that can't be located
+    are only used for contracts without a delivery location.
+
+    solver="lp" solves exactly with scipy when installed and falls back to
+    the greedy solver otherwise.
+    """
+    needs = remaining_needs(contracts)
+    lines = pd.DataFrame(columns=LINE_COLUMNS)
+
+    if listings.empty or not len(needs.need):
+        unsourced = pd.DataFrame({"Contract Company": needs.company, "Good": needs.good,
+                                  "Remaining": needs.need}, columns=UNSOURCED_COLUMNS)
+        return SourcingPlan(lines, unsourced, 0.0, SOLVER_GREEDY)
+
+    supplier = listings["Company"].astype(str).to_numpy()
+    planet = listings["Planet Produced"].fillna("").astype(str).tolist()
+    price = pd.to_numeric(listings["Guildees Pay:"], errors="coerce").fillna(0).to_numpy(dtype="float64")
+    capacity = (np.asarray(capacities, dtype="float64") if capacities is not None
+                else np.full(len(listings), np.inf))
+
+    pair_contract, pair_listing = _pairs(needs.good, listings["Produced Goods"].astype(str).tolist())
+
+    shipping = np.zeros(len(pair_contract))
+    located = np.array([bool(location) for location in needs.location])
+    if matrix is not None and located.any():
+        weight = np.zeros(len(needs.good))
+        if graph is not None:
+            index = graph.index
+            weight = np.array([graph.weights[index[name]] if name in index else 0.0 for name in needs.good])
+        distance = distances(matrix, planet, needs.location)[pair_listing, pair_contract].astype("float64")
+        shipping = np.where(located[pair_contract], weight[pair_contract] * distance * rate, 0.0)
+
+    usable = ((price[pair_listing] > 0) & np.isfinite(shipping)
+              & (supplier[pair_listing] != np.array(needs.company, dtype=object)[pair_contract]))
+    pair_contract, pair_listing, shipping = pair_contract[usable], pair_listing[usable], shipping[usable]
+    cost = price[pair_listing] + shipping
+
+    assigned, used = None, SOLVER_GREEDY
+    if solver == SOLVER_LP and linprog is not None and len(cost):
+        assigned = _lp(needs.need, capacity, pair_contract, pair_listing, cost)
+        used = SOLVER_LP if assigned is not None else SOLVER_GREEDY
+    if assigned is None:
+        assigned = _greedy(needs.need, capacity, pair_contract, pair_listing, cost)
+
+    chosen = np.flatnonzero(assigned > 0)
+    contract, listing = pair_contract[chosen], pair_listing[chosen]
+    lines = pd.DataFrame({
+        "Contract Company": np.array(needs.company, dtype=object)[contract],
+        "Good": np.array(needs.good, dtype=object)[contract],
+        "Company": supplier[listing],
+        "Delivery Location": np.array(needs.location, dtype=object)[contract],
+        "Fulfilled Amount": assigned[chosen],
+        "Guildees Pay:": price[listing],
+        "Shipping": shipping[chosen],
+        "Landed Cost": cost[chosen],
+        "Total Cost": assigned[chosen] * cost[chosen],
+    }, columns=LINE_COLUMNS).sort_values(["Contract Company", "Good", "Landed Cost"], ignore_index=True)
+
+    remaining = needs.need.copy()
+    np.subtract.at(remaining, contract, assigned[chosen])
+    short = np.flatnonzero(remaining > 1e-9)
+    unsourced = pd.DataFrame({
+        "Contract Company": np.array(needs.company, dtype=object)[short],
+        "Good": np.array(needs.good, dtype=object)[short],
+        "Remaining": remaining[short],
+    }, columns=UNSOURCED_COLUMNS)
+    return SourcingPlan(lines, unsourced, float(lines["Total Cost"].sum()), used)
+
+
+def apply_sourcing(contracts: Dict[str, Dict[str, Any]], lines: pd.DataFrame) -> int:
+    """Append proposed lines to their contracts in place; returns how many were added."""
+    added = 0
+    for line in lines.to_dict("records"):
+        contract = contracts.get(line["Contract Company"], {}).get(line["Good"])
+        if contract is None:
+            continue
+        contract.setdefault("lines", []).append({
+            "Company": line["Company"],
+            "Delivery Location": line["Delivery Location"],
+            "Fulfilled Amount": int(round(line["Fulfilled Amount"])),
+        })
+        added += 1
+    return added
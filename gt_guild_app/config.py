@@ -1,15 +1,44 @@
 """Configuration constants for the TiT Guild App."""
+import os
 from pathlib import Path
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Boolean environment variable ("0", "false", "no" and "off" are false)."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
 # File paths
 BASE_DIR = Path(__file__).parent
 ASSETS_DIR = BASE_DIR / "assets"
 CSS_FILE = ASSETS_DIR / "css" / "style.css"
-DATA_FILE = ASSETS_DIR / "data" / "guild_data.feather"
-GOOGLE_SHEETS_DATA_FILE = ASSETS_DIR / "data" / "google_sheets_data.feather"
-CONTRACTS_FILE = ASSETS_DIR / "data" / "contracts.json"
-COMPANY_CONFIG_FILE = ASSETS_DIR / "data" / "company_config.json"
 GAMEDATA_FILE = ASSETS_DIR / "data" / "gamedata.json"
+PRICING_RULES_FILE = ASSETS_DIR / "data" / "pricing_rules.json"
+
+# Guild data the app writes (GT_GUILD_DATA_DIR points it elsewhere, e.g. for benchmarks)
+DATA_DIR = Path(os.environ.get("GT_GUILD_DATA_DIR") or ASSETS_DIR / "data")
+DATA_FILE = DATA_DIR / "guild_data.feather"
+GOOGLE_SHEETS_DATA_FILE = DATA_DIR / "google_sheets_data.feather"
+CONTRACTS_FILE = DATA_DIR / "contracts.json"
+COMPANY_CONFIG_FILE = DATA_DIR / "company_config.json"
+
+# Public JSON exports (GT_GUILD_EXPORT_DIR overrides)
+EXPORT_DIR = Path(os.environ.get("GT_GUILD_EXPORT_DIR") or BASE_DIR.parent / "api_exports")
+
+# Commit (and push) data files to git whenever they are saved
+GIT_AUTOSAVE = _env_flag("GT_GUILD_GIT_AUTOSAVE", True)
+
+# Operational metrics: a Prometheus textfile to rewrite and/or a local port
+# serving /metrics (both off unless set)
+METRICS_FILE = Path(os.environ["GT_GUILD_METRICS_FILE"]) if os.environ.get("GT_GUILD_METRICS_FILE") else None
+METRICS_PORT = int(os.environ["GT_GUILD_METRICS_PORT"]) if os.environ.get("GT_GUILD_METRICS_PORT") else None
+
+# Estimated shipping cost ($ per unit of weight per light year) used to rank
+# guild offers by landed cost
+SHIPPING_RATE = float(os.environ.get("GT_GUILD_SHIPPING_RATE") or 1.0)
 
 # Available professions (sorted alphabetically)
 PROFESSIONS = sorted([
@@ -0,0 +1,184 @@
+"""Change sets describing what differs between two versions of the guild data.
+
+A change set is a plain dict:
+
+    {
+        'added': [company, ...],              # companies only in the new data
+        'removed': [company, ...],            # companies only in the old data
+        'modified': {
+            name: {
+                'company': company,           # the new version of the company
+                'fields': {field: new_value},
+                'goods_added': [good, ...],
+                'goods_removed': [good_key, ...],
+                'goods_modified': {good_key: {field: new_value}},
+            }
+        }
+    }
+
+Goods are matched by (Produced Goods, occurrence) so duplicate rows in a
+sheet still line up.
+"""
+import copy
+from typing import List, Dict, Any, Set, Tuple
+
+
+# Company-level fields that come from the sheet / user edits
+COMPANY_FIELDS = ('industry', 'professions', 'timezone')
+
+# Goods fields that come from the sheet / user edits (prices are derived)
+GOODS_FIELDS = ('Planet Produced', 'Guild Max', 'Guild Min', 'Guild % Discount', 'Guild Fixed Discount')
+
+GoodKey = Tuple[str, int]
+
+
+def _keyed_goods(goods: List[Dict[str, Any]]) -> Dict[GoodKey, Dict[str, Any]]:
+    """Index goods by (name, nth occurrence of that name)."""
+    keyed = {}
+    seen = {}
+    for good in goods:
+        name = good.get('Produced Goods', '')
+        occurrence = seen.get(name, 0)
+        seen[name] = occurrence + 1
+        keyed[(name, occurrence)] = good
+    return keyed
+
+
+def _diff_company(old: Dict[str, Any], new: Dict[str, Any],
+                  goods_fields: Tuple[str, ...] = GOODS_FIELDS) -> Dict[str, Any]:
+    """Field and goods differences between two versions of one company."""
+    fields = {f: new.get(f) for f in COMPANY_FIELDS if old.get(f) != new.get(f)}
+
+    old_goods = _keyed_goods(old.get('goods', []))
+    new_goods = _keyed_goods(new.get('goods', []))
+
+    goods_added = [good for key, good in new_goods.items() if key not in old_goods]
+    goods_removed = [key for key in old_goods if key not in new_goods]
+    goods_modified = {}
+    for key, good in new_goods.items():
+        if key not in old_goods:
+            continue
+        changes = {f: good.get(f) for f in goods_fields if old_goods[key].get(f) != good.get(f)}
+        if changes:
+            goods_modified[key] = changes
+
+    return {
+        'company': new,
+        'fields': fields,
+        'goods_added': goods_added,
+        'goods_removed': goods_removed,
+        'goods_modified': goods_modified,
+    }
+
+
+def compute_change_set(old_companies: List[Dict[str, Any]],
+                       new_companies: List[Dict[str, Any]],
+                       goods_fields: Tuple[str, ...] = GOODS_FIELDS,
+                       skip_empty_added: bool = False) -> Dict[str, Any]:
+    """
+    Diff two company lists into a change set.
+    Only goods_fields are compared on goods (by default the derived prices are ignored).
+
+    With skip_empty_added, new companies without goods are treated as
+    unchanged rather than added. Use it when the old data went through the
+    feather files (one row per good), which can't hold such companies, so
+    they would otherwise show up as added on every diff.
+    """
+    old_by_name = {c['name']: c for c in old_companies or []}
+    new_by_name = {c['name']: c for c in new_companies or []}
+
+    modified = {}
+    for name, new in new_by_name.items():
+        if name not in old_by_name:
+            continue
+        diff = _diff_company(old_by_name[name], new, goods_fields)
+        if diff['fields'] or diff['goods_added'] or diff['goods_removed'] or diff['goods_modified']:
+            modified[name] = diff
+
+    return {
+        'added': [c for name, c in new_by_name.items()
+                  if name not in old_by_name and (c.get('goods') or not skip_empty_added)],
+        'removed': [c for name, c in old_by_name.items() if name not in new_by_name],
+        'modified': modified,
+    }
+
+
+def is_empty(change_set: Dict[str, Any]) -> bool:
+    """True when the change set has nothing to apply."""
+    return not (change_set['added'] or change_set['removed'] or change_set['modified'])
+
+
+def touched_companies(change_set: Dict[str, Any]) -> Set[str]:
+    """Names of all companies added, removed or modified."""
+    names = {c['name'] for c in change_set['added']}
+    names.update(c['name'] for c in change_set['removed'])
+    names.update(change_set['modified'])
+    return names
+
+
+def touched_goods(change_set: Dict[str, Any]) -> Set[str]:
+    """Names of all goods whose listings are affected by the change set."""
+    goods = set()
+    for company in change_set['added'] + change_set['removed']:
+        goods.update(g.get('Produced Goods', '') for g in company.get('goods', []))
+    for diff in change_set['modified'].values():
+        if diff['fields']:
+            # Company details (professions, timezone) appear in every listing
+            goods.update(g.get('Produced Goods', '') for g in diff['company'].get('goods', []))
+        goods.update(g.get('Produced Goods', '') for g in diff['goods_added'])
+        goods.update(name for name, _ in diff['goods_removed'])
+        goods.update(name for name, _ in diff['goods_modified'])
+    goods.discard('')
+    return goods
+
+
+def summarize_change_set(change_set: Dict[str, Any]) -> str:
+    """Short human readable summary, e.g. '+1 -0 ~3'."""
+    return f"+{len(change_set['added'])} -{len(change_set['removed'])} ~{len(change_set['modified'])}"
+
+
+def apply_change_set(companies: List[Dict[str, Any]], change_set: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Apply a change set to a company list in place and return it.
+
+    Companies and goods the change set does not mention are left untouched
+    (including derived fields like live prices), so other in-session edits survive.
+    """
+    removed = {c['name'] for c in change_set['removed']}
+    if removed:
+        companies[:] = [c for c in companies if c['name'] not in removed]
+
+    by_name = {c['name']: c for c in companies}
+
+    for new in change_set['added']:
+        if new['name'] in by_name:
+            by_name[new['name']].clear()
+            by_name[new['name']].update(copy.deepcopy(new))
+        else:
+            company = copy.deepcopy(new)
+            companies.append(company)
+            by_name[company['name']] = company
+
+    for name, diff in change_set['modified'].items():
+        company = by_name.get(name)
+        if company is None:
+            company = copy.deepcopy(diff['company'])
+            companies.append(company)
+            by_name[name] = company
+            continue
+
+        for field, value in diff['fields'].items():
+            company[field] = copy.deepcopy(value)
+
+        goods = _keyed_goods(company.get('goods', []))
+        for key in diff['goods_removed']:
+            goods.pop(key, None)
+        for key, changes in diff['goods_modified'].items():
+            if key in goods:
+                goods[key].update(changes)
+        kept = list(goods.values())
+        for good in diff['goods_added']:
+            kept.append(dict(good))
+        company['goods'] = kept
+
+    return companies
@@ -5,7 +5,33 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from config import DATA_FILE, GOOGLE_SHEETS_DATA_FILE, GAMEDATA_FILE, CONTRACTS_FILE, COMPANY_CONFIG_FILE
+from config import DATA_FILE, GOOGLE_SHEETS_DATA_FILE, GAMEDATA_FILE, CONTRACTS_FILE, COMPANY_CONFIG_FILE, PRICING_RULES_FILE, GIT_AUTOSAVE
+from core.profiling import span, timed
+from core.metrics import record_git
+
+
+def run_git(args: List[str], cwd: Path, timeout: float, **kwargs) -> "subprocess.CompletedProcess":
+    """
+    Run git with captured output, counting the call and its latency in the metrics.
+
+    A non-zero exit is counted as "failed" (note that `git commit` with nothing
+    to commit exits 1); timeouts and other errors are recorded and re-raised.
+    """
+    import subprocess
+    import time
+
+    command = args[0] if args else ""
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, timeout=timeout, **kwargs)
+    except subprocess.TimeoutExpired:
+        record_git(command, time.perf_counter() - start, "timeout")
+        raise
+    except Exception:
+        record_git(command, time.perf_counter() - start, "error")
+        raise
+    record_git(command, time.perf_counter() - start, "ok" if result.returncode == 0 else "failed")
+    return result
 
 
 def load_game_materials() -> List[str]:
@@ -33,6 +59,18 @@ def load_game_planets() -> List[str]:
         return []
 
 
+def load_pricing_rules() -> Dict[str, Any]:
+    """Load the guild's pricing rules (rounding tiers and precedence)."""
+    if not PRICING_RULES_FILE.exists():
+        return {}
+    
+    try:
+        with open(PRICING_RULES_FILE, 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
 def feather_to_companies(df: pd.DataFrame) -> List[Dict[str, Any]]:
     """Convert flattened feather DataFrame to nested company structure."""
     companies = []
@@ -96,6 +134,7 @@ def companies_to_feather(companies: List[Dict[str, Any]]) -> pd.DataFrame:
     return pd.DataFrame(rows, columns=expected_columns)
 
 
+@timed()
 def load_data() -> Optional[List[Dict[str, Any]]]:
     """Load data from feather file."""
     if not DATA_FILE.exists():
@@ -108,6 +147,7 @@ def load_data() -> Optional[List[Dict[str, Any]]]:
         return None
 
 
+@timed()
 def save_data(companies: List[Dict[str, Any]]) -> None:
     """Save company data to feather file and commit to git."""
     import subprocess
@@ -117,20 +157,21 @@ def save_data(companies: List[Dict[str, Any]]) -> None:
     df.to_feather(DATA_FILE)
     
     # Auto-commit to git to persist changes
+    if not GIT_AUTOSAVE:
+        return
     try:
         repo_root = Path(__file__).parent.parent.parent
-        subprocess.run(
-            ["git", "add", "gt_guild_app/assets/data/guild_data.feather"],
-            cwd=repo_root,
-            capture_output=True,
-            timeout=5
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Auto-save guild data changes"],
-            cwd=repo_root,
-            capture_output=True,
-            timeout=5
-        )
+        with span("git commit"):
+            run_git(
+                ["add", "gt_guild_app/assets/data/guild_data.feather"],
+                cwd=repo_root,
+                timeout=5
+            )
+            run_git(
+                ["commit", "-m", "Auto-save guild data changes"],
+                cwd=repo_root,
+                timeout=5
+            )
         # Push asynchronously to avoid blocking
         subprocess.Popen(
             ["git", "push"],
@@ -233,18 +274,18 @@ def save_contracts(contracts: Dict[str, Any]) -> None:
         json.dump(contracts, f, indent=2)
     
     # Auto-commit to git to persist changes
+    if not GIT_AUTOSAVE:
+        return
     try:
         repo_root = Path(__file__).parent.parent.parent
-        subprocess.run(
-            ["git", "add", "gt_guild_app/assets/data/contracts.json"],
+        run_git(
+            ["add", "gt_guild_app/assets/data/contracts.json"],
             cwd=repo_root,
-            capture_output=True,
             timeout=5
         )
-        subprocess.run(
-            ["git", "commit", "-m", "Auto-save contract changes"],
+        run_git(
+            ["commit", "-m", "Auto-save contract changes"],
             cwd=repo_root,
-            capture_output=True,
             timeout=5
         )
         # Push asynchronously to avoid blocking
@@ -280,18 +321,18 @@ def save_company_config(config: Dict[str, Any]) -> None:
         json.dump(config, f, indent=2)
     
     # Auto-commit to git to persist changes
+    if not GIT_AUTOSAVE:
+        return
     try:
         repo_root = Path(__file__).parent.parent.parent
-        subprocess.run(
-            ["git", "add", "gt_guild_app/assets/data/company_config.json"],
+        run_git(
+            ["add", "gt_guild_app/assets/data/company_config.json"],
             cwd=repo_root,
-            capture_output=True,
             timeout=5
         )
-        subprocess.run(
-            ["git", "commit", "-m", "Auto-save company configuration"],
+        run_git(
+            ["commit", "-m", "Auto-save company configuration"],
             cwd=repo_root,
-            capture_output=True,
             timeout=5
         )
         # Push asynchronously to avoid blocking
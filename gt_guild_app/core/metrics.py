@@ -0,0 +1,390 @@
+"""
+Process-wide operational metrics in the Prometheus text format.
+
+Counters, gauges and latency histograms for the integrations (price API,
+Google Sheets, git, GitHub) and the size of the guild data. The registry
+can be written to a textfile for node_exporter's textfile collector, or
+served on a local /metrics endpoint.
+"""
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+# Latency buckets in seconds, from local git calls to slow sheet downloads
+DEFAULT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# How often the exporter rewrites the textfile
+METRICS_WRITE_INTERVAL = 15.0
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{_escape(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """A named metric family with optional labels."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A value that only goes up (events, failures)."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class Gauge(_Metric):
+    """A value that is set to the current state (sizes, timestamps)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def value(self, **labels: str) -> Optional[float]:
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in values]
+
+
+class Histogram(_Metric):
+    """Observed durations in cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metric families by name, rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+# Galactic Tycoons price API
+PRICE_FETCHES = REGISTRY.counter(
+    "gt_guild_price_fetch_total", "Price API fetches by result (ok, empty)", ["result"])
+PRICE_FETCH_SECONDS = REGISTRY.histogram(
+    "gt_guild_price_fetch_seconds", "Price API fetch latency")
+PRICED_MATERIALS = REGISTRY.gauge(
+    "gt_guild_priced_materials", "Materials in the last successful price fetch")
+ZERO_PRICED_MATERIALS = REGISTRY.gauge(
+    "gt_guild_zero_priced_materials", "Materials whose last fetched exchange price is zero")
+PRICE_FETCH_LAST_SUCCESS = REGISTRY.gauge(
+    "gt_guild_price_fetch_last_success_timestamp_seconds", "Unix time of the last non-empty price fetch")
+LISTINGS_WITHOUT_PRICE = REGISTRY.gauge(
+    "gt_guild_listings_without_live_price", "Listings whose live exchange price is zero after repricing")
+
+# Google Sheets
+SHEET_IMPORTS = REGISTRY.counter(
+    "gt_guild_sheet_import_total", "Sheet imports by status (changed, unchanged, failed)", ["status"])
+SHEET_IMPORT_SECONDS = REGISTRY.histogram(
+    "gt_guild_sheet_import_seconds", "Sheet import latency, all sources")
+SHEET_SOURCE_FAILURES = REGISTRY.counter(
+    "gt_guild_sheet_source_failures_total", "Sheet sources that could not be downloaded or parsed")
+
+# git subprocesses
+GIT_COMMANDS = REGISTRY.counter(
+    "gt_guild_git_commands_total", "git subprocesses by command and result (ok, failed, timeout, error)",
+    ["command", "result"])
+GIT_SECONDS = REGISTRY.histogram(
+    "gt_guild_git_command_seconds", "git subprocess latency", ["command"])
+
+# GitHub API pushes
+GITHUB_PUSHES = REGISTRY.counter(
+    "gt_guild_github_push_total", "GitHub pushes by result (ok, failed)", ["result"])
+GITHUB_PUSH_SECONDS = REGISTRY.histogram(
+    "gt_guild_github_push_seconds", "GitHub push latency")
+GITHUB_PUSH_LAST_SUCCESS = REGISTRY.gauge(
+    "gt_guild_github_push_last_success_timestamp_seconds", "Unix time of the last successful GitHub push")
+
+# Data sizes
+COMPANIES = REGISTRY.gauge("gt_guild_companies", "Companies in the guild data")
+LISTINGS = REGISTRY.gauge("gt_guild_listings", "Goods listings across all companies")
+SESSIONS = REGISTRY.gauge("gt_guild_sessions", "Active Streamlit sessions")
+SESSION_STATE_BYTES = REGISTRY.gauge(
+    "gt_guild_session_state_bytes", "Deep size of session state by key family, summed over sessions", ["key"])
+SESSION_STATE_KEYS = REGISTRY.gauge(
+    "gt_guild_session_state_keys", "Session state keys by key family, summed over sessions", ["key"])
+
+
+def observe(histogram: Histogram, counter: Counter, outcome: Callable[[object], str],
+            label: str = "result", on_success: Optional[Gauge] = None,
+            success: str = "ok") -> Callable:
+    """
+    Decorator timing every call into histogram and counting it by outcome(result).
+
+    A call that raises is counted as "error" and re-raised. When the outcome
+    equals success, on_success (a timestamp gauge) is set to the current time.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception:
+                histogram.observe(time.perf_counter() - start)
+                counter.inc(**{label: "error"})
+                raise
+            histogram.observe(time.perf_counter() - start)
+            status = outcome(result)
+            counter.inc(**{label: status})
+            if on_success is not None and status == success:
+                on_success.set(time.time())
+            return result
+        return wrapper
+    return decorator
+
+
+def record_git(command: str, seconds: float, result: str) -> None:
+    """Count one git subprocess and its latency."""
+    GIT_COMMANDS.inc(command=command, result=result)
+    GIT_SECONDS.observe(seconds, command=command)
+
+
+def record_prices(price_dict: Dict[str, Dict[str, float]]) -> None:
+    """Gauge how many materials came back from a price fetch and how many are zero."""
+    if not price_dict:
+        return
+    PRICED_MATERIALS.set(len(price_dict))
+    ZERO_PRICED_MATERIALS.set(sum(1 for price in price_dict.values() if not price.get("currentPrice")))
+
+
+def record_data_size(companies: List[Dict]) -> None:
+    """Gauge the number of companies and goods listings."""
+    COMPANIES.set(len(companies))
+    LISTINGS.set(sum(len(company.get("goods", [])) for company in companies))
+
+
+def record_sessions() -> None:
+    """Gauge active Streamlit sessions (left unset outside a running server)."""
+    try:
+        from streamlit.runtime import Runtime
+        if Runtime.exists():
+            SESSIONS.set(Runtime.instance()._session_mgr.num_active_sessions())
+    except Exception:
+        pass
+
+
+def write_textfile(path: Path, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Write the registry to path for node_exporter's textfile collector.
+
+    The file is replaced atomically so the collector never reads half of it.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(registry.render())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def make_metrics_server(port: int, host: str = "127.0.0.1",
+                        registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """An HTTP server answering GET /metrics with the registry (not yet started)."""
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            record_sessions()
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    return server
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_metrics_export(textfile: Optional[Path] = None, port: Optional[int] = None,
+                         interval: float = METRICS_WRITE_INTERVAL) -> bool:
+    """
+    Start exporting metrics for this process, once.
+
+    With textfile, a daemon thread rewrites it every interval seconds; with
+    port, /metrics is served on localhost. Returns True when export started
+    on this call.
+    """
+    global _exporter_started
+    if textfile is None and port is None:
+        return False
+    with _exporter_lock:
+        if _exporter_started:
+            return False
+        _exporter_started = True
+
+    if textfile is not None:
+        def write_loop():
+            while True:
+                try:
+                    record_sessions()
+                    write_textfile(textfile)
+                except Exception as e:
+                    print(f"⚠️ Could not write metrics to {textfile}: {e}")
+                time.sleep(interval)
+        threading.Thread(target=write_loop, name="metrics-textfile", daemon=True).start()
+
+    if port is not None:
+        try:
+            server = make_metrics_server(port)
+        except OSError as e:
+            print(f"❌ Could not serve metrics on port {port}: {e}")
+        else:
+            threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+            print(f"✅ Serving metrics on http://127.0.0.1:{port}/metrics")
+    return True
@@ -0,0 +1,167 @@
+"""Lightweight timing spans collected per rerun, with optional cProfile capture."""
+import contextvars
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+
+# Reruns kept per session for the profiling panel
+PROFILE_HISTORY = 20
+
+# Spans recorded outside a traced rerun (background threads, fragment reruns)
+BACKGROUND_HISTORY = 200
+
+# Functions listed in the cProfile text summary
+PROFILE_SUMMARY_LINES = 40
+
+
+class RerunTrace:
+    """The spans recorded during one rerun, as offsets from its start."""
+
+    def __init__(self, label: str = "rerun"):
+        self.label = label
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Dict[str, Any]] = []
+        self.profile: Optional[bytes] = None
+        self.profile_summary: Optional[str] = None
+        # cProfile was requested but another capture held the profiler
+        self.profiler_busy = False
+        self._depth = 0
+
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("gt_guild_trace", default=None)
+_background: Deque[Dict[str, Any]] = deque(maxlen=BACKGROUND_HISTORY)
+_background_lock = threading.Lock()
+
+# Only one cProfile capture can run per process (on Python 3.12+ cProfile is
+# built on sys.monitoring and a second enable() raises ValueError)
+_profiler_lock = threading.Lock()
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """
+    Time a block under name.
+
+    Inside a traced rerun the span is nested under any enclosing span;
+    elsewhere (e.g. on a background thread) it goes to a process-wide buffer.
+    """
+    trace = _current_trace.get()
+    depth = 0
+    if trace is not None:
+        depth = trace._depth
+        trace._depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        end = time.perf_counter()
+        if trace is not None:
+            trace._depth = depth
+            trace.spans.append({
+                "name": name, "start": start - trace.start, "duration": end - start, "depth": depth
+            })
+        else:
+            with _background_lock:
+                _background.append({
+                    "name": name, "thread": threading.current_thread().name,
+                    "finished_at": datetime.now(timezone.utc), "duration": end - start
+                })
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Decorator wrapping every call of a function in a span (named after it by default)."""
+    def decorator(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def trace_rerun(label: str = "rerun", profile: bool = False) -> Iterator[RerunTrace]:
+    """
+    Collect the spans of one rerun, optionally under cProfile.
+
+    The trace is finished even when the block raises (st.rerun() and
+    st.stop() work by raising), so interrupted reruns are recorded too.
+
+    Captures are serialized process-wide: while another rerun (or another
+    profiling tool) holds the profiler, this rerun runs unprofiled and is
+    marked profiler_busy instead of failing. On Python 3.12+ a capture also
+    includes other threads' work during the rerun.
+    """
+    trace = RerunTrace(label)
+    token = _current_trace.set(trace)
+    profiler = _start_profiler() if profile else None
+    trace.profiler_busy = profile and profiler is None
+    try:
+        yield trace
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            _profiler_lock.release()
+            profiler.create_stats()
+            # Same format as pstats.Stats.dump_stats, loadable with pstats/snakeviz
+            trace.profile = marshal.dumps(profiler.stats)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_SUMMARY_LINES)
+            trace.profile_summary = summary.getvalue()
+        trace.duration = time.perf_counter() - trace.start
+        _current_trace.reset(token)
+
+
+def _start_profiler() -> Optional[cProfile.Profile]:
+    """An enabled profiler holding _profiler_lock, or None when profiling is busy."""
+    if not _profiler_lock.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Another profiling tool is already active
+        _profiler_lock.release()
+        return None
+    return profiler
+
+
+def current_trace() -> Optional[RerunTrace]:
+    """The trace collecting spans on this thread, if any."""
+    return _current_trace.get()
+
+
+def background_spans() -> List[Dict[str, Any]]:
+    """Recent spans recorded outside a traced rerun, oldest first."""
+    with _background_lock:
+        return list(_background)
+
+
+def summarize_spans(traces: List[RerunTrace]) -> List[Dict[str, Any]]:
+    """
+    Per span name across traces: calls, total, mean per rerun and max seconds.
+
+    Sorted by total time, largest first.
+    """
+    totals: Dict[str, Dict[str, Any]] = {}
+    for trace in traces:
+        for item in trace.spans:
+            entry = totals.setdefault(item["name"], {"name": item["name"], "calls": 0, "total": 0.0, "max": 0.0})
+            entry["calls"] += 1
+            entry["total"] += item["duration"]
+            entry["max"] = max(entry["max"], item["duration"])
+    for entry in totals.values():
+        entry["mean_per_rerun"] = entry["total"] / len(traces) if traces else 0.0
+    return sorted(totals.values(), key=lambda entry: entry["total"], reverse=True)
@@ -0,0 +1,229 @@
+"""
+Memory accounting for per-session state.
+
+Measures the deep size of each session_state key, keeps a short history
+per session so growth over a session's life is visible, and flags keys
+(and families of per-company keys) that keep growing.
+"""
+import sys
+import threading
+import time
+import types
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Mapping, Optional, Set
+
+
+# Samples kept per session
+MEMORY_HISTORY = 60
+
+# A key is flagged once it has grown over at least this many samples...
+GROWTH_MIN_SAMPLES = 5
+# ...by at least this many bytes overall
+GROWTH_MIN_BYTES = 256 * 1024
+# A key family is flagged once it gained this many keys
+GROWTH_MIN_KEYS = 50
+
+# Keys created per company or good (widget and UI flags); they are reported
+# as one family each, e.g. "show_add_good_*"
+DYNAMIC_KEY_PREFIXES = (
+    "show_add_good_", "add_good_", "select_good_", "daily_amount_", "daily_amt_",
+    "contract_lines_", "delete_", "table_", "prof_", "tz_"
+)
+
+# Shared by every caller, not owned by the session: counted shallowly
+_OPAQUE_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType,
+                 types.MethodType, type(threading.Lock()))
+
+
+# Leaves of the object graph: sized directly, never walked
+_ATOMIC_TYPES = frozenset((str, bytes, bytearray, int, float, bool, complex, type(None)))
+
+
+def deep_sizeof(obj: Any, seen: Optional[Set[int]] = None) -> int:
+    """
+    Approximate bytes held by obj and everything it references.
+
+    Objects reachable more than once (from the same seen set) are counted
+    once. DataFrames and numpy arrays report their own buffer sizes.
+    """
+    if seen is None:
+        seen = set()
+    getsizeof = sys.getsizeof
+    pending = [obj]
+    total = 0
+
+    def add_children(children: Iterable) -> None:
+        # Leaves are sized here rather than queued, which keeps the walk
+        # fast for the app's lists of flat dicts
+        nonlocal total
+        for child in children:
+            if type(child) in _ATOMIC_TYPES:
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    total += getsizeof(child)
+            else:
+                pending.append(child)
+
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        kind = type(item)
+
+        if kind is dict or isinstance(item, Mapping):
+            total += getsizeof(item)
+            add_children(item.keys())
+            add_children(item.values())
+            continue
+        if kind in (list, tuple, set, frozenset, deque):
+            total += getsizeof(item)
+            add_children(item)
+            continue
+        if kind in _ATOMIC_TYPES or isinstance(item, _OPAQUE_TYPES):
+            total += getsizeof(item)
+            continue
+        module = kind.__module__
+        if module.startswith("pandas") and hasattr(item, "memory_usage"):
+            try:
+                usage = item.memory_usage(deep=True)
+                total += int(usage.sum() if hasattr(usage, "sum") else usage)
+                continue
+            except Exception:
+                pass
+        if module == "numpy" and hasattr(item, "nbytes"):
+            total += getsizeof(item) + (int(item.nbytes) if getattr(item, "base", None) is None else 0)
+            continue
+
+        try:
+            total += getsizeof(item)
+        except TypeError:
+            continue
+        attributes = getattr(item, "__dict__", None)
+        if attributes is not None:
+            pending.append(attributes)
+        for slot in getattr(kind, "__slots__", ()):
+            if hasattr(item, slot):
+                pending.append(getattr(item, slot))
+    return total
+
+
+def key_family(key: str) -> str:
+    """The family a session key belongs to ("show_add_good_Acme" -> "show_add_good_*")."""
+    for prefix in DYNAMIC_KEY_PREFIXES:
+        if key.startswith(prefix):
+            return prefix + "*"
+    return key
+
+
+def measure_state(state: Iterable) -> Dict[str, Dict[str, int]]:
+    """
+    Bytes and key count per key family of a session state.
+
+    state is anything yielding (key, value) pairs through .items(). Objects
+    shared between keys are counted under the first key that reaches them.
+    """
+    seen: Set[int] = set()
+    sizes: Dict[str, Dict[str, int]] = {}
+    for key, value in list(state.items()):
+        entry = sizes.setdefault(key_family(str(key)), {"bytes": 0, "keys": 0})
+        entry["bytes"] += deep_sizeof(value, seen)
+        entry["keys"] += 1
+    return sizes
+
+
+def _growing(values: List[int], min_samples: int, min_growth: int) -> bool:
+    """values never dropped, rose in most steps and grew by at least min_growth."""
+    if len(values) < min_samples:
+        return False
+    steps = list(zip(values, values[1:]))
+    rises = sum(1 for before, after in steps if after > before)
+    never_dropped = all(after >= before for before, after in steps)
+    return never_dropped and rises * 2 >= len(steps) and values[-1] - values[0] >= min_growth
+
+
+class SessionMemoryTracker:
+    """Size samples per session, for totals across sessions and growth reports."""
+
+    def __init__(self, history: int = MEMORY_HISTORY):
+        self.history = history
+        self._samples: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, sizes: Dict[str, Dict[str, int]],
+               at: Optional[float] = None) -> None:
+        """Add a sample (from measure_state) for a session."""
+        sample = {"at": time.time() if at is None else at, "sizes": sizes,
+                  "total": sum(entry["bytes"] for entry in sizes.values())}
+        with self._lock:
+            self._samples.setdefault(session_id, deque(maxlen=self.history)).append(sample)
+
+    def last_sample_at(self, session_id: str) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(session_id)
+            return samples[-1]["at"] if samples else None
+
+    def history_of(self, session_id: str) -> List[Dict[str, Any]]:
+        """The session's samples, oldest first."""
+        with self._lock:
+            return list(self._samples.get(session_id, ()))
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            return list(self._samples)
+
+    def forget(self, session_ids: Iterable[str]) -> None:
+        """Drop samples of sessions that have closed."""
+        with self._lock:
+            for session_id in session_ids:
+                self._samples.pop(session_id, None)
+
+    def totals(self) -> Dict[str, Dict[str, int]]:
+        """
+        Latest bytes and key count per key family, summed over sessions.
+
+        Objects shared between sessions are counted once per session, so
+        this is an upper bound on what the sessions hold together.
+        """
+        with self._lock:
+            latest = [samples[-1]["sizes"] for samples in self._samples.values() if samples]
+        totals: Dict[str, Dict[str, int]] = {}
+        for sizes in latest:
+            for family, entry in sizes.items():
+                total = totals.setdefault(family, {"bytes": 0, "keys": 0, "sessions": 0})
+                total["bytes"] += entry["bytes"]
+                total["keys"] += entry["keys"]
+                total["sessions"] += 1
+        return totals
+
+    def growing_keys(self, session_id: str, min_samples: int = GROWTH_MIN_SAMPLES,
+                     min_bytes: int = GROWTH_MIN_BYTES, min_keys: int = GROWTH_MIN_KEYS) -> List[Dict[str, Any]]:
+        """
+        Key families of a session that keep growing, largest growth first.
+
+        A family is flagged when over its samples its size (or number of keys)
+        never dropped, rose in at least half of the steps and grew by at least
+        min_bytes (or min_keys).
+        """
+        samples = self.history_of(session_id)
+        families = {family for sample in samples for family in sample["sizes"]}
+        flagged = []
+        for family in families:
+            present = [sample["sizes"][family] for sample in samples if family in sample["sizes"]]
+            byte_sizes = [entry["bytes"] for entry in present]
+            key_counts = [entry["keys"] for entry in present]
+            grows_bytes = _growing(byte_sizes, min_samples, min_bytes)
+            grows_keys = _growing(key_counts, min_samples, min_keys)
+            if grows_bytes or grows_keys:
+                flagged.append({
+                    "key": family,
+                    "first_bytes": byte_sizes[0], "last_bytes": byte_sizes[-1],
+                    "growth_bytes": byte_sizes[-1] - byte_sizes[0],
+                    "first_keys": key_counts[0], "last_keys": key_counts[-1],
+                    "samples": len(present)
+                })
+        return sorted(flagged, key=lambda entry: entry["growth_bytes"], reverse=True)
+
+
+# One tracker per process, shared by every session
+TRACKER = SessionMemoryTracker()
@@ -3,14 +3,23 @@ import requests
 from typing import Dict, Optional, Tuple
 from datetime import datetime, timezone
 import streamlit as st
+from pathlib import Path
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.metrics import (
+    observe, record_prices, PRICE_FETCHES, PRICE_FETCH_SECONDS, PRICE_FETCH_LAST_SUCCESS
+)
 
 
 @st.cache_data(ttl=600)  # Cache for 10 minutes (600 seconds)
+@observe(PRICE_FETCH_SECONDS, PRICE_FETCHES, lambda result: "ok" if result[0] else "empty",
+         on_success=PRICE_FETCH_LAST_SUCCESS)
 def fetch_material_prices() -> Tuple[Dict[str, Dict[str, float]], str]:
     """
     Fetch material prices from the Galactic Tycoons API.
     Returns a tuple of (price_dict, timestamp_string).
-    Cached for 10 minutes.
+    Cached for 10 minutes; every real fetch is counted in the metrics, and an
+    empty price dict (API down or bad response) as "empty".
     """
     timestamp = datetime.now(timezone.utc).strftime("%I:%M %p UTC")
     
@@ -35,6 +44,7 @@ def fetch_material_prices() -> Tuple[Dict[str, Dict[str, float]], str]:
                     "avgPrice": item.get("avgPrice", 0) / 100
                 }
         
+        record_prices(price_dict)
         return price_dict, timestamp
     
     except requests.exceptions.RequestException as e:
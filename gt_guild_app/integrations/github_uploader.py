@@ -1,38 +1,100 @@
 """Upload files to GitHub using the API without git credentials."""
 import base64
+import hashlib
+import threading
+import sys
 import requests
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.metrics import observe, GITHUB_PUSHES, GITHUB_PUSH_SECONDS, GITHUB_PUSH_LAST_SUCCESS
 
 
+GITHUB_API_URL = "https://api.github.com"
+
+# Attempts at moving the branch when someone else pushed in between
+MAX_REF_UPDATE_ATTEMPTS = 3
+
+# What we last saw on each remote branch, keyed by (repo API URL, branch):
+# blob SHAs per path, and the head commit / tree for the Git Data API.
+# Refreshed when GitHub reports a conflict.
+_remote_blobs: Dict[Tuple[str, str], Dict[str, str]] = {}
+_remote_heads: Dict[Tuple[str, str], Tuple[str, str]] = {}
+_remote_lock = threading.Lock()
+
+
+def git_blob_sha(data: bytes) -> str:
+    """The SHA git (and GitHub) assigns to a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def forget_remote_state() -> None:
+    """Drop cached remote SHAs so the next push re-reads the branch."""
+    with _remote_lock:
+        _remote_blobs.clear()
+        _remote_heads.clear()
+
+
+def get_github_token() -> Optional[str]:
+    """GitHub token from Streamlit secrets or the GITHUB_TOKEN environment variable."""
+    try:
+        import streamlit as st
+        return st.secrets.get("GITHUB_TOKEN")
+    except:
+        import os
+        return os.environ.get("GITHUB_TOKEN")
+
+
+def repo_relative_path(file_path: str) -> str:
+    """Path of a local file relative to the repository root (e.g. "api_exports/all_goods.json")."""
+    file_path_obj = Path(file_path).resolve()
+    
+    # Find repo root by looking for .git directory
+    repo_root = file_path_obj.parent
+    while repo_root.parent != repo_root:
+        if (repo_root / '.git').exists():
+            break
+        repo_root = repo_root.parent
+    
+    # Get relative path from repo root
+    try:
+        return file_path_obj.relative_to(repo_root).as_posix()
+    except ValueError:
+        # Fallback: assume file_path already contains the right structure
+        if 'api_exports' in str(file_path_obj):
+            return f"api_exports/{file_path_obj.name}"
+        return file_path_obj.name
+
+
+@observe(GITHUB_PUSH_SECONDS, GITHUB_PUSHES, lambda ok: "ok" if ok else "failed",
+         on_success=GITHUB_PUSH_LAST_SUCCESS)
 def push_to_github(
     file_path: str,
     repo_owner: str,
     repo_name: str,
     github_token: Optional[str] = None,
-    commit_message: str = "Auto-update data"
+    commit_message: str = "Auto-update data",
+    api_url: str = GITHUB_API_URL
 ) -> bool:
     """
     Push a file to GitHub using the GitHub API.
     
+    Skipped when the file's blob SHA matches the one last seen on GitHub.
+    
     Args:
         file_path: Local path to the file to upload
         repo_owner: GitHub username/org
         repo_name: Repository name
         github_token: GitHub Personal Access Token (optional, uses env/secrets if not provided)
         commit_message: Commit message
+        api_url: GitHub API base URL
     
     Returns:
-        True if successful, False otherwise
+        True if successful (or already up to date), False otherwise
     """
     if not github_token:
         # Try to get from Streamlit secrets or environment
-        try:
-            import streamlit as st
-            github_token = st.secrets.get("GITHUB_TOKEN")
-        except:
-            import os
-            github_token = os.environ.get("GITHUB_TOKEN")
+        github_token = get_github_token()
     
     if not github_token:
         print("⚠️ No GitHub token found - skipping push")
@@ -41,53 +103,60 @@ def push_to_github(
     try:
         # Read file content
         with open(file_path, 'rb') as f:
-            content = base64.b64encode(f.read()).decode('utf-8')
+            raw = f.read()
         
         # Get relative path for GitHub (e.g., "api_exports/all_goods.json")
-        file_path_obj = Path(file_path).resolve()
+        relative_path = repo_relative_path(file_path)
         
-        # Find repo root by looking for .git directory
-        repo_root = file_path_obj.parent
-        while repo_root.parent != repo_root:
-            if (repo_root / '.git').exists():
-                break
-            repo_root = repo_root.parent
+        repo_url = f"{api_url.rstrip('/')}/repos/{repo_owner}/{repo_name}"
+        key = (repo_url, "main")
+        local_sha = git_blob_sha(raw)
+        with _remote_lock:
+            cached_sha = _remote_blobs.get(key, {}).get(relative_path)
         
-        # Get relative path from repo root
-        try:
-            relative_path = str(file_path_obj.relative_to(repo_root))
-        except ValueError:
-            # Fallback: assume file_path already contains the right structure
-            relative_path = str(file_path_obj.name)
-            if 'api_exports' in str(file_path_obj):
-                relative_path = f"api_exports/{file_path_obj.name}"
+        # Remote copy already identical - nothing to send
+        if cached_sha == local_sha:
+            print(f"{relative_path} unchanged on GitHub, skipped")
+            return True
         
         # GitHub API URL
-        api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{relative_path}"
+        contents_url = f"{repo_url}/contents/{relative_path}"
         
-        # Get current file SHA (needed for updates)
         headers = {
             "Authorization": f"token {github_token}",
             "Accept": "application/vnd.github.v3+json"
         }
         
-        response = requests.get(api_url, headers=headers)
-        sha = response.json().get('sha') if response.status_code == 200 else None
-        
         # Prepare the update
         data = {
             "message": commit_message,
-            "content": content,
+            "content": base64.b64encode(raw).decode('utf-8'),
             "branch": "main"
         }
         
-        if sha:
-            data["sha"] = sha
-        
-        # Push to GitHub
-        response = requests.put(api_url, json=data, headers=headers)
+        # The cached SHA saves the GET; a stale one is refreshed on conflict
+        for sha in (cached_sha, None) if cached_sha else (None,):
+            if sha is None:
+                # Get current file SHA (needed for updates)
+                response = requests.get(contents_url, headers=headers)
+                sha = response.json().get('sha') if response.status_code == 200 else None
+                if sha == local_sha:
+                    _remember_blob(key, relative_path, sha)
+                    print(f"{relative_path} unchanged on GitHub, skipped")
+                    return True
+            
+            if sha:
+                data["sha"] = sha
+            else:
+                data.pop("sha", None)
+            
+            # Push to GitHub
+            response = requests.put(contents_url, json=data, headers=headers)
+            if response.status_code not in (409, 422):
+                break
         
         if response.status_code in [200, 201]:
+            _remember_blob(key, relative_path, response.json().get('content', {}).get('sha', local_sha))
             print(f"✅ Pushed {relative_path} to GitHub")
             return True
         else:
@@ -97,3 +166,180 @@ def push_to_github(
     except Exception as e:
         print(f"❌ Error pushing to GitHub: {e}")
         return False
+
+
+def _remember_blob(key: Tuple[str, str], path: str, sha: str) -> None:
+    with _remote_lock:
+        _remote_blobs.setdefault(key, {})[path] = sha
+
+
+@observe(GITHUB_PUSH_SECONDS, GITHUB_PUSHES, lambda ok: "ok" if ok else "failed",
+         on_success=GITHUB_PUSH_LAST_SUCCESS)
+def push_files_to_github(
+    file_paths: Iterable[str],
+    repo_owner: str,
+    repo_name: str,
+    github_token: Optional[str] = None,
+    commit_message: str = "Auto-update data",
+    branch: str = "main",
+    prune_prefixes: Iterable[str] = (),
+    api_url: str = GITHUB_API_URL
+) -> bool:
+    """
+    Push several files to GitHub as a single commit using the Git Data API.
+    
+    Blob SHAs are computed locally and compared with what was last seen on
+    the branch, so only changed files are uploaded and nothing at all is sent
+    when the remote already matches. The changed blobs go into one tree on top
+    of the branch head, one commit, and a fast-forward of the branch. If the
+    branch moved in the meantime the remote state is re-read and the commit
+    rebuilt on the new head.
+    
+    Args:
+        file_paths: Local paths of the files to upload
+        repo_owner: GitHub username/org
+        repo_name: Repository name
+        github_token: GitHub Personal Access Token (optional, uses env/secrets if not provided)
+        commit_message: Commit message
+        branch: Branch to update
+        prune_prefixes: Remote directories (e.g. "api_exports/goods/") whose files
+            are deleted when they are not among file_paths
+        api_url: GitHub API base URL
+    
+    Returns:
+        True if successful (or nothing to push), False otherwise
+    """
+    if not github_token:
+        github_token = get_github_token()
+    
+    if not github_token:
+        print("⚠️ No GitHub token found - skipping push")
+        return False
+    
+    prune_prefixes = tuple(prune_prefixes)
+    repo_url = f"{api_url.rstrip('/')}/repos/{repo_owner}/{repo_name}"
+    key = (repo_url, branch)
+    
+    try:
+        local = {}
+        for file_path in file_paths:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            local[repo_relative_path(file_path)] = (git_blob_sha(data), data)
+    except OSError as e:
+        print(f"❌ Error pushing to GitHub: {e}")
+        return False
+    
+    with _remote_lock:
+        remote = dict(_remote_blobs[key]) if key in _remote_heads else None
+        head = _remote_heads.get(key)
+    if remote is not None and not _pending_changes(local, remote, prune_prefixes):
+        return True
+    
+    session = requests.Session()
+    session.headers.update({
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    })
+    
+    try:
+        uploaded = set()
+        for attempt in range(MAX_REF_UPDATE_ATTEMPTS):
+            if remote is None:
+                head, remote = _read_branch(session, repo_url, branch)
+                with _remote_lock:
+                    _remote_heads[key] = head
+                    _remote_blobs[key] = dict(remote)
+            head_sha, base_tree = head
+            
+            changed, deleted = _pending_changes(local, remote, prune_prefixes)
+            if not changed and not deleted:
+                print("No changes to push to GitHub")
+                return True
+            
+            # Upload only blobs GitHub does not have yet
+            known = set(remote.values()) | uploaded
+            for path in changed:
+                sha, data = local[path]
+                if sha in known:
+                    continue
+                content = base64.b64encode(data).decode('utf-8')
+                response = session.post(f"{repo_url}/git/blobs", json={"content": content, "encoding": "base64"})
+                response.raise_for_status()
+                uploaded.add(sha)
+                known.add(sha)
+            
+            tree = [{"path": path, "mode": "100644", "type": "blob", "sha": local[path][0]}
+                    for path in changed]
+            tree += [{"path": path, "mode": "100644", "type": "blob", "sha": None}
+                     for path in deleted]
+            
+            response = session.post(f"{repo_url}/git/trees", json={"base_tree": base_tree, "tree": tree})
+            response.raise_for_status()
+            tree_sha = response.json()["sha"]
+            
+            response = session.post(f"{repo_url}/git/commits", json={
+                "message": commit_message,
+                "tree": tree_sha,
+                "parents": [head_sha]
+            })
+            response.raise_for_status()
+            commit_sha = response.json()["sha"]
+            
+            # Fast-forward only; 422 means the branch moved since we read it
+            response = session.patch(f"{repo_url}/git/refs/heads/{branch}", json={"sha": commit_sha, "force": False})
+            if response.status_code == 200:
+                for path in changed:
+                    remote[path] = local[path][0]
+                for path in deleted:
+                    remote.pop(path, None)
+                with _remote_lock:
+                    _remote_heads[key] = (commit_sha, tree_sha)
+                    _remote_blobs[key] = remote
+                print(f"✅ Pushed {len(changed)} changed and {len(deleted)} removed files to GitHub in one commit")
+                return True
+            if response.status_code != 422:
+                print(f"❌ GitHub API error: {response.status_code} - {response.text}")
+                return False
+            print(f"Branch {branch} moved, retrying ({attempt + 1}/{MAX_REF_UPDATE_ATTEMPTS})")
+            remote = None
+        
+        print("❌ Could not fast-forward branch after retries")
+        return False
+    
+    except Exception as e:
+        # The cached state may be what failed us; re-read it next time
+        with _remote_lock:
+            _remote_heads.pop(key, None)
+            _remote_blobs.pop(key, None)
+        print(f"❌ Error pushing to GitHub: {e}")
+        return False
+    finally:
+        session.close()
+
+
+def _pending_changes(local: Dict[str, Tuple[str, bytes]], remote: Dict[str, str],
+                     prune_prefixes: tuple) -> Tuple[List[str], List[str]]:
+    """Local paths whose blob differs from the remote, and remote paths to prune."""
+    changed = sorted(path for path, (sha, _) in local.items() if remote.get(path) != sha)
+    deleted = sorted(path for path in remote
+                     if prune_prefixes and path.startswith(prune_prefixes) and path not in local)
+    return changed, deleted
+
+
+def _read_branch(session: requests.Session, repo_url: str,
+                 branch: str) -> Tuple[Tuple[str, str], Dict[str, str]]:
+    """Head commit and tree of a branch, and the blob SHA of every file in it."""
+    response = session.get(f"{repo_url}/git/ref/heads/{branch}")
+    response.raise_for_status()
+    head_sha = response.json()["object"]["sha"]
+    
+    response = session.get(f"{repo_url}/git/commits/{head_sha}")
+    response.raise_for_status()
+    tree_sha = response.json()["tree"]["sha"]
+    
+    response = session.get(f"{repo_url}/git/trees/{tree_sha}", params={"recursive": "1"})
+    response.raise_for_status()
+    files = {item["path"]: item["sha"] for item in response.json().get("tree", [])
+             if item.get("type") == "blob"}
+    return (head_sha, tree_sha), files
@@ -1,8 +1,59 @@
 """Google Sheets integration for importing guild data."""
+import csv
+import hashlib
+import io
+import json
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from typing import Optional
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
 import re
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.metrics import observe, SHEET_IMPORTS, SHEET_IMPORT_SECONDS, SHEET_SOURCE_FAILURES
+
+
+# Zero-based positions of the sheet columns the importer reads
+SHEET_COLUMNS = {
+    'company': 0,                # A: Company name
+    'industry': 1,               # B: Industry/Professions
+    'timezone': 2,               # C: Timezone
+    'good': 11,                  # L: Produced Goods
+    'planet': 13,                # N: Planet Produced
+    'guild_max': 17,             # R: Guild Max
+    'guild_min': 18,             # S: Guild Min
+    'guild_discount': 19,        # T: Guild % Discount
+    'guild_fixed_discount': 20,  # U: Guild Fixed Discount (optional)
+}
+
+PRICE_COLUMNS = ['guild_max', 'guild_min', 'guild_discount', 'guild_fixed_discount']
+
+PROFESSION_PLACEHOLDERS = {'select profession(s)', 'select profession', 'unknown', ''}
+GOOD_PLACEHOLDERS = {'select good', 'select goods', 'select product', ''}
+
+# Same empty-cell spellings pandas.read_csv treats as missing
+NULL_VALUES = pa_csv.ConvertOptions().null_values + ['None', '<NA>']
+
+# Outcomes of import_from_google_sheet_if_changed
+IMPORT_CHANGED = "changed"
+IMPORT_UNCHANGED = "unchanged"
+IMPORT_FAILED = "failed"
+
+# Upper bound on sheets/tabs fetched at the same time
+MAX_IMPORT_WORKERS = 8
+
+# Content hashes (and parsed companies) of the last successful import per sheet
+# URL, shared by all sessions. Changed imports wait in _pending_imports until
+# the caller has applied and saved them (commit_import), so a failed apply is
+# retried on the next poll instead of being skipped as unchanged.
+_last_import_hashes: Dict[str, Dict[str, Any]] = {}
+_pending_imports: Dict[str, Dict[str, Any]] = {}
+_last_import_lock = threading.Lock()
 
 
 def extract_sheet_id(url: str) -> Optional[str]:
@@ -19,33 +70,129 @@ def extract_gid(url: str) -> Optional[str]:
     return match.group(1) if match else '0'
 
 
-def fetch_google_sheet(sheet_url: str) -> Optional[pd.DataFrame]:
+def with_gid(url: str, gid: str) -> str:
+    """Point a Google Sheets URL at a specific tab."""
+    if re.search(r'gid=\d+', url):
+        return re.sub(r'gid=\d+', f'gid={gid}', url)
+    return f"{url}#gid={gid}"
+
+
+def parse_sheet_sources(sources: Any) -> List[str]:
     """
-    Fetch data from a public Google Sheet.
-    The sheet must be publicly accessible (Share > Anyone with the link can view).
+    Normalize configured sheet sources into a list of tab URLs.
+    
+    Accepts a single URL, a comma/newline separated string of URLs, or a list
+    whose entries are URLs or {"url": ..., "gids": [...]} tables (one source per
+    tab). Duplicates are dropped; the order is kept since it decides merge
+    precedence.
     """
+    if not sources:
+        return []
+    if isinstance(sources, (str, dict)):
+        sources = [sources]
+    
+    urls = []
+    for source in sources:
+        if isinstance(source, dict):
+            url = str(source.get('url', '')).strip()
+            gids = source.get('gids') or []
+            if gids:
+                urls.extend(with_gid(url, str(gid)) for gid in gids)
+            else:
+                urls.append(url)
+        else:
+            urls.extend(u.strip() for u in re.split(r'[,\n]', str(source)))
+    
+    return [u for u in dict.fromkeys(urls) if u]
+
+
+def sheet_csv_url(sheet_url: str) -> Optional[str]:
+    """Build the CSV export URL for the sheet tab referenced by a Google Sheets URL."""
     sheet_id = extract_sheet_id(sheet_url)
     gid = extract_gid(sheet_url)
     
     if not sheet_id:
         return None
     
-    # Construct CSV export URL
-    csv_url = f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+    return f"https://docs.google.com/spreadsheets/d/{sheet_id}/export?format=csv&gid={gid}"
+
+
+def download_sheet_csv(sheet_url: str) -> Optional[bytes]:
+    """
+    Download the raw CSV export of a public Google Sheet.
+    The sheet must be publicly accessible (Share > Anyone with the link can view).
+    """
+    csv_url = sheet_csv_url(sheet_url)
+    if not csv_url:
+        return None
     
     try:
         response = requests.get(csv_url, timeout=30)
         response.raise_for_status()
-        
-        # Parse CSV data
-        from io import StringIO
-        df = pd.read_csv(StringIO(response.text))
-        return df
+        return response.content
     except Exception as e:
         print(f"Error fetching Google Sheet: {e}")
         return None
 
 
+def _count_columns(data: bytes) -> int:
+    """Number of fields in the first CSV record."""
+    head = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='replace', newline='')
+    return len(next(csv.reader(head), []))
+
+
+def read_sheet_csv(data: bytes) -> Optional[pd.DataFrame]:
+    """
+    Parse a sheet's CSV export with Arrow's multithreaded reader.
+    
+    Only the importer's columns (SHEET_COLUMNS) are read, all as strings, and
+    they come back named rather than positional. The first line is skipped
+    like a pandas header row. Returns None when the pricing columns (R-T) are
+    missing.
+    """
+    ncols = _count_columns(data)
+    if ncols <= SHEET_COLUMNS['guild_discount']:
+        print("Sheet does not contain the pricing columns (R-T)")
+        return None
+    
+    present = {name: f"f{position}" for name, position in SHEET_COLUMNS.items() if position < ncols}
+    table = pa_csv.read_csv(
+        pa.py_buffer(data),
+        read_options=pa_csv.ReadOptions(
+            use_threads=True, skip_rows=1, column_names=[f"f{i}" for i in range(ncols)]
+        ),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=list(present.values()),
+            column_types={field: pa.string() for field in present.values()},
+            null_values=NULL_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    
+    sheet = table.rename_columns(list(present.keys())).to_pandas()
+    for name in SHEET_COLUMNS:
+        if name not in sheet.columns:
+            sheet[name] = None
+    return sheet[list(SHEET_COLUMNS)]
+
+
+def fetch_google_sheet(sheet_url: str) -> Optional[pd.DataFrame]:
+    """
+    Fetch the importer's columns from a public Google Sheet.
+    The sheet must be publicly accessible (Share > Anyone with the link can view).
+    """
+    data = download_sheet_csv(sheet_url)
+    if data is None:
+        return None
+    
+    try:
+        return read_sheet_csv(data)
+    except Exception as e:
+        print(f"Error parsing Google Sheet: {e}")
+        return None
+
+
 def parse_goods_column(goods_str: str) -> list:
     """Parse comma-separated goods into a list."""
     if pd.isna(goods_str) or not goods_str:
@@ -56,6 +203,168 @@ def parse_goods_column(goods_str: str) -> list:
     return [g for g in goods if g]
 
 
+def _stripped(values: pd.Series) -> pd.Series:
+    """Stripped string version of a column, NaN where the cell is empty."""
+    return values.astype(str).str.strip().where(values.notna())
+
+
+def _float_or_zero(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
+
+def parse_price_column(values: pd.Series) -> pd.Series:
+    """Parse currency/percent cells like '$1,234' or '15%' to floats (missing -> 0)."""
+    text = values.astype(str).str.replace(r'[$%,]', '', regex=True).str.strip()
+    parsed = pd.to_numeric(text, errors='coerce')
+    
+    # Python's float() accepts a few spellings to_numeric does not
+    retry = parsed.isna() & text.ne('') & values.notna()
+    if retry.any():
+        parsed[retry] = text[retry].map(_float_or_zero)
+    
+    parsed[values.isna() | text.eq('')] = 0.0
+    return parsed.astype('float64')
+
+
+def parse_professions(industry: str) -> List[str]:
+    """Split an industry cell on commas, newlines, '&' and ' and ', dropping placeholders."""
+    if not industry or industry == "Unknown":
+        return []
+    prof_list = industry.replace('\n', ',').replace('&', ',').replace(' and ', ',').split(',')
+    return [p.strip() for p in prof_list if p.strip().lower() not in PROFESSION_PLACEHOLDERS]
+
+
+def parse_guild_sheet(sheet: pd.DataFrame, valid_materials: Set[str]) -> Optional[list]:
+    """
+    Parse the importer's columns (see SHEET_COLUMNS) into company dictionaries.
+    
+    Company, industry and timezone are carried forward from each company row to the
+    rows below it until the next company or "Company Name" header row. Rows are kept
+    when they carry a known material in column L and parseable prices.
+    """
+    # Find the header row (contains "Company Name") within the first 100 rows
+    first_rows = sheet['company'].iloc[:100]
+    header_hits = (_stripped(first_rows) == "Company Name").to_numpy()
+    if not header_hits.any():
+        print("Could not find header row with 'Company Name' in column A")
+        return None
+    
+    rows = sheet.iloc[int(header_hits.argmax()) + 1:].reset_index(drop=True)
+    if rows.empty:
+        return None
+    
+    company = _stripped(rows['company'])
+    is_header = company.eq("Company Name")
+    is_company = company.notna() & company.ne("") & ~is_header
+    
+    # Every company or header row opens a new block; header blocks have no company
+    block = (is_company | is_header).cumsum()
+    block_info = pd.DataFrame({
+        'name': company,
+        'industry': _stripped(rows['industry']).fillna("Unknown"),
+        'timezone': _stripped(rows['timezone']).fillna("UTC +00:00"),
+    })[is_company]
+    block_info.index = block[is_company]
+    row_company = pd.Series(block_info['name'].reindex(block).to_numpy())
+    in_context = row_company.notna() & ~is_header
+    
+    # Additional professions listed in column B below the company row
+    extra_prof = _stripped(rows['industry'])
+    is_extra_prof = (
+        in_context & rows['company'].isna() & extra_prof.notna() &
+        ~extra_prof.str.lower().isin(PROFESSION_PLACEHOLDERS)
+    )
+    
+    good = _stripped(rows['good'])
+    is_good = (
+        in_context & good.notna() &
+        ~good.str.lower().isin(GOOD_PLACEHOLDERS) & good.isin(valid_materials)
+    )
+    
+    prices = {name: parse_price_column(rows[name]) for name in PRICE_COLUMNS}
+    # Rows whose prices parse to inf/nan still register their company, but not the good
+    finite = np.logical_and.reduce([np.isfinite(p.to_numpy()) for p in prices.values()])
+    
+    if not is_good.any():
+        return None
+    
+    planet = _stripped(rows['planet']).fillna('')
+    planet = planet.where(planet.str.lower() != 'select planet', '')
+    
+    goods = pd.DataFrame({
+        'company': row_company,
+        'block': block,
+        'finite': finite,
+        'Produced Goods': good,
+        'Planet Produced': planet,
+        # Non-finite prices are zeroed here; those rows are dropped below
+        **{name: np.where(finite, np.trunc(p.to_numpy()), 0).astype('int64') for name, p in prices.items()},
+    })[is_good]
+    
+    extra_by_block = extra_prof[is_extra_prof].groupby(block[is_extra_prof])
+    extra_by_block = {b: list(zip(profs.index, profs)) for b, profs in extra_by_block}
+    
+    # Pull the goods columns out once; companies index into them by position
+    row_index = goods.index.tolist()
+    row_block = goods['block'].tolist()
+    row_finite = goods['finite'].tolist()
+    records = list(zip(
+        goods['Produced Goods'].tolist(),
+        goods['Planet Produced'].tolist(),
+        *[goods[name].tolist() for name in PRICE_COLUMNS]
+    ))
+    groups = goods.groupby('company', sort=False).indices
+    
+    companies = []
+    for company_name in pd.unique(goods['company']):
+        positions = groups[company_name]
+        
+        # Company details come from the block where its first good appears
+        first_row = row_index[positions[0]]
+        first_block = row_block[positions[0]]
+        info = block_info.loc[first_block]
+        
+        professions = parse_professions(info['industry'])
+        has_professions_at_first_good = bool(professions)
+        for row_idx, prof in extra_by_block.get(first_block, []):
+            if prof not in professions:
+                professions.append(prof)
+            if row_idx <= first_row:
+                has_professions_at_first_good = bool(professions)
+        
+        company_goods = []
+        for position in positions:
+            if not row_finite[position]:
+                continue
+            good_name, planet_produced, guild_max, guild_min, guild_discount, guild_fixed_discount = records[position]
+            company_goods.append({
+                'Produced Goods': good_name,
+                'Planet Produced': planet_produced,
+                'Guildees Pay:': 0,  # Not specified in sheet mapping
+                'Live EXC Price': 0,  # Will be updated from API
+                'Live AVG Price': 0,  # Will be updated from API
+                'Guild Max': guild_max,
+                'Guild Min': guild_min,
+                'Guild % Discount': guild_discount,
+                'Guild Fixed Discount': guild_fixed_discount
+            })
+        
+        companies.append({
+            'name': company_name,
+            'industry': info['industry'],
+            # Use parsed professions or fall back to industry
+            'professions': professions if has_professions_at_first_good else [info['industry']],
+            'timezone': info['timezone'],
+            'local_time': 'N/A',  # Will be calculated
+            'goods': company_goods
+        })
+    
+    return companies if companies else None
+
+
 def import_from_google_sheet(sheet_url: str) -> Optional[list]:
     """
     Import guild data from Google Sheet.
@@ -80,155 +389,181 @@ def import_from_google_sheet(sheet_url: str) -> Optional[list]:
     from core.data_manager import load_game_materials
     valid_materials = set(load_game_materials())
     
-    df = fetch_google_sheet(sheet_url)
+    sheet = fetch_google_sheet(sheet_url)
     
-    if df is None:
+    if sheet is None:
         return None
     
-    # Find the header row (contains "Company Name")
-    header_row_idx = None
-    for idx in range(min(100, len(df))):
-        if pd.notna(df.iloc[idx, 0]) and str(df.iloc[idx, 0]).strip() == "Company Name":
-            header_row_idx = idx
-            break
+    return parse_guild_sheet(sheet, valid_materials)
+
+
+def hash_companies(companies: list) -> str:
+    """Content hash of parsed company data."""
+    data_str = json.dumps(companies, sort_keys=True, default=str)
+    return hashlib.sha256(data_str.encode()).hexdigest()
+
+
+def _import_source(sheet_url: str, valid_materials: Set[str]) -> Tuple[Optional[list], str]:
+    """
+    Fetch and parse one sheet tab, skipping the parse when its content is unchanged.
     
-    if header_row_idx is None:
-        print("Could not find header row with 'Company Name' in column A")
-        return None
+    Unlike import_from_google_sheet_if_changed, unchanged sources return their
+    last parsed companies so multi-source imports can re-merge them.
+    """
+    data = download_sheet_csv(sheet_url)
+    if data is None:
+        return None, IMPORT_FAILED
     
-    # Group goods by company
-    companies_dict = {}
-    current_company = None
-    current_industry = None
-    current_professions = []
-    current_timezone = None
-    
-    # Iterate through data rows (starting after header)
-    processed_rows = 0
-    skipped_rows = 0
-    companies_found = set()
-    
-    for idx in range(header_row_idx + 1, len(df)):
-        try:
-            company_name_cell = df.iloc[idx, 0] if len(df.iloc[idx]) > 0 else None  # Column A
-            
-            # Check if this is a header row (reset context)
-            if pd.notna(company_name_cell) and str(company_name_cell).strip() == "Company Name":
-                current_company = None
-                current_industry = None
-                current_professions = []
-                current_timezone = None
-                continue
-            
-            # Check if this row has a new company name
-            if pd.notna(company_name_cell) and str(company_name_cell).strip():
-                current_company = str(company_name_cell).strip()
-                companies_found.add(current_company)
-                
-                # Parse industry/professions (can be comma-separated)
-                industry_str = str(df.iloc[idx, 1]).strip() if len(df.iloc[idx]) > 1 and pd.notna(df.iloc[idx, 1]) else "Unknown"  # Column B
-                current_industry = industry_str
-                
-                # Parse professions - split by comma, newline, or &
-                current_professions = []
-                if industry_str and industry_str != "Unknown":
-                    prof_list = industry_str.replace('\n', ',').replace('&', ',').replace(' and ', ',').split(',')
-                    current_professions = [p.strip() for p in prof_list if p.strip() and p.strip().lower() not in ['select profession(s)', 'select profession', 'unknown', '']]
-                
-                current_timezone = str(df.iloc[idx, 2]).strip() if len(df.iloc[idx]) > 2 and pd.notna(df.iloc[idx, 2]) else "UTC +00:00"  # Column C
-            
-            # Skip if we don't have a current company context
-            if not current_company:
-                skipped_rows += 1
-                continue
-            
-            # Check for additional profession in column B (on rows where column A is empty)
-            profession_cell = df.iloc[idx, 1] if len(df.iloc[idx]) > 1 else None  # Column B
-            if pd.notna(profession_cell) and str(profession_cell).strip() and pd.isna(company_name_cell):
-                # This is an additional profession for the current company
-                prof = str(profession_cell).strip()
-                # Skip placeholder text
-                if prof not in current_professions and prof.lower() not in ['select profession(s)', 'select profession', 'unknown', '']:
-                    current_professions.append(prof)
-            
-            company_name = current_company
-            industry = current_industry
-            professions = current_professions
-            timezone = current_timezone
-            
-            # Get goods info for this row - COLUMN L (0-indexed: 11)
-            good_name = df.iloc[idx, 11] if len(df.iloc[idx]) > 11 else ""  # Column L
-            
-            # Skip if no good name (must check before any other processing)
-            if pd.isna(good_name) or not str(good_name).strip():
-                continue
-            
-            good_name = str(good_name).strip()
-            
-            # Skip placeholder text for goods
-            if good_name.lower() in ['select good', 'select goods', 'select product', '']:
-                continue
-            
-            # Validate good is in game materials list
-            if good_name not in valid_materials:
+    raw_hash = hashlib.sha256(data).hexdigest()
+    with _last_import_lock:
+        last = _last_import_hashes.get(sheet_url, {})
+        pending = _pending_imports.get(sheet_url, {})
+    if last.get('raw') == raw_hash:
+        return last['companies'], IMPORT_UNCHANGED
+    if pending.get('raw') == raw_hash:
+        # Parsed before but not applied yet: report it as changed again
+        return pending['companies'], IMPORT_CHANGED
+    
+    try:
+        sheet = read_sheet_csv(data)
+    except Exception as e:
+        print(f"Error parsing Google Sheet: {e}")
+        return None, IMPORT_FAILED
+    
+    companies = parse_guild_sheet(sheet, valid_materials) if sheet is not None else None
+    if not companies:
+        return None, IMPORT_FAILED
+    
+    parsed_hash = hash_companies(companies)
+    entry = {'raw': raw_hash, 'parsed': parsed_hash, 'companies': companies}
+    with _last_import_lock:
+        if last.get('parsed') == parsed_hash:
+            # Same companies as already applied: nothing for the caller to save
+            _last_import_hashes[sheet_url] = entry
+            _pending_imports.pop(sheet_url, None)
+            return companies, IMPORT_UNCHANGED
+        _pending_imports[sheet_url] = entry
+    return companies, IMPORT_CHANGED
+
+
+def import_from_google_sheet_if_changed(sheet_url: str,
+                                        valid_materials: Optional[Set[str]] = None) -> Tuple[Optional[list], str]:
+    """
+    Import guild data only if the sheet changed since the last import.
+    
+    The raw CSV bytes are hashed first, so an untouched sheet is not parsed at
+    all; if the bytes changed but the parsed companies did not (e.g. edits in
+    columns the importer ignores) the import is still reported as unchanged.
+    
+    Returns (companies, status) where status is IMPORT_CHANGED, IMPORT_UNCHANGED
+    or IMPORT_FAILED. Companies are only returned for IMPORT_CHANGED; call
+    commit_import once they are saved, or the sheet is reported as changed again.
+    """
+    if valid_materials is None:
+        from core.data_manager import load_game_materials
+        valid_materials = set(load_game_materials())
+    
+    companies, status = _import_source(sheet_url, valid_materials)
+    return (companies, status) if status == IMPORT_CHANGED else (None, status)
+
+
+def merge_companies(sources: List[List[dict]]) -> list:
+    """
+    Merge company lists from several sources in precedence order.
+    
+    - A company's industry and timezone come from the first source listing it
+    - Professions are combined, in source order
+    - Goods are combined; a good already listed for the company by an earlier
+      source wins and the later source's rows for it are dropped
+    """
+    merged = {}
+    for companies in sources:
+        # Goods names each company had before this source, so duplicates
+        # within one source (e.g. the same good on two planets) are kept
+        known_goods = {name: {g['Produced Goods'] for g in c['goods']} for name, c in merged.items()}
+        for company in companies:
+            name = company['name']
+            if name not in merged:
+                merged[name] = {**company, 'professions': list(company['professions']),
+                                'goods': list(company['goods'])}
                 continue
             
-            processed_rows += 1
-            planet_produced = df.iloc[idx, 13] if len(df.iloc[idx]) > 13 else ""  # Column N (0-indexed: 13)
-            
-            # Parse planet produced, filter out placeholder
-            if pd.notna(planet_produced):
-                planet_produced = str(planet_produced).strip()
-                if planet_produced.lower() == 'select planet':
-                    planet_produced = ''
-            else:
-                planet_produced = ''
-            
-            # Get pricing info - remove $ signs and % signs
-            def parse_price(val):
-                if pd.isna(val):
-                    return 0
-                val_str = str(val).replace('$', '').replace('%', '').replace(',', '').strip()
-                try:
-                    return float(val_str) if val_str else 0
-                except:
-                    return 0
-            
-            guildees_pay = 0  # Not specified in sheet mapping, defaulting to 0
-            guild_max = parse_price(df.iloc[idx, 17])  # Column R (0-indexed: 17)
-            guild_min = parse_price(df.iloc[idx, 18])  # Column S (0-indexed: 18)
-            guild_discount = parse_price(df.iloc[idx, 19])  # Column T (0-indexed: 19)
-            guild_fixed_discount = parse_price(df.iloc[idx, 20]) if len(df.iloc[idx]) > 20 else 0  # Column U (0-indexed: 20)
-            
-            # Initialize company entry if not exists
-            if company_name not in companies_dict:
-                companies_dict[company_name] = {
-                    'name': company_name,
-                    'industry': industry,
-                    'professions': professions if professions else [industry],  # Use parsed professions or fall back to industry
-                    'timezone': timezone,
-                    'local_time': 'N/A',  # Will be calculated
-                    'goods': []
-                }
-            
-            # Add this good to the company
-            companies_dict[company_name]['goods'].append({
-                'Produced Goods': good_name,
-                'Planet Produced': planet_produced,
-                'Guildees Pay:': int(guildees_pay) if guildees_pay else 0,
-                'Live EXC Price': 0,  # Will be updated from API
-                'Live AVG Price': 0,  # Will be updated from API
-                'Guild Max': int(guild_max),
-                'Guild Min': int(guild_min),
-                'Guild % Discount': int(guild_discount),
-                'Guild Fixed Discount': int(guild_fixed_discount)
-            })
-        
-        except Exception as e:
-            print(f"Error processing row {idx}: {e}")
-            continue
+            target = merged[name]
+            for prof in company['professions']:
+                if prof not in target['professions']:
+                    target['professions'].append(prof)
+            earlier = known_goods.get(name, set())
+            target['goods'].extend(g for g in company['goods'] if g['Produced Goods'] not in earlier)
+    
+    return list(merged.values())
+
+
+@observe(SHEET_IMPORT_SECONDS, SHEET_IMPORTS, lambda result: result[1], label="status")
+def import_from_google_sheets_if_changed(sheet_urls: List[str],
+                                         valid_materials: Optional[Set[str]] = None,
+                                         max_workers: int = MAX_IMPORT_WORKERS) -> Tuple[Optional[list], str]:
+    """
+    Import and merge guild data from several sheets/tabs if any of them changed.
     
-    # Convert dict to list
-    companies = list(companies_dict.values())
+    Sources are fetched and parsed concurrently, so a refresh takes about as
+    long as the slowest source. Results are merged in the order of sheet_urls
+    (see merge_companies), independent of which download finishes first.
     
-    return companies if companies else None
+    A failed source falls back to its last successful import; if it has none,
+    the whole import fails rather than dropping that source's companies.
+    
+    Returns (companies, status) like import_from_google_sheet_if_changed,
+    including the need to commit_import(sheet_urls) after a successful save.
+    """
+    if not sheet_urls:
+        return None, IMPORT_FAILED
+    
+    if valid_materials is None:
+        from core.data_manager import load_game_materials
+        valid_materials = set(load_game_materials())
+    
+    workers = max(1, min(max_workers, len(sheet_urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sheet-import") as pool:
+        results = list(pool.map(lambda url: _import_source(url, valid_materials), sheet_urls))
+    
+    sources = []
+    changed = False
+    for url, (companies, status) in zip(sheet_urls, results):
+        if status == IMPORT_FAILED:
+            SHEET_SOURCE_FAILURES.inc()
+            with _last_import_lock:
+                companies = _last_import_hashes.get(url, {}).get('companies')
+            if companies is None:
+                print(f"Google Sheet import failed with no previous data: {url}")
+                return None, IMPORT_FAILED
+            print(f"Google Sheet import failed, reusing last import: {url}")
+        changed = changed or status == IMPORT_CHANGED
+        sources.append(companies)
+    
+    if not changed:
+        return None, IMPORT_UNCHANGED
+    return merge_companies(sources), IMPORT_CHANGED
+
+
+def commit_import(sheet_urls: List[str]) -> None:
+    """
+    Record the pending imports of these sheets as applied, so unchanged
+    content is skipped from the next poll on. Call after the imported
+    companies were saved.
+    """
+    with _last_import_lock:
+        for url in sheet_urls:
+            entry = _pending_imports.pop(url, None)
+            if entry is not None:
+                _last_import_hashes[url] = entry
+
+
+def forget_last_import(sheet_url: Optional[str] = None) -> None:
+    """Drop remembered import hashes so the next import is processed in full."""
+    with _last_import_lock:
+        if sheet_url is None:
+            _last_import_hashes.clear()
+            _pending_imports.clear()
+        else:
+            _last_import_hashes.pop(sheet_url, None)
+            _pending_imports.pop(sheet_url, None)
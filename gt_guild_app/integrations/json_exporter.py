@@ -1,108 +1,667 @@
 """Export data to public JSON file for GitHub raw content access."""
+import gzip
+import hashlib
 import json
+import os
+import re
+import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
+import numpy as np
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.change_set import COMPANY_FIELDS, GOODS_FIELDS, compute_change_set, touched_companies, touched_goods
 
+try:
+    import orjson
+except ImportError:  # Optional fast encoder
+    orjson = None
 
-def export_to_public_json(companies: List[Dict[str, Any]], export_dir: str = "api_exports"):
-    """Export comprehensive data to JSON files: all_goods.json and all_companies.json."""
+try:
+    import brotli
+except ImportError:  # Optional .br variants
+    brotli = None
+
+
+EXPORT_FILES = ("all_goods.json", "all_companies.json")
+
+# Flattened listing table for analytics: one row per company listing of a good,
+# in all_goods.json order (good name, then cheapest pay)
+TABLE_FILES = ("listings.parquet", "listings.arrow")
+
+LISTING_SCHEMA = pa.schema([
+    pa.field("company", pa.string(), nullable=False),
+    pa.field("good", pa.string(), nullable=False),
+    pa.field("planet_produced", pa.string()),
+    pa.field("guildees_pay", pa.float64()),
+    pa.field("live_exc_price", pa.float64()),
+    pa.field("live_avg_price", pa.float64()),
+    pa.field("guild_max", pa.float64()),
+    pa.field("guild_min", pa.float64()),
+    pa.field("discount_percent", pa.float64()),
+    pa.field("discount_fixed", pa.float64()),
+    pa.field("professions", pa.list_(pa.string())),
+    pa.field("timezone", pa.string()),
+])
+
+# One small file per good / company, listed with hashes and sizes in the manifest
+SHARD_DIRS = {"good": "goods", "company": "companies"}
+MANIFEST_FILE = "manifest.json"
+
+# Precompressed siblings written next to each export ("br" needs the brotli package)
+PRECOMPRESSED_FORMATS = ("gz", "br")
+
+# Goods fields that feed the exported documents, including derived prices
+EXPORT_GOODS_FIELDS = GOODS_FIELDS + ('Guildees Pay:', 'Live EXC Price', 'Live AVG Price')
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+# Per export directory: encoded sections, payload hashes and the companies
+# they were built from, so later exports only rebuild what changed
+_export_state: Dict[str, Dict[str, Any]] = {}
+_export_lock = threading.Lock()
+
+
+def encode_json(obj: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return _encoder.encode(obj).encode('utf-8')
+
+
+def _target_paths(path: Path, precompressed: Iterable[str]) -> List[Tuple[Path, Optional[str]]]:
+    """The file and its precompressed siblings as (path, format) pairs."""
+    targets = [(path, None)]
+    for fmt in precompressed:
+        if fmt == "br" and brotli is None:
+            continue
+        if fmt not in PRECOMPRESSED_FORMATS:
+            raise ValueError(f"Unknown compression format: {fmt}")
+        targets.append((path.with_name(f"{path.name}.{fmt}"), fmt))
+    return targets
+
+
+class _AtomicSinks:
+    """
+    Write the same byte stream to a file and its precompressed siblings.
+
+    Everything goes to temporary files in the target directory, which replace
+    the real files only once the whole document has been written, so readers
+    never see a partial export.
+    """
+
+    def __init__(self, path: Path, precompressed: Iterable[str]):
+        self.path = path
+        self.targets = _target_paths(path, precompressed)
+
+        self.files = []
+        self.gzip_streams = {}
+        self.brotli = None
+        for target, fmt in self.targets:
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{target.name}.", suffix=".tmp")
+            handle = os.fdopen(fd, "wb")
+            self.files.append((handle, tmp, target))
+            if fmt == "gz":
+                # Fixed mtime and no file name keep the bytes reproducible
+                self.gzip_streams[target] = gzip.GzipFile(filename="", mode="wb", fileobj=handle,
+                                                          compresslevel=9, mtime=0)
+            elif fmt == "br":
+                self.brotli = (brotli.Compressor(mode=brotli.MODE_TEXT, quality=11), handle)
+
+    def write(self, chunk: bytes) -> None:
+        self.files[0][0].write(chunk)
+        for stream in self.gzip_streams.values():
+            stream.write(chunk)
+        if self.brotli:
+            compressor, handle = self.brotli
+            handle.write(compressor.process(chunk))
+
+    def commit(self) -> List[Path]:
+        for stream in self.gzip_streams.values():
+            stream.close()
+        if self.brotli:
+            compressor, handle = self.brotli
+            handle.write(compressor.finish())
+        for handle, tmp, target in self.files:
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, target)
+        return [target for target, _ in self.targets]
+
+    def abort(self) -> None:
+        for handle, tmp, _ in self.files:
+            handle.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+def write_json_document(path: Path, header: Dict[str, Any], items: Iterable[Any],
+                        items_key: str = "data",
+                        precompressed: Iterable[str] = PRECOMPRESSED_FORMATS) -> List[Path]:
+    """
+    Stream ``{**header, items_key: [items...]}`` to path as compact JSON.
+
+    Items are encoded one at a time, so the document is never built as a whole
+    string. The file and its precompressed siblings are replaced atomically.
+    Returns the paths written.
+    """
+    return _write_encoded(path, header, (encode_json(item) for item in items), items_key, precompressed)
+
+
+def _write_encoded(path: Path, header: Dict[str, Any], chunks: Iterable[bytes],
+                   items_key: str, precompressed: Iterable[str]) -> List[Path]:
+    """write_json_document for items that are already encoded."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sinks = _AtomicSinks(path, precompressed)
+    try:
+        sinks.write(b"{")
+        for key, value in header.items():
+            sinks.write(encode_json(key) + b":" + encode_json(value) + b",")
+        sinks.write(encode_json(items_key) + b":[")
+        for i, chunk in enumerate(chunks):
+            sinks.write(b"," + chunk if i else chunk)
+        sinks.write(b"]}")
+        return sinks.commit()
+    except BaseException:
+        sinks.abort()
+        raise
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """Atomically replace path with data."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sinks = _AtomicSinks(path, ())
+    try:
+        sinks.write(data)
+        sinks.commit()
+    except BaseException:
+        sinks.abort()
+        raise
+
+
+def exported_files(export_dir: str = "api_exports") -> List[Path]:
+    """Existing export files: documents, their precompressed siblings, tables, shards and the manifest."""
     export_path = Path(export_dir)
-    export_path.mkdir(parents=True, exist_ok=True)
-    
-    # Build comprehensive goods data with all listings sorted by price
-    goods_data = {}
-    for company in companies:
+    paths = []
+    for name in EXPORT_FILES:
+        for suffix in ("",) + tuple(f".{fmt}" for fmt in PRECOMPRESSED_FORMATS):
+            path = export_path / f"{name}{suffix}"
+            if path.exists():
+                paths.append(path)
+    paths.extend(export_path / name for name in TABLE_FILES if (export_path / name).exists())
+    for directory in SHARD_DIRS.values():
+        paths.extend(sorted((export_path / directory).glob("*.json")))
+    if (export_path / MANIFEST_FILE).exists():
+        paths.append(export_path / MANIFEST_FILE)
+    return paths
+
+
+# Keys of a listing in all_goods.json; company goods in all_companies.json use the middle ones
+LISTING_KEYS = ('company', 'good', 'planet_produced', 'guildees_pay', 'live_exc_price', 'live_avg_price',
+                'guild_max', 'guild_min', 'discount_percent', 'discount_fixed', 'timezone', 'professions')
+COMPANY_GOOD_KEYS = LISTING_KEYS[1:-2]
+
+
+def _good_listing(company: Dict[str, Any], good: Dict[str, Any]) -> Dict[str, Any]:
+    """One company's listing of a good in all_goods.json."""
+    return {
+        'company': company['name'],
+        'good': good.get('Produced Goods', ''),
+        'planet_produced': good.get('Planet Produced', ''),
+        'guildees_pay': good.get('Guildees Pay:', 0),
+        'live_exc_price': good.get('Live EXC Price', 0),
+        'live_avg_price': good.get('Live AVG Price', 0),
+        'guild_max': good.get('Guild Max', 0),
+        'guild_min': good.get('Guild Min', 0),
+        'discount_percent': good.get('Guild % Discount', 0),
+        'discount_fixed': good.get('Guild Fixed Discount', 0),
+        'timezone': company.get('timezone', 'UTC +00:00'),
+        'professions': company.get('professions', [])
+    }
+
+
+def _flatten_listings(companies: List[Dict[str, Any]], goods_filter: Optional[set] = None,
+                      companies_filter: Optional[set] = None) -> Dict[str, list]:
+    """
+    Flatten companies into one listing table (column lists), in company/goods order.
+
+    Rows feed all_goods.json when the good is named and passes goods_filter, and
+    all_companies.json when the company has goods and passes companies_filter
+    (None lets everything through, an empty set nothing).
+    """
+    table = {'position': [], 'listing': [], 'for_goods': [], 'for_companies': []}
+    for position, company in enumerate(companies):
+        for_companies = bool(company.get('goods')) and (
+            companies_filter is None or company['name'] in companies_filter)
+        if not for_companies and goods_filter is not None and not goods_filter:
+            continue
+
         for good in company['goods']:
-            good_name = good.get('Produced Goods', '')
-            if not good_name:
+            name = good.get('Produced Goods', '')
+            for_goods = bool(name) and (goods_filter is None or name in goods_filter)
+            if not (for_goods or for_companies):
                 continue
-            
-            if good_name not in goods_data:
-                goods_data[good_name] = []
-            
-            goods_data[good_name].append({
-                'company': company['name'],
-                'good': good.get('Produced Goods', ''),
-                'planet_produced': good.get('Planet Produced', ''),
-                'guildees_pay': good.get('Guildees Pay:', 0),
-                'live_exc_price': good.get('Live EXC Price', 0),
-                'live_avg_price': good.get('Live AVG Price', 0),
-                'guild_max': good.get('Guild Max', 0),
-                'guild_min': good.get('Guild Min', 0),
-                'discount_percent': good.get('Guild % Discount', 0),
-                'discount_fixed': good.get('Guild Fixed Discount', 0),
-                'timezone': company.get('timezone', 'UTC +00:00'),
-                'professions': company.get('professions', [])
-            })
-    
-    # Sort each good's listings by cheapest price and format output
-    all_goods_output = []
-    for good_name in sorted(goods_data.keys()):
-        listings = goods_data[good_name]
-        listings.sort(key=lambda x: x['guildees_pay'])
-        
-        all_goods_output.append({
-            'good': good_name,
-            'cheapest_price': listings[0]['guildees_pay'] if listings else 0,
-            'cheapest_company': listings[0]['company'] if listings else None,
-            'cheapest_planet': listings[0]['planet_produced'] if listings else None,
-            'listings_count': len(listings),
-            'listings': listings
-        })
-    
-    # Export all_goods.json (organized by goods)
-    with open(export_path / "all_goods.json", "w") as f:
-        json.dump({
-            "status": "success",
-            "last_updated": datetime.now().isoformat(),
-            "goods_count": len(all_goods_output),
-            "data": all_goods_output
-        }, f, indent=2)
-    
-    print(f"✅ Exported {len(all_goods_output)} goods to {export_path / 'all_goods.json'}")
-    
-    # Build all_companies.json (organized by companies)
-    all_companies_output = []
-    for company in companies:
-        if not company.get('goods'):
-            continue
-        
-        # Sort company's goods by name
-        company_goods = sorted(company['goods'], key=lambda x: x.get('Produced Goods', ''))
-        
-        all_companies_output.append({
-            'company': {
-                'name': company['name'],
-                'industry': company.get('industry', ''),
-                'professions': company.get('professions', []),
-                'timezone': company.get('timezone', 'UTC +00:00'),
-                'local_time': company.get('local_time', 'N/A'),
-                'goods_count': len(company_goods),
-                'goods': [{
-                    'good': good.get('Produced Goods', ''),
-                    'planet_produced': good.get('Planet Produced', ''),
-                    'guildees_pay': good.get('Guildees Pay:', 0),
-                    'live_exc_price': good.get('Live EXC Price', 0),
-                    'live_avg_price': good.get('Live AVG Price', 0),
-                    'guild_max': good.get('Guild Max', 0),
-                    'guild_min': good.get('Guild Min', 0),
-                    'discount_percent': good.get('Guild % Discount', 0),
-                    'discount_fixed': good.get('Guild Fixed Discount', 0)
-                } for good in company_goods]
-            }
-        })
-    
-    # Sort companies by name
-    all_companies_output.sort(key=lambda x: x['company']['name'])
-    
-    # Export all_companies.json (organized by companies)
-    with open(export_path / "all_companies.json", "w") as f:
-        json.dump({
+            table['position'].append(position)
+            table['listing'].append(_good_listing(company, good))
+            table['for_goods'].append(for_goods)
+            table['for_companies'].append(for_companies)
+    return table
+
+
+def _name_codes(names: List[str]) -> np.ndarray:
+    """Integer codes that sort like the names themselves."""
+    lookup = {name: code for code, name in enumerate(sorted(set(names)))}
+    return np.array([lookup[name] for name in names], dtype=np.int64)
+
+
+def _sorted_groups(primary: np.ndarray, secondary: Any) -> List[np.ndarray]:
+    """
+    Row indices stably sorted by (primary, secondary) and split at primary changes.
+    Falls back to Python's sort when secondary is not numeric.
+    """
+    if not len(primary):
+        return []
+    try:
+        order = np.lexsort((np.asarray(secondary, dtype=np.float64), primary))
+    except (TypeError, ValueError):
+        order = np.array(sorted(range(len(primary)), key=lambda i: (primary[i], secondary[i])), dtype=np.int64)
+    bounds = np.flatnonzero(np.diff(primary[order])) + 1
+    return np.split(order, bounds)
+
+
+def _goods_order(listings: List[Dict[str, Any]]) -> List[np.ndarray]:
+    """Listings grouped per good (by name) and sorted by cheapest pay, like all_goods.json."""
+    codes = _name_codes([listing['good'] for listing in listings])
+    return _sorted_groups(codes, [listing['guildees_pay'] for listing in listings])
+
+
+def _build_sections(companies: List[Dict[str, Any]], goods_filter: Optional[set] = None,
+                    companies_filter: Optional[set] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """
+    Encode the all_goods.json and all_companies.json sections in one pass.
+
+    Each listing is encoded once per document and the sections are spliced
+    together from those bytes: goods from a stable sort on (good, pay),
+    companies from a stable sort on (company position, good), both split at
+    group boundaries. Companies sharing a name share a section, in list order.
+    """
+    table = _flatten_listings(companies, goods_filter, companies_filter)
+    listings = table['listing']
+
+    goods_sections = {}
+    goods_rows = [i for i, keep in enumerate(table['for_goods']) if keep]
+    goods_listings = [listings[i] for i in goods_rows]
+    for group in _goods_order(goods_listings):
+        first = goods_listings[group[0]]
+        encoded = b"".join((
+            b'{"good":', encode_json(first['good']),
+            b',"cheapest_price":', encode_json(first['guildees_pay']),
+            b',"cheapest_company":', encode_json(first['company']),
+            b',"cheapest_planet":', encode_json(first['planet_produced']),
+            b',"listings_count":', encode_json(len(group)),
+            b',"listings":[', b",".join(encode_json(goods_listings[i]) for i in group), b']}',
+        ))
+        goods_sections[first['good']] = {'entries': [encoded], 'digest': hashlib.sha256(encoded).hexdigest()}
+
+    company_sections = {}
+    company_rows = [i for i, keep in enumerate(table['for_companies']) if keep]
+    positions = np.array([table['position'][i] for i in company_rows], dtype=np.int64)
+    codes = _name_codes([listings[i]['good'] for i in company_rows])
+    for group in _sorted_groups(positions, codes):
+        company = companies[positions[group[0]]]
+        goods = b",".join(
+            encode_json({key: listings[company_rows[i]][key] for key in COMPANY_GOOD_KEYS}) for i in group)
+        head = b"".join((
+            b'{"company":{"name":', encode_json(company['name']),
+            b',"industry":', encode_json(company.get('industry', '')),
+            b',"professions":', encode_json(company.get('professions', [])),
+            b',"timezone":', encode_json(company.get('timezone', 'UTC +00:00')),
+        ))
+        local_time = company.get('local_time', 'N/A')
+        tail = b"".join((b',"goods_count":', encode_json(len(group)), b',"goods":[', goods, b']}}'))
+
+        section = company_sections.setdefault(
+            company['name'], {'entries': [], 'digest': hashlib.sha256(), 'local_times': []})
+        section['entries'].append(head + b',"local_time":' + encode_json(local_time) + tail)
+        section['local_times'].append(local_time)
+        # local_time moves every minute; it is not part of the content hash
+        section['digest'].update(head + tail)
+
+    for section in company_sections.values():
+        section['digest'] = section['digest'].hexdigest()
+    return goods_sections, company_sections
+
+
+def build_listing_table(companies: List[Dict[str, Any]]) -> pa.Table:
+    """Flatten every company's goods into a table with LISTING_SCHEMA, in all_goods.json order."""
+    # With no companies selected, every flattened row is a goods listing
+    listings = _flatten_listings(companies, companies_filter=set())['listing']
+    order = [i for group in _goods_order(listings) for i in group]
+
+    arrays = []
+    for field in LISTING_SCHEMA:
+        values = [listings[i][field.name] for i in order]
+        if pa.types.is_floating(field.type):
+            values = [None if v is None or v == '' else float(v) for v in values]
+        elif pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=LISTING_SCHEMA)
+
+
+def _table_hash(path: Path) -> Optional[str]:
+    """content_hash stored in an exported table's schema metadata."""
+    try:
+        if path.suffix == ".parquet":
+            schema = pq.read_schema(path)
+        else:
+            with pa.memory_map(str(path)) as source:
+                schema = pa.ipc.open_file(source).schema
+        return (schema.metadata or {}).get(b"content_hash", b"").decode() or None
+    except Exception:
+        return None
+
+
+def _export_listing_table(state: Dict[str, Any], export_path: Path,
+                          companies: List[Dict[str, Any]], content_hash: str) -> List[Path]:
+    """
+    Write listings.parquet and listings.arrow unless they already hold this content.
+    The listing table carries the same data as all_goods.json, so it shares its hash.
+    """
+    paths = [export_path / name for name in TABLE_FILES]
+    if all(path.exists() for path in paths):
+        known = state['hashes'].get("tables")
+        keys = tuple(_file_key(path) for path in paths)
+        if not known or known[0] != keys:
+            hashes = {_table_hash(path) for path in paths}
+            known = (keys, hashes.pop() if len(hashes) == 1 else None)
+            state['hashes']["tables"] = known
+        if known[1] == content_hash:
+            return []
+
+    table = build_listing_table(companies).replace_schema_metadata({"content_hash": content_hash})
+    for path in paths:
+        fd, tmp = tempfile.mkstemp(dir=export_path, prefix=f".{path.name}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            if path.suffix == ".parquet":
+                pq.write_table(table, tmp, compression="zstd")
+            else:
+                feather.write_feather(table, tmp, compression="zstd")
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+    state['hashes']["tables"] = (tuple(_file_key(path) for path in paths), content_hash)
+    print(f"✅ Exported {table.num_rows} listings to {', '.join(str(p) for p in paths)}")
+    return paths
+
+
+def _payload_hash(sections: Dict[str, Dict[str, Any]]) -> str:
+    """Hash of a document's data, independent of last_updated and local times."""
+    digest = hashlib.sha256()
+    for name in sorted(sections):
+        digest.update(encode_json(name) + sections[name]['digest'].encode())
+    return digest.hexdigest()
+
+
+def _stored_hash(path: Path) -> Optional[str]:
+    """content_hash recorded in an existing export file."""
+    try:
+        with open(path, "rb") as f:
+            return json.load(f).get("content_hash")
+    except Exception:
+        return None
+
+
+def _file_key(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _is_current(state: Dict[str, Any], kind: str, path: Path, content_hash: str,
+                precompressed: Tuple[str, ...]) -> bool:
+    """True when the files on disk already hold a payload with this hash."""
+    if not all(target.exists() for target, _ in _target_paths(path, precompressed)):
+        return False
+    # Re-read the recorded hash if the file changed underneath us (e.g. a git pull)
+    file_key = _file_key(path)
+    known_key, known_hash = state['hashes'].get(kind, (None, None))
+    if known_key != file_key:
+        known_hash = _stored_hash(path)
+        state['hashes'][kind] = (file_key, known_hash)
+    return known_hash == content_hash
+
+
+def _write_document(path: Path, sections: Dict[str, Dict[str, Any]], content_hash: str,
+                    count_key: str, count: int, precompressed: Tuple[str, ...]) -> List[Path]:
+    """Write a document from its encoded sections, in name order."""
+    return _write_encoded(path, {
+        "status": "success",
+        "last_updated": datetime.now().isoformat(),
+        "content_hash": content_hash,
+        count_key: count,
+    }, (entry for name in sorted(sections) for entry in sections[name]['entries']), "data", precompressed)
+
+
+def _copy_list(value: Any) -> Any:
+    return list(value) if isinstance(value, list) else value
+
+
+def _snapshot(companies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of just the fields the exporter diffs against on the next export."""
+    return [{
+        'name': company['name'],
+        **{field: _copy_list(company.get(field)) for field in COMPANY_FIELDS},
+        'goods': [{field: good.get(field) for field in ('Produced Goods',) + EXPORT_GOODS_FIELDS}
+                  for good in company.get('goods', [])],
+    } for company in companies]
+
+
+def _can_rebuild_incrementally(previous: Optional[List[Dict[str, Any]]],
+                               companies: List[Dict[str, Any]]) -> bool:
+    """
+    Whether a change set against the previous export is enough to update the
+    sections: companies must have unique names and keep their relative order
+    (listings with equal prices are ordered by company position).
+    """
+    if previous is None:
+        return False
+    names = [c['name'] for c in companies]
+    if len(set(names)) != len(names):
+        return False
+    previous_names = [c['name'] for c in previous]
+    common = set(names) & set(previous_names)
+    return [n for n in names if n in common] == [n for n in previous_names if n in common]
+
+
+def shard_slug(name: str) -> str:
+    """File name stem for a good or company shard, e.g. 'Iron Ore' -> 'iron-ore'."""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'unnamed'
+
+
+def _shard_layout(sections: Dict[str, Dict[str, Any]], kind: str) -> Dict[str, Tuple[str, str, bytes]]:
+    """Map shard paths to (kind, name, encoded entry); clashing slugs get a -2, -3... suffix."""
+    layout = {}
+    taken = set()
+    for name in sorted(sections):
+        for entry in sections[name]['entries']:
+            slug = candidate = shard_slug(name)
+            n = 2
+            while candidate in taken:
+                candidate = f"{slug}-{n}"
+                n += 1
+            taken.add(candidate)
+            layout[f"{SHARD_DIRS[kind]}/{candidate}.json"] = (kind, name, entry)
+    return layout
+
+
+_digest_cache: Dict[str, Tuple[Tuple[int, int], str, int]] = {}
+
+
+def _file_digest(path: Path) -> Tuple[str, int]:
+    """sha256 and size of a file, cached until the file changes."""
+    file_key = _file_key(path)
+    cached = _digest_cache.get(str(path))
+    if cached and cached[0] == file_key:
+        return cached[1], cached[2]
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    _digest_cache[str(path)] = (file_key, digest, len(data))
+    return digest, len(data)
+
+
+def _manifest_hashes(export_path: Path) -> Dict[str, str]:
+    """Shard hashes recorded in an existing manifest."""
+    try:
+        with open(export_path / MANIFEST_FILE, "rb") as f:
+            return {item['path']: item['sha256'] for item in json.load(f).get('data', [])}
+    except Exception:
+        return {}
+
+
+def _export_shards(state: Dict[str, Any], export_path: Path,
+                   precompressed: Tuple[str, ...]) -> List[Path]:
+    """Write changed shards, drop stale ones and refresh the manifest."""
+    layout = {**_shard_layout(state['goods'], "good"), **_shard_layout(state['companies_sections'], "company")}
+    if state.get('shards') is None:
+        state['shards'] = _manifest_hashes(export_path)
+    known = state['shards']
+
+    written = []
+    files = []
+    for name in EXPORT_FILES:
+        for target, _ in _target_paths(export_path / name, precompressed):
+            if target.exists():
+                digest, size = _file_digest(target)
+                files.append({'path': target.name, 'kind': 'document', 'name': name,
+                              'sha256': digest, 'size': size})
+    for name in TABLE_FILES:
+        if (export_path / name).exists():
+            digest, size = _file_digest(export_path / name)
+            files.append({'path': name, 'kind': 'table', 'name': name, 'sha256': digest, 'size': size})
+
+    for relpath, (kind, name, data) in sorted(layout.items()):
+        digest = hashlib.sha256(data).hexdigest()
+        path = export_path / relpath
+        if known.get(relpath) != digest or not path.exists():
+            _write_bytes(path, data)
+            known[relpath] = digest
+            written.append(path)
+        files.append({'path': relpath, 'kind': kind, 'name': name, 'sha256': digest, 'size': len(data)})
+
+    # Goods and companies that are gone lose their shard
+    removed = 0
+    for directory in SHARD_DIRS.values():
+        for path in (export_path / directory).glob("*.json"):
+            relpath = f"{directory}/{path.name}"
+            if relpath not in layout:
+                path.unlink()
+                known.pop(relpath, None)
+                removed += 1
+
+    manifest_path = export_path / MANIFEST_FILE
+    manifest_hash = hashlib.sha256(b"".join(encode_json(item) for item in files)).hexdigest()
+    if not _is_current(state, "manifest", manifest_path, manifest_hash, ()):
+        written += write_json_document(manifest_path, {
             "status": "success",
             "last_updated": datetime.now().isoformat(),
-            "companies_count": len(all_companies_output),
-            "data": all_companies_output
-        }, f, indent=2)
-    
-    print(f"✅ Exported {len(all_companies_output)} companies to {export_path / 'all_companies.json'}")
+            "content_hash": manifest_hash,
+            "files_count": len(files),
+        }, files, precompressed=())
+        state['hashes']["manifest"] = (_file_key(manifest_path), manifest_hash)
+
+    if written or removed:
+        print(f"✅ Exported {len(written)} shard/manifest files, removed {removed} stale shards")
+    return written
+
+
+def export_to_public_json(companies: List[Dict[str, Any]], export_dir: str = "api_exports",
+                          precompressed: Iterable[str] = PRECOMPRESSED_FORMATS) -> List[Path]:
+    """
+    Export comprehensive data to JSON files: all_goods.json and all_companies.json.
+
+    Files are written as compact JSON with .gz (and .br, if brotli is installed)
+    siblings. Each document records a content_hash of its data; when that hash
+    is unchanged the file is not rewritten, so last_updated only moves when the
+    data does. Within a process, only the goods and companies touched since the
+    previous export to the same directory are re-encoded.
+
+    The flattened listing table is written as listings.parquet and
+    listings.arrow (Arrow IPC) with LISTING_SCHEMA. Every good and company
+    entry is also written to its own shard (goods/<slug>.json,
+    companies/<slug>.json), and manifest.json lists all export files with
+    their sha256 and size.
+
+    Returns the paths written (empty when nothing changed).
+    """
+    export_path = Path(export_dir)
+    export_path.mkdir(parents=True, exist_ok=True)
+    precompressed = tuple(precompressed)
+    written = []
+
+    with _export_lock:
+        key = str(export_path.resolve())
+        state = _export_state.setdefault(key, {'companies': None, 'goods': {}, 'companies_sections': {}, 'hashes': {}})
+
+        if not _can_rebuild_incrementally(state['companies'], companies):
+            state['goods'], state['companies_sections'] = _build_sections(companies)
+        else:
+            # Rebuild only the sections touched since the previous export
+            changes = compute_change_set(state['companies'], companies, EXPORT_GOODS_FIELDS)
+            goods_names, company_names = touched_goods(changes), touched_companies(changes)
+            for sections, names in ((state['goods'], goods_names), (state['companies_sections'], company_names)):
+                for name in names:
+                    sections.pop(name, None)
+            if goods_names or company_names:
+                goods, company_sections = _build_sections(companies, goods_names, company_names)
+                state['goods'].update(goods)
+                state['companies_sections'].update(company_sections)
+        state['companies'] = _snapshot(companies)
+
+        # Export all_goods.json (organized by goods)
+        goods_path = export_path / "all_goods.json"
+        goods = state['goods']
+        goods_hash = _payload_hash(goods)
+        if _is_current(state, "goods", goods_path, goods_hash, precompressed):
+            print(f"No changes in {goods_path}, skipped")
+        else:
+            written += _write_document(goods_path, goods, goods_hash, "goods_count", len(goods), precompressed)
+            state['hashes']["goods"] = (_file_key(goods_path), goods_hash)
+            print(f"✅ Exported {len(goods)} goods to {goods_path}")
+        written += _export_listing_table(state, export_path, companies, goods_hash)
+
+        # Export all_companies.json (organized by companies)
+        companies_path = export_path / "all_companies.json"
+        sections = state['companies_sections']
+        companies_hash = _payload_hash(sections)
+        companies_count = sum(len(section['entries']) for section in sections.values())
+        if _is_current(state, "companies", companies_path, companies_hash, precompressed):
+            print(f"No changes in {companies_path}, skipped")
+        else:
+            # Untouched sections may carry old local times; refresh them for this write
+            local_times = {}
+            for company in companies:
+                if company.get('goods'):
+                    local_times.setdefault(company['name'], []).append(company.get('local_time', 'N/A'))
+            stale = {name for name, section in sections.items() if section['local_times'] != local_times.get(name)}
+            if stale:
+                sections.update(_build_sections(companies, set(), stale)[1])
+
+            written += _write_document(companies_path, sections, companies_hash, "companies_count",
+                                       companies_count, precompressed)
+            state['hashes']["companies"] = (_file_key(companies_path), companies_hash)
+            print(f"✅ Exported {companies_count} companies to {companies_path}")
+
+        written += _export_shards(state, export_path, precompressed)
+
+    return written
@@ -0,0 +1,183 @@
+"""Process-wide background worker that pushes the exports to GitHub."""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Wait this long after the last export change before pushing, so a burst of
+# edits becomes one push
+PUSH_DEBOUNCE_SECONDS = 10
+
+# Never hold a change back longer than this, even while edits keep coming
+PUSH_MAX_DELAY_SECONDS = 120
+
+# Minimum time between automatic pushes (manual pushes skip this)
+PUSH_MIN_INTERVAL_SECONDS = 120
+
+# Worker states reported to the UI
+PUSH_IDLE = "idle"
+PUSH_PENDING = "pending"
+PUSH_RUNNING = "pushing"
+PUSH_FAILED = "failed"
+
+
+class PushWorker:
+    """
+    Debounces export changes and pushes them from a single background thread.
+
+    Sessions call notify_changed() after writing exports and request_push()
+    for a manual push; neither blocks. push_fn returns (success, message) and
+    runs only on the worker thread.
+    """
+
+    def __init__(
+        self,
+        push_fn: Callable[[], Tuple[bool, str]],
+        debounce: float = PUSH_DEBOUNCE_SECONDS,
+        max_delay: float = PUSH_MAX_DELAY_SECONDS,
+        min_interval: float = PUSH_MIN_INTERVAL_SECONDS
+    ):
+        self._push_fn = push_fn
+        self._debounce = debounce
+        self._max_delay = max_delay
+        self._min_interval = min_interval
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # Monotonic times of the first and latest unpushed change
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._last_attempt: Optional[float] = None
+        self._forced = False
+        self._running = False
+
+        self._last_push: Optional[datetime] = None
+        self._last_result: Optional[bool] = None
+        self._message: Optional[str] = None
+        self._pushes = 0
+        self._failures = 0
+
+    def start(self) -> "PushWorker":
+        """Start the worker thread (no-op if already running)."""
+        with self._cond:
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="github-push", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the worker after any push in progress finishes."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        with self._cond:
+            self._thread = None
+
+    def notify_changed(self) -> None:
+        """Record that the exports changed; a push follows once things settle."""
+        with self._cond:
+            now = time.monotonic()
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._cond.notify_all()
+
+    def request_push(self) -> None:
+        """Push as soon as possible, ignoring the debounce and rate limit."""
+        with self._cond:
+            self._forced = True
+            self._cond.notify_all()
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the worker state for display."""
+        with self._cond:
+            if self._running:
+                state = PUSH_RUNNING
+            elif self._last_result is False:
+                # Retried automatically, but worth showing until it succeeds
+                state = PUSH_FAILED
+            elif self._forced or self._first_change is not None:
+                state = PUSH_PENDING
+            else:
+                state = PUSH_IDLE
+            return {
+                "state": state,
+                "last_push": self._last_push,
+                "last_result": self._last_result,
+                "message": self._message,
+                "pushes": self._pushes,
+                "failures": self._failures
+            }
+
+    def _seconds_until_due(self, now: float) -> Optional[float]:
+        """Seconds until the next push should start, or None if nothing is pending."""
+        if self._forced:
+            return 0.0
+        if self._first_change is None:
+            return None
+        due = min(self._last_change + self._debounce, self._first_change + self._max_delay)
+        if self._last_attempt is not None:
+            due = max(due, self._last_attempt + self._min_interval)
+        return max(0.0, due - now)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    wait = self._seconds_until_due(time.monotonic())
+                    if wait == 0:
+                        break
+                    self._cond.wait(wait)
+                if self._stopped:
+                    return
+                # Changes arriving from here on need another push
+                self._first_change = self._last_change = None
+                self._forced = False
+                self._running = True
+                self._last_attempt = time.monotonic()
+
+            try:
+                success, message = self._push_fn()
+            except Exception as e:
+                success, message = False, f"Error: {str(e)[:100]}"
+
+            with self._cond:
+                self._running = False
+                self._last_result = success
+                self._message = message
+                if success:
+                    self._pushes += 1
+                    self._last_push = datetime.now(timezone.utc)
+                else:
+                    self._failures += 1
+                    print(f"❌ Background push failed: {message}")
+                    # Try again after the rate limit
+                    if self._first_change is None:
+                        self._first_change = self._last_change = time.monotonic()
+
+
+_worker: Optional[PushWorker] = None
+_worker_lock = threading.Lock()
+
+
+def get_push_worker(push_fn: Callable[[], Tuple[bool, str]], push_on_start: bool = True) -> PushWorker:
+    """
+    The process-wide push worker, started on first use.
+
+    Every session shares it, so pushes stay rate limited no matter how many
+    users are connected. With push_on_start the current exports are pushed
+    once when the worker is created.
+    """
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = PushWorker(push_fn).start()
+            if push_on_start:
+                _worker.notify_changed()
+        return _worker
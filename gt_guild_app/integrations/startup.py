@@ -0,0 +1,95 @@
+"""Run the slow startup steps (git pull, sheet import, price fetch) concurrently."""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+# How often the page checks for finished startup tasks
+STARTUP_POLL_SECONDS = 1.0
+
+# A shared task (e.g. the git pull) finished longer ago than this is run again
+# for a new session
+SHARED_TASK_MAX_AGE_SECONDS = 600
+
+# Results that must be applied after another task's result (the sheet import
+# is diffed against the pulled data)
+STARTUP_DEPENDENCIES = {"sheets": "pull"}
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup")
+_shared: Dict[str, Tuple[Future, float]] = {}
+_shared_lock = threading.Lock()
+
+
+def _run_logged(name: str, fn: Callable[[], Any]) -> Any:
+    """Run a task, logging and swallowing errors (a failed task yields None)."""
+    start = time.monotonic()
+    try:
+        result = fn()
+        print(f"✅ Startup task {name} done in {time.monotonic() - start:.2f}s")
+        return result
+    except Exception as e:
+        print(f"❌ Startup task {name} failed: {e}")
+        return None
+
+
+def run_shared(name: str, fn: Callable[[], Any], max_age: float = SHARED_TASK_MAX_AGE_SECONDS) -> Future:
+    """
+    Run fn once for all sessions of the process and share its future.
+
+    A session starting while the task runs joins it; one starting more than
+    max_age seconds after it was started runs it again.
+    """
+    with _shared_lock:
+        entry = _shared.get(name)
+        if entry is not None:
+            future, started = entry
+            if not future.done() or time.monotonic() - started < max_age:
+                return future
+        future = _executor.submit(_run_logged, name, fn)
+        _shared[name] = (future, time.monotonic())
+        return future
+
+
+def start_startup_tasks(tasks: Dict[str, Callable[[], Any]], shared: Iterable[str] = ("pull",)) -> Dict[str, Future]:
+    """
+    Start every task in the background and return their futures by name.
+
+    Tasks named in shared run once per process (see run_shared); the others
+    run for this session only. Tasks must not touch st.session_state.
+    """
+    shared = set(shared)
+    return {
+        name: run_shared(name, fn) if name in shared else _executor.submit(_run_logged, name, fn)
+        for name, fn in tasks.items()
+    }
+
+
+def ready_results(futures: Dict[str, Future], applied: Iterable[str]) -> List[Tuple[str, Any]]:
+    """
+    Finished tasks that can be applied now, as (name, result) in task order.
+
+    A task waits until the task it depends on (STARTUP_DEPENDENCIES) has been
+    applied, either earlier or earlier in the returned list.
+    """
+    applied = set(applied)
+    ready = []
+    progress = True
+    while progress:
+        progress = False
+        for name, future in futures.items():
+            if name in applied or not future.done():
+                continue
+            dependency = STARTUP_DEPENDENCIES.get(name)
+            if dependency in futures and dependency not in applied:
+                continue
+            ready.append((name, future.result()))
+            applied.add(name)
+            progress = True
+    return ready
+
+
+def pending_tasks(futures: Dict[str, Future], applied: Iterable[str]) -> List[str]:
+    """Names of the tasks whose results have not been applied yet."""
+    applied = set(applied)
+    return [name for name in futures if name not in applied]
@@ -0,0 +1,116 @@
+"""Per-session memory sampling and an opt-in sidebar report."""
+import time
+import streamlit as st
+import pandas as pd
+from pathlib import Path
+from typing import Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.session_memory import TRACKER, measure_state
+from core.metrics import SESSION_STATE_BYTES, SESSION_STATE_KEYS
+from core.profiling import span
+
+
+# Query parameter that turns the report on (?memory=1)
+MEMORY_QUERY_PARAM = "memory"
+
+# Minimum seconds between samples of one session (every rerun while the report is open)
+MEMORY_SAMPLE_SECONDS = 300
+
+
+def memory_report_requested() -> bool:
+    """Whether the page was opened with ?memory=1."""
+    try:
+        value = st.query_params.get(MEMORY_QUERY_PARAM, "")
+    except Exception:
+        return False
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def _session_id() -> Optional[str]:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _forget_closed_sessions() -> None:
+    """Drop samples of sessions the Streamlit runtime no longer knows."""
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return
+        live = {info.session.id for info in Runtime.instance()._session_mgr.list_sessions()}
+    except Exception:
+        return
+    TRACKER.forget(session_id for session_id in TRACKER.sessions() if session_id not in live)
+
+
+def sample_session_memory(force: bool = False) -> None:
+    """
+    Measure this session's state, at most every MEMORY_SAMPLE_SECONDS.
+
+    Also drops closed sessions and updates the session state gauges.
+    """
+    session_id = _session_id()
+    if session_id is None:
+        return
+    last = TRACKER.last_sample_at(session_id)
+    if not force and last is not None and time.time() - last < MEMORY_SAMPLE_SECONDS:
+        return
+
+    with span("session memory"):
+        try:
+            sizes = measure_state(st.session_state)
+        except RuntimeError:
+            # State changed size mid-walk (a fragment rerun); try next time
+            return
+        TRACKER.record(session_id, sizes)
+        _forget_closed_sessions()
+        for family, entry in TRACKER.totals().items():
+            SESSION_STATE_BYTES.set(entry["bytes"], key=family)
+            SESSION_STATE_KEYS.set(entry["keys"], key=family)
+
+
+def _mb(size: int) -> float:
+    return round(size / 1024 / 1024, 3)
+
+
+def render_memory_panel() -> None:
+    """Sidebar expander with this session's state by key, totals across sessions and growing keys."""
+    session_id = _session_id()
+    with st.sidebar.expander("🧠 Session memory", expanded=True):
+        history = TRACKER.history_of(session_id) if session_id else []
+        if not history:
+            st.caption("No samples yet")
+            return
+
+        latest = history[-1]
+        st.metric("This session", f"{_mb(latest['total'])} MB",
+                  delta=f"{_mb(latest['total'] - history[0]['total'])} MB since first sample",
+                  delta_color="inverse")
+        st.dataframe(pd.DataFrame([
+            {"key": family, "keys": entry["keys"], "MB": _mb(entry["bytes"])}
+            for family, entry in sorted(latest["sizes"].items(), key=lambda item: item[1]["bytes"], reverse=True)
+        ]), hide_index=True, width="stretch")
+
+        totals = TRACKER.totals()
+        sessions = len(TRACKER.sessions())
+        st.caption(f"All sessions ({sessions}): {_mb(sum(e['bytes'] for e in totals.values()))} MB")
+        st.dataframe(pd.DataFrame([
+            {"key": family, "sessions": entry["sessions"], "keys": entry["keys"], "MB": _mb(entry["bytes"])}
+            for family, entry in sorted(totals.items(), key=lambda item: item[1]["bytes"], reverse=True)
+        ]), hide_index=True, width="stretch")
+
+        st.line_chart(pd.DataFrame({
+            "MB": [_mb(sample["total"]) for sample in history]
+        }, index=pd.to_datetime([sample["at"] for sample in history], unit="s")), height=120)
+
+        growing = TRACKER.growing_keys(session_id)
+        if growing:
+            st.warning("Keys growing without bound: " + ", ".join(f"`{entry['key']}`" for entry in growing))
+            st.dataframe(pd.DataFrame([{
+                "key": entry["key"],
+                "growth MB": _mb(entry["growth_bytes"]),
+                "keys": f"{entry['first_keys']} → {entry['last_keys']}",
+                "samples": entry["samples"]
+            } for entry in growing]), hide_index=True, width="stretch")
@@ -0,0 +1,106 @@
+"""Opt-in sidebar panel showing where recent reruns spent their time."""
+import streamlit as st
+import pandas as pd
+from pathlib import Path
+from typing import List, Optional
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from core.profiling import RerunTrace, background_spans, summarize_spans
+
+
+# Query parameter that turns the panel on (?profile=1)
+PROFILE_QUERY_PARAM = "profile"
+
+
+def profiling_requested() -> bool:
+    """Whether the page was opened with ?profile=1."""
+    try:
+        value = st.query_params.get(PROFILE_QUERY_PARAM, "")
+    except Exception:
+        return False
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+def flame_chart_data(trace: RerunTrace) -> pd.DataFrame:
+    """One row per span with start/end in milliseconds, for an icicle chart."""
+    rows = [{
+        "span": item["name"],
+        "depth": item["depth"],
+        "start_ms": item["start"] * 1000,
+        "end_ms": (item["start"] + item["duration"]) * 1000,
+        "ms": round(item["duration"] * 1000, 2)
+    } for item in trace.spans]
+    return pd.DataFrame(rows, columns=["span", "depth", "start_ms", "end_ms", "ms"])
+
+
+def render_flame_chart(trace: RerunTrace) -> None:
+    """Spans of one rerun laid out on a timeline, nested spans below their parents."""
+    import altair as alt
+
+    data = flame_chart_data(trace)
+    if data.empty:
+        st.caption("No spans recorded")
+        return
+    chart = alt.Chart(data).mark_bar(stroke="#0e1117", strokeWidth=0.5).encode(
+        x=alt.X("start_ms:Q", title="ms"),
+        x2="end_ms:Q",
+        y=alt.Y("depth:O", title=None, axis=None),
+        color=alt.Color("span:N", legend=None),
+        tooltip=["span", "ms"]
+    ).properties(height=30 * (int(data["depth"].max()) + 1) + 40)
+    st.altair_chart(chart, width="stretch")
+
+
+def render_profiling_panel(traces: List[RerunTrace], capture_key: str = "profile_capture") -> None:
+    """
+    Sidebar expander with the last reruns' span breakdown.
+
+    Shows a flame-style timeline of a chosen rerun, per-span totals across
+    all kept reruns, recent background spans and, when capture is on, the
+    cProfile of the latest profiled rerun as a download.
+    """
+    with st.sidebar.expander("⏱️ Profiling", expanded=True):
+        st.checkbox("Capture cProfile", key=capture_key,
+                    help="Run each rerun under cProfile (slower) and offer the stats for download")
+        if traces and traces[-1].profiler_busy:
+            st.caption("⚠️ Profiler busy: another session is capturing, the last rerun was not profiled")
+        if not traces:
+            st.caption("Timings appear after the next rerun")
+            return
+
+        labels = [f"{t.started_at.strftime('%H:%M:%S')} • {t.duration * 1000:.0f} ms" for t in traces]
+        chosen = st.selectbox("Rerun", range(len(traces)), index=len(traces) - 1,
+                              format_func=lambda i: labels[i], key="profile_rerun")
+        trace = traces[chosen]
+        render_flame_chart(trace)
+
+        st.caption(f"Totals over the last {len(traces)} reruns")
+        summary = pd.DataFrame([{
+            "span": entry["name"],
+            "calls": entry["calls"],
+            "ms/rerun": round(entry["mean_per_rerun"] * 1000, 1),
+            "max ms": round(entry["max"] * 1000, 1)
+        } for entry in summarize_spans(traces)])
+        st.dataframe(summary, hide_index=True, width="stretch")
+
+        background = background_spans()[-10:]
+        if background:
+            st.caption("Background")
+            st.dataframe(pd.DataFrame([{
+                "span": item["name"],
+                "thread": item["thread"],
+                "ms": round(item["duration"] * 1000, 1),
+                "at": item["finished_at"].strftime("%H:%M:%S")
+            } for item in reversed(background)]), hide_index=True, width="stretch")
+
+        profiled: Optional[RerunTrace] = next((t for t in reversed(traces) if t.profile), None)
+        if profiled is not None:
+            st.download_button(
+                "⬇️ Download cProfile",
+                data=profiled.profile,
+                file_name=f"rerun_{profiled.started_at.strftime('%Y%m%d_%H%M%S')}.prof",
+                mime="application/octet-stream",
+                help="Open with python -m pstats or snakeviz"
+            )
+            with st.popover("cProfile summary"):
+                st.code(profiled.profile_summary or "", language=None)
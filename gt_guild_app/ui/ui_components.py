@@ -4,7 +4,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 
 
-def render_sidebar_filters(professions_list, price_data, last_update, materials_list, material_counts, company_list, company_goods_counts, last_sheet_refresh: Optional[datetime] = None, last_github_push: Optional[datetime] = None):
+def render_sidebar_filters(professions_list, price_data, last_update, materials_list, material_counts, company_list, company_goods_counts, last_sheet_refresh: Optional[datetime] = None, last_github_push: Optional[datetime] = None, sheet_refresh_status: Optional[str] = None, github_push_status: Optional[str] = None):
     """Render sidebar with filters and price info."""
     # Title at top of sidebar
     st.sidebar.markdown("<h3 style='text-align: center;'>TiT Guild App🐔™</h3>", unsafe_allow_html=True)
@@ -74,16 +74,18 @@ def render_sidebar_filters(professions_list, price_data, last_update, materials_
     # Google Sheets refresh status
     if last_sheet_refresh:
         time_str = last_sheet_refresh.strftime("%I:%M %p UTC")
-        st.sidebar.caption(f"📋 **Sheets** • *{time_str}*")
+        status_str = f" ({sheet_refresh_status})" if sheet_refresh_status else ""
+        st.sidebar.caption(f"📋 **Sheets** • *{time_str}*{status_str}")
     else:
         st.sidebar.caption(f"📋 **Sheets** • *Not synced*")
     
     # GitHub push status and button
+    push_status_str = f" ({github_push_status})" if github_push_status else ""
     if last_github_push:
         time_str = last_github_push.strftime("%I:%M %p UTC")
-        st.sidebar.caption(f"🌌 **GitHub** • *{time_str}*")
+        st.sidebar.caption(f"🌌 **GitHub** • *{time_str}*{push_status_str}")
     else:
-        st.sidebar.caption(f"🌌 **GitHub** • *Awaiting sync*")
+        st.sidebar.caption(f"🌌 **GitHub** • *Awaiting sync*{push_status_str}")
     
     st.sidebar.divider()
     st.sidebar.markdown("")  # spacing
@@ -147,6 +149,11 @@ def get_column_config(materials, planets):
             help="Auto-calculated price after discount and bounds"
         ),
         "Live EXC Price": st.column_config.NumberColumn("Live EXC Price", format="$%d"),
+        "Production Cost": st.column_config.NumberColumn(
+            "Production Cost",
+            format="$%d",
+            help="Cost of the inputs of the cheapest recipe per unit, each input made or bought at live prices"
+        ),
         "Live AVG Price": st.column_config.NumberColumn("Live AVG Price", format="$%d"),
         "Guild Max": st.column_config.NumberColumn("Guild Max", format="$%d"),
         "Guild Min": st.column_config.NumberColumn("Guild Min", format="$%d"),
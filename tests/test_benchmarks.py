@@ -0,0 +1,111 @@
+"""Tests for the synthetic guild generator and benchmark comparison."""
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from benchmarks.synthetic_guild import generate_companies, generate_price_data, guild_sheet_csv
+from benchmarks.run_benchmarks import compare
+from gt_guild_app.core.data_manager import load_game_materials, load_game_planets
+from gt_guild_app.integrations.google_sheets import read_sheet_csv, parse_guild_sheet
+
+
+class TestGenerateCompanies:
+    """Tests for generate_companies function."""
+
+    def test_same_seed_same_guild(self):
+        """Generation is deterministic per seed"""
+        assert generate_companies(20, 5, seed=1) == generate_companies(20, 5, seed=1)
+        assert generate_companies(20, 5, seed=1) != generate_companies(20, 5, seed=2)
+
+    def test_uses_game_names(self):
+        """Goods and planets come from gamedata.json"""
+        materials, planets = set(load_game_materials()), set(load_game_planets())
+        companies = generate_companies(30, 8, seed=0)
+
+        assert len(companies) == 30
+        assert len({c['name'] for c in companies}) == 30
+        for company in companies:
+            assert len(company['goods']) == 8
+            assert all(g['Produced Goods'] in materials for g in company['goods'])
+            assert all(g['Planet Produced'] in planets for g in company['goods'])
+
+    def test_prices_cover_materials(self):
+        """Every material gets an exchange price"""
+        prices = generate_price_data(seed=0)
+        assert set(prices) == set(load_game_materials())
+        assert all(p['currentPrice'] > 0 for p in prices.values())
+
+
+class TestGuildSheetCsv:
+    """Tests for guild_sheet_csv function."""
+
+    def test_round_trips_through_importer(self):
+        """The importer reads back the generated companies"""
+        companies = generate_companies(15, 6, seed=4)
+        parsed = parse_guild_sheet(read_sheet_csv(guild_sheet_csv(companies)), set(load_game_materials()))
+
+        assert [c['name'] for c in parsed] == [c['name'] for c in companies]
+        assert parsed[3]['professions'] == companies[3]['professions']
+        assert parsed[3]['goods'] == companies[3]['goods']
+
+
+class TestCompare:
+    """Tests for compare function."""
+
+    BASELINES = {"threshold": 0.5, "thresholds": {"slow": 2.0},
+                 "results": {"small": {"load": 0.1, "slow": 0.1, "tiny": 0.0001}}}
+
+    def test_regression_reported(self):
+        """Cases beyond baseline * (1 + threshold) are regressions"""
+        results = {"small": {"load": {"min": 0.16}, "slow": {"min": 0.25}, "tiny": {"min": 0.01}}}
+        regressions = compare(results, self.BASELINES)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("small/load")
+
+    def test_threshold_override(self):
+        """An explicit threshold replaces the file's default"""
+        results = {"small": {"load": {"min": 0.16}}}
+        assert compare(results, self.BASELINES, threshold=1.0) == []
+
+    def test_unknown_cases_ignored(self):
+        """Cases or scales without a baseline never fail"""
+        assert compare({"large": {"load": {"min": 10.0}}}, self.BASELINES) == []
+
+
+class TestConfigOverrides:
+    """Tests for the environment overrides in config."""
+
+    def test_env_overrides(self, tmp_path):
+        """GT_GUILD_DATA_DIR, GT_GUILD_EXPORT_DIR and GT_GUILD_GIT_AUTOSAVE are honoured"""
+        env = dict(os.environ, GT_GUILD_DATA_DIR=str(tmp_path / 'data'),
+                   GT_GUILD_EXPORT_DIR=str(tmp_path / 'out'), GT_GUILD_GIT_AUTOSAVE='0')
+        code = "import config; print(config.DATA_FILE, config.EXPORT_DIR, config.GIT_AUTOSAVE)"
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                                cwd=Path(__file__).parent.parent / 'gt_guild_app')
+
+        assert result.stdout.split() == [str(tmp_path / 'data' / 'guild_data.feather'), str(tmp_path / 'out'), 'False']
+
+
+class TestSessionHarness:
+    """Tests for the session harness helpers."""
+
+    def test_percentile(self):
+        """Percentiles interpolate between samples"""
+        from benchmarks.session_harness import percentile
+        values = [4.0, 1.0, 3.0, 2.0, 5.0]
+        assert percentile(values, 0.5) == 3.0
+        assert percentile(values, 0.95) == pytest.approx(4.8)
+        assert percentile([], 0.5) == 0.0
+
+    def test_stub_routes_endpoints(self):
+        """Price, sheet and GitHub URLs get canned responses"""
+        from benchmarks.session_harness import StubEndpoints
+        stub = StubEndpoints(b'{"prices": []}', b'a,b\n')
+
+        assert stub.request(None, 'GET', 'https://api.g2.galactictycoons.com/public/exchange/mat-prices').json() == {'prices': []}
+        assert stub.request(None, 'GET', 'https://docs.google.com/spreadsheets/d/x/export?format=csv').content == b'a,b\n'
+        blob = stub.request(None, 'POST', 'https://api.github.com/repos/o/r/git/blobs')
+        assert blob.status_code == 201 and len(blob.json()['sha']) == 40
+        assert stub.request(None, 'GET', 'https://example.com').status_code == 404
+        assert stub.calls == {'prices': 1, 'sheets': 1, 'github': 1, 'other': 1}
@@ -0,0 +1,132 @@
+"""Tests for the bill-of-materials explosion of contract demand."""
+import numpy as np
+import pytest
+from gt_guild_app.business.recipe_graph import compile_recipe_graph, load_recipe_graph
+from gt_guild_app.business.bom import (
+    compile_bom,
+    primary_recipes,
+    demand_matrix,
+    explode_contracts,
+    raw_material_demand,
+    load_bom
+)
+
+
+MATERIALS = [
+    {"id": 1, "name": "Ore", "weight": 1},
+    {"id": 2, "name": "Coal", "weight": 2},
+    {"id": 3, "name": "Plate", "weight": 2},
+    {"id": 4, "name": "Frame", "weight": 5},
+    {"id": 5, "name": "Crystal", "weight": 1},
+]
+
+
+def recipe(recipe_id, output, amount, inputs):
+    """A catalog recipe producing amount of output from (id, amount) inputs."""
+    return {"id": recipe_id, "timeMinutes": 60, "output": {"id": output, "a": amount},
+            "inputs": [{"id": mid, "a": a} for mid, a in inputs]}
+
+
+RECIPES = [
+    recipe(1, 1, 10, []),                       # Ore is mined
+    recipe(2, 2, 10, []),                       # Coal is mined
+    recipe(3, 3, 2, [(1, 4), (2, 2)]),          # 2 Plate from 4 Ore + 2 Coal
+    recipe(4, 4, 1, [(3, 3)]),                  # Frame from 3 Plate
+    recipe(5, 4, 1, [(5, 1)]),                  # ...or from 1 Crystal
+]
+
+
+def contract(daily_amount, *fulfilled):
+    """A contracts.json entry with one line per fulfilled amount."""
+    return {"daily_amount": daily_amount, "lines": [{"Fulfilled Amount": amount} for amount in fulfilled]}
+
+
+@pytest.fixture
+def bom():
+    """BOM of the small catalog above with primary recipes."""
+    return compile_bom(compile_recipe_graph(MATERIALS, RECIPES))
+
+
+class TestCompileBom:
+    """Tests for the coefficient and requirements matrices."""
+
+    def test_primary_recipe_is_first_with_inputs(self, bom):
+        """Frame uses the first of its two recipes; mined materials are raw."""
+        rows = primary_recipes(bom.graph)
+        assert bom.graph.recipe_ids[rows[3]] == 4
+        assert rows[0] == -1 and rows[1] == -1
+        assert bom.raw.tolist() == [True, True, False, False, True]
+
+    def test_coefficients_per_unit(self, bom):
+        """A[i, j] is input i per unit of j."""
+        assert bom.coefficients[0, 2] == 2          # 4 Ore per 2 Plate
+        assert bom.coefficients[2, 3] == 3          # 3 Plate per Frame
+        assert bom.coefficients[:, 0].sum() == 0    # Ore has no inputs
+
+    def test_requirements_through_levels(self, bom):
+        """One Frame takes 3 Plate, 6 Ore and 3 Coal in total."""
+        assert bom.requirements[:, 3].tolist() == pytest.approx([6, 3, 3, 1, 0])
+
+    def test_other_recipe_choice(self):
+        """Passing recipe rows explodes along those recipes instead."""
+        graph = compile_recipe_graph(MATERIALS, RECIPES)
+        rows = primary_recipes(graph)
+        rows[3] = int(np.flatnonzero(graph.recipe_ids == 5)[0])
+        bom = compile_bom(graph, rows)
+        assert bom.requirements[:, 3].tolist() == pytest.approx([0, 0, 0, 1, 1])
+
+    def test_unproductive_cycle_rejected(self):
+        """A cycle that consumes more than it makes cannot be exploded."""
+        materials = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}]
+        recipes = [recipe(1, 1, 1, [(2, 2)]), recipe(2, 2, 1, [(1, 1)])]
+        with pytest.raises(ValueError):
+            compile_bom(compile_recipe_graph(materials, recipes))
+
+    def test_catalog_is_productive(self):
+        """The shipped catalog compiles with its primary recipes."""
+        bom = load_bom()
+        assert bom is not None
+        assert bom.requirements.shape == (182, 182)
+        assert load_bom() is bom
+
+
+class TestExplodeContracts:
+    """Tests for contract demand explosion."""
+
+    CONTRACTS = {
+        "Acme": {"Frame": contract(10, 4), "Unknown Good": contract(5)},
+        "Beta Co": {"Plate": contract(4), "Ore": contract(7)},
+    }
+
+    def test_demand_matrix_columns(self, bom):
+        """One column per known contract; unknown goods are skipped."""
+        labels, demand = demand_matrix(self.CONTRACTS, bom.graph)
+        assert labels == [("Acme", "Frame"), ("Beta Co", "Plate"), ("Beta Co", "Ore")]
+        assert demand[:, 0].tolist() == [0, 0, 0, 10, 0]
+
+    def test_raw_demand_per_contract(self, bom):
+        """Each contract is exploded into raw materials only."""
+        exploded = explode_contracts(self.CONTRACTS, bom)
+        frame = exploded[exploded["Good"] == "Frame"].set_index("Material")["Daily Units"].to_dict()
+        assert frame == pytest.approx({"Ore": 60, "Coal": 30})
+        assert set(exploded["Material"]) == {"Ore", "Coal"}
+
+    def test_guild_totals(self, bom):
+        """Totals add up over contracts, with weight and contract counts."""
+        demand = raw_material_demand(self.CONTRACTS, bom).set_index("Material")
+        # Frame 10 -> 60 Ore, 30 Coal; Plate 4 -> 8 Ore, 4 Coal; Ore 7
+        assert demand.loc["Ore", "Daily Units"] == pytest.approx(75)
+        assert demand.loc["Coal", "Daily Units"] == pytest.approx(34)
+        assert demand.loc["Coal", "Weight"] == pytest.approx(68)
+        assert demand.loc["Ore", "Contracts"] == 3
+        assert demand.index[0] == "Ore"
+
+    def test_remaining_only(self, bom):
+        """Fulfilled amounts are taken off before exploding."""
+        demand = raw_material_demand(self.CONTRACTS, bom, remaining_only=True).set_index("Material")
+        # Frame 6 -> 36 Ore, 18 Coal; Plate 4 -> 8 Ore, 4 Coal; Ore 7
+        assert demand.loc["Ore", "Daily Units"] == pytest.approx(51)
+
+    def test_no_contracts(self, bom):
+        """No contracts give an empty table with the usual columns."""
+        assert list(raw_material_demand({}, bom).columns) == ["Material", "Daily Units", "Weight", "Contracts"]
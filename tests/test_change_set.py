@@ -0,0 +1,152 @@
+"""Tests for change set computation and application."""
+import copy
+import pytest
+from gt_guild_app.core.change_set import (
+    compute_change_set,
+    apply_change_set,
+    is_empty,
+    touched_companies,
+    touched_goods,
+    summarize_change_set
+)
+
+
+def make_good(name, planet='', discount=0, live=0):
+    return {
+        'Produced Goods': name, 'Planet Produced': planet, 'Guildees Pay:': 0,
+        'Live EXC Price': live, 'Live AVG Price': 0, 'Guild Max': 0, 'Guild Min': 0,
+        'Guild % Discount': discount, 'Guild Fixed Discount': 0
+    }
+
+
+def make_company(name, goods, professions=None, timezone='UTC +00:00'):
+    professions = professions or ['Metallurgy']
+    return {
+        'name': name, 'industry': ', '.join(professions), 'professions': professions,
+        'timezone': timezone, 'local_time': 'N/A', 'goods': goods
+    }
+
+
+@pytest.fixture
+def companies():
+    return [
+        make_company('Acme', [make_good('Steel', discount=10), make_good('Iron Ore')]),
+        make_company('Beta Co', [make_good('Rations')], professions=['Agriculture']),
+    ]
+
+
+class TestComputeChangeSet:
+    """Tests for compute_change_set function."""
+
+    def test_identical_data_is_empty(self, companies):
+        """No differences produce an empty change set"""
+        changes = compute_change_set(companies, copy.deepcopy(companies))
+        assert is_empty(changes)
+        assert summarize_change_set(changes) == '+0 -0 ~0'
+
+    def test_added_and_removed_companies(self, companies):
+        """Companies only on one side are added or removed"""
+        new = [companies[0], make_company('Gamma', [make_good('Flux')])]
+        changes = compute_change_set(companies, new)
+
+        assert [c['name'] for c in changes['added']] == ['Gamma']
+        assert [c['name'] for c in changes['removed']] == ['Beta Co']
+        assert changes['modified'] == {}
+
+    def test_company_without_goods_not_added(self, companies):
+        """A goods-less company dropped by the feather snapshot is not reported as added"""
+        from gt_guild_app.core.data_manager import companies_to_feather, feather_to_companies
+        new = companies + [make_company('Idle Co', [])]
+        snapshot = feather_to_companies(companies_to_feather(new))
+
+        changes = compute_change_set(snapshot, new, skip_empty_added=True)
+
+        assert [c['name'] for c in snapshot] == ['Acme', 'Beta Co']
+        assert is_empty(changes)
+        # In-memory snapshots keep such companies, so by default they are added
+        assert [c['name'] for c in compute_change_set(snapshot, new)['added']] == ['Idle Co']
+
+    def test_modified_fields_and_goods(self, companies):
+        """Field and goods edits are recorded per company"""
+        new = copy.deepcopy(companies)
+        new[0]['timezone'] = 'UTC +01:00'
+        new[0]['goods'][0]['Guild % Discount'] = 15
+        new[0]['goods'].pop(1)
+        new[0]['goods'].append(make_good('Truss'))
+
+        diff = compute_change_set(companies, new)['modified']['Acme']
+
+        assert diff['fields'] == {'timezone': 'UTC +01:00'}
+        assert diff['goods_modified'] == {('Steel', 0): {'Guild % Discount': 15}}
+        assert diff['goods_removed'] == [('Iron Ore', 0)]
+        assert [g['Produced Goods'] for g in diff['goods_added']] == ['Truss']
+
+    def test_derived_price_fields_ignored(self, companies):
+        """Live prices and Guildees Pay are not treated as changes"""
+        new = copy.deepcopy(companies)
+        new[0]['goods'][0]['Live EXC Price'] = 500
+        new[0]['goods'][0]['Guildees Pay:'] = 450
+        assert is_empty(compute_change_set(companies, new))
+
+    def test_duplicate_goods_matched_by_occurrence(self):
+        """Repeated goods rows are matched in order"""
+        old = [make_company('Acme', [make_good('Steel', planet='A'), make_good('Steel', planet='B')])]
+        new = copy.deepcopy(old)
+        new[0]['goods'][1]['Planet Produced'] = 'C'
+
+        diff = compute_change_set(old, new)['modified']['Acme']
+        assert diff['goods_modified'] == {('Steel', 1): {'Planet Produced': 'C'}}
+
+    def test_touched_names(self, companies):
+        """Touched companies and goods cover every kind of change"""
+        new = copy.deepcopy(companies[:1])
+        new[0]['goods'][1]['Planet Produced'] = 'Seashell 1'
+        changes = compute_change_set(companies, new)
+
+        assert touched_companies(changes) == {'Acme', 'Beta Co'}
+        assert touched_goods(changes) == {'Iron Ore', 'Rations'}
+
+
+class TestApplyChangeSet:
+    """Tests for apply_change_set function."""
+
+    def test_apply_reproduces_new_data(self, companies):
+        """Applying old -> new to a copy of old yields new"""
+        new = copy.deepcopy(companies)
+        new[0]['professions'] = ['Construction']
+        new[0]['goods'][0]['Guild % Discount'] = 20
+        new[1]['goods'].append(make_good('Tools'))
+        new.append(make_company('Gamma', [make_good('Flux')]))
+
+        current = copy.deepcopy(companies)
+        apply_change_set(current, compute_change_set(companies, new))
+
+        assert current == new
+
+    def test_untouched_data_preserved(self, companies):
+        """Companies and goods outside the change set keep their objects and values"""
+        new = copy.deepcopy(companies)
+        new[0]['goods'][0]['Guild % Discount'] = 20
+        changes = compute_change_set(companies, new)
+
+        current = copy.deepcopy(companies)
+        beta = current[1]
+        current[0]['goods'][1]['Live EXC Price'] = 99
+        apply_change_set(current, changes)
+
+        assert current[1] is beta
+        assert current[0]['goods'][0]['Guild % Discount'] == 20
+        assert current[0]['goods'][1]['Live EXC Price'] == 99
+
+    def test_local_edit_to_other_company_survives(self, companies):
+        """Edits the change set does not mention are not overwritten"""
+        new = copy.deepcopy(companies)
+        new[1]['timezone'] = 'UTC -05:00'
+        changes = compute_change_set(companies, new)
+
+        current = copy.deepcopy(companies)
+        current[0]['goods'].append(make_good('Truss'))
+        apply_change_set(current, changes)
+
+        assert current[1]['timezone'] == 'UTC -05:00'
+        assert [g['Produced Goods'] for g in current[0]['goods']] == ['Steel', 'Iron Ore', 'Truss']
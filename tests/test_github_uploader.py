@@ -0,0 +1,288 @@
+"""Tests for GitHub uploads against a local stub of the Git Data API."""
+import base64
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+import pytest
+from gt_guild_app.integrations.github_uploader import (
+    forget_remote_state,
+    git_blob_sha,
+    push_files_to_github,
+    push_to_github
+)
+
+
+class StubGitHub:
+    """In-memory repository speaking the subset of the Git Data API the uploader uses."""
+
+    def __init__(self):
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.requests = []
+        self.race = False
+        initial = self.store_tree({'README.md': self.store_blob(b'hello'), '.gitkeep': self.store_blob(b'')})
+        self.ref = self.store_commit(initial, [], 'initial')
+
+    def store_blob(self, data):
+        sha = hashlib.sha1(b'blob %d\0' % len(data) + data).hexdigest()
+        self.blobs[sha] = data
+        return sha
+
+    def store_tree(self, files):
+        sha = hashlib.sha1(json.dumps(sorted(files.items())).encode()).hexdigest()
+        self.trees[sha] = dict(files)
+        return sha
+
+    def store_commit(self, tree, parents, message):
+        sha = hashlib.sha1(json.dumps([tree, parents, message, len(self.commits)]).encode()).hexdigest()
+        self.commits[sha] = {'tree': tree, 'parents': parents, 'message': message}
+        return sha
+
+    def files(self):
+        """Current branch contents as {path: bytes}."""
+        tree = self.trees[self.commits[self.ref]['tree']]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+    def handle(self, method, path, query, body):
+        self.requests.append((method, path))
+        parts = path.split('/')[4:]  # after /repos/owner/name/
+        if method == 'POST' and parts == ['git', 'blobs']:
+            return 201, {'sha': self.store_blob(base64.b64decode(body['content']))}
+        if method == 'GET' and parts[:3] == ['git', 'ref', 'heads']:
+            return 200, {'object': {'sha': self.ref}}
+        if method == 'GET' and parts[:2] == ['git', 'commits']:
+            return 200, {'tree': {'sha': self.commits[parts[2]]['tree']}}
+        if method == 'GET' and parts[:2] == ['git', 'trees']:
+            tree = self.trees[parts[2]]
+            return 200, {'tree': [{'path': p, 'type': 'blob', 'sha': s} for p, s in tree.items()]}
+        if method == 'POST' and parts == ['git', 'trees']:
+            files = dict(self.trees[body['base_tree']])
+            for entry in body['tree']:
+                if entry['sha'] is None:
+                    files.pop(entry['path'], None)
+                else:
+                    files[entry['path']] = entry['sha']
+            return 201, {'sha': self.store_tree(files)}
+        if method == 'POST' and parts == ['git', 'commits']:
+            return 201, {'sha': self.store_commit(body['tree'], body['parents'], body['message'])}
+        if method == 'PATCH' and parts[:3] == ['git', 'refs', 'heads']:
+            if self.race:
+                # Someone else pushes just before our ref update
+                self.race = False
+                self.ref = self.store_commit(self.commits[self.ref]['tree'], [self.ref], 'other push')
+            if self.ref not in self.commits[body['sha']]['parents']:
+                return 422, {'message': 'Update is not a fast forward'}
+            self.ref = body['sha']
+            return 200, {'object': {'sha': self.ref}}
+        if parts[:1] == ['contents']:
+            return self.handle_contents(method, '/'.join(parts[1:]), body)
+        return 404, {'message': 'Not Found'}
+
+    def handle_contents(self, method, file_path, body):
+        """Single-file contents API: GET returns the blob SHA, PUT commits a new version."""
+        tree = self.trees[self.commits[self.ref]['tree']]
+        if method == 'GET':
+            if file_path not in tree:
+                return 404, {'message': 'Not Found'}
+            return 200, {'sha': tree[file_path]}
+        if body.get('sha') != tree.get(file_path):
+            return 409, {'message': 'sha does not match'}
+        files = dict(tree)
+        files[file_path] = self.store_blob(base64.b64decode(body['content']))
+        self.ref = self.store_commit(self.store_tree(files), [self.ref], body['message'])
+        return 200, {'content': {'sha': files[file_path]}}
+
+
+@pytest.fixture
+def github():
+    """Serve a StubGitHub over HTTP on a free local port."""
+    forget_remote_state()
+    stub = StubGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _respond(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length)) if length else None
+            status, payload = stub.handle(self.command, url.path, url.query, body)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_PUT = _respond
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    stub.url = f"http://127.0.0.1:{server.server_port}"
+    yield stub
+    server.shutdown()
+    server.server_close()
+    forget_remote_state()
+
+
+@pytest.fixture
+def export_files(tmp_path):
+    """A fake repository with an api_exports directory."""
+    (tmp_path / '.git').mkdir()
+    exports = tmp_path / 'api_exports'
+    (exports / 'goods').mkdir(parents=True)
+    (exports / 'all_goods.json').write_bytes(b'{"data":[]}')
+    (exports / 'goods' / 'steel.json').write_bytes(b'{"good":"Steel"}')
+    return [exports / 'all_goods.json', exports / 'goods' / 'steel.json']
+
+
+def push(github, paths, **kwargs):
+    return push_files_to_github([str(p) for p in paths], 'owner', 'repo', github_token='token',
+                                commit_message='Update', api_url=github.url, **kwargs)
+
+
+class TestPushFilesToGithub:
+    """Tests for push_files_to_github function."""
+
+    def test_single_commit_for_all_files(self, github, export_files):
+        """All files land in one commit on top of the branch head"""
+        head = github.ref
+        assert push(github, export_files)
+
+        assert github.commits[github.ref]['parents'] == [head]
+        files = github.files()
+        assert files['api_exports/all_goods.json'] == b'{"data":[]}'
+        assert files['api_exports/goods/steel.json'] == b'{"good":"Steel"}'
+        assert files['README.md'] == b'hello'
+        assert [r for r in github.requests if r[0] == 'PATCH'] == [('PATCH', '/repos/owner/repo/git/refs/heads/main')]
+
+    def test_unchanged_files_make_no_commit(self, github, export_files):
+        """Pushing identical content leaves the branch where it is"""
+        push(github, export_files)
+        head = github.ref
+        github.requests.clear()
+
+        assert push(github, export_files)
+        assert github.ref == head
+        assert not [r for r in github.requests if r[0] == 'PATCH']
+
+    def test_unchanged_files_make_no_requests(self, github, export_files):
+        """Once the remote state is known, an identical push never touches the network"""
+        push(github, export_files)
+        github.requests.clear()
+
+        assert push(github, export_files, prune_prefixes=['api_exports/goods/'])
+        assert github.requests == []
+
+    def test_only_changed_blobs_uploaded(self, github, export_files):
+        """Files whose blob SHA matches the remote are not re-uploaded"""
+        push(github, export_files)
+        github.requests.clear()
+        export_files[0].write_bytes(b'{"data":[1]}')
+
+        assert push(github, export_files)
+        assert [r[0] for r in github.requests] == ['POST', 'POST', 'POST', 'PATCH']
+        assert github.files()['api_exports/all_goods.json'] == b'{"data":[1]}'
+
+    def test_files_already_on_remote_skipped_on_first_push(self, github, export_files):
+        """A cold cache reads the branch once instead of uploading identical files"""
+        assert push(github, export_files)
+        forget_remote_state()
+        github.requests.clear()
+
+        assert push(github, export_files)
+        assert [r[0] for r in github.requests] == ['GET', 'GET', 'GET']
+
+    def test_retries_when_branch_moves(self, github, export_files):
+        """A concurrent push is handled by rebuilding the commit on the new head"""
+        github.race = True
+        assert push(github, export_files)
+
+        assert github.commits[github.commits[github.ref]['parents'][0]]['message'] == 'other push'
+        assert 'api_exports/goods/steel.json' in github.files()
+
+    def test_prunes_removed_shards(self, github, export_files):
+        """Remote files under a prune prefix that no longer exist locally are deleted"""
+        push(github, export_files)
+        export_files[1].unlink()
+
+        assert push(github, export_files[:1], prune_prefixes=['api_exports/goods/'])
+
+        files = github.files()
+        assert 'api_exports/goods/steel.json' not in files
+        assert 'api_exports/all_goods.json' in files
+        assert '.gitkeep' in files
+
+    def test_missing_token(self, github, export_files, monkeypatch):
+        """Without a token nothing is pushed"""
+        monkeypatch.setattr('gt_guild_app.integrations.github_uploader.get_github_token', lambda: None)
+        assert not push_files_to_github([str(export_files[0])], 'owner', 'repo', api_url=github.url)
+        assert github.requests == []
+
+    def test_pushes_counted_in_metrics(self, github, export_files, monkeypatch):
+        """Successful and failed pushes are counted separately"""
+        from gt_guild_app.integrations import github_uploader
+        ok_before = github_uploader.GITHUB_PUSHES.value(result="ok")
+        failed_before = github_uploader.GITHUB_PUSHES.value(result="failed")
+
+        assert push(github, export_files)
+        monkeypatch.setattr('gt_guild_app.integrations.github_uploader.get_github_token', lambda: None)
+        assert not push_files_to_github([str(export_files[0])], 'owner', 'repo', api_url=github.url)
+
+        assert github_uploader.GITHUB_PUSHES.value(result="ok") == ok_before + 1
+        assert github_uploader.GITHUB_PUSHES.value(result="failed") == failed_before + 1
+        assert github_uploader.GITHUB_PUSH_LAST_SUCCESS.value() is not None
+
+
+class TestGitBlobSha:
+    """Tests for git_blob_sha function."""
+
+    def test_matches_git(self):
+        """Same SHA git hash-object produces"""
+        assert git_blob_sha(b'') == 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+        assert git_blob_sha(b'hello\n') == 'ce013625030ba8dba906f756967f9e9ca394464a'
+
+
+class TestPushToGithub:
+    """Tests for push_to_github function."""
+
+    def single(self, github, path):
+        return push_to_github(str(path), 'owner', 'repo', github_token='token', api_url=github.url)
+
+    def test_unchanged_file_skipped(self, github, export_files):
+        """The second push of the same content makes no requests"""
+        assert self.single(github, export_files[0])
+        assert github.files()['api_exports/all_goods.json'] == b'{"data":[]}'
+        github.requests.clear()
+
+        assert self.single(github, export_files[0])
+        assert github.requests == []
+
+    def test_cached_sha_saves_get(self, github, export_files):
+        """Updates reuse the SHA returned by the previous PUT"""
+        self.single(github, export_files[0])
+        github.requests.clear()
+        export_files[0].write_bytes(b'{"data":[2]}')
+
+        assert self.single(github, export_files[0])
+        assert [r[0] for r in github.requests] == ['PUT']
+        assert github.files()['api_exports/all_goods.json'] == b'{"data":[2]}'
+
+    def test_stale_sha_refreshed_on_conflict(self, github, export_files):
+        """A 409 from someone else's edit re-reads the SHA and retries"""
+        self.single(github, export_files[0])
+        github.handle_contents('PUT', 'api_exports/all_goods.json', {
+            'sha': git_blob_sha(b'{"data":[]}'),
+            'content': base64.b64encode(b'{"other":1}').decode(), 'message': 'other'
+        })
+        github.requests.clear()
+        export_files[0].write_bytes(b'{"data":[3]}')
+
+        assert self.single(github, export_files[0])
+        assert [r[0] for r in github.requests] == ['PUT', 'GET', 'PUT']
+        assert github.files()['api_exports/all_goods.json'] == b'{"data":[3]}'
@@ -0,0 +1,422 @@
+"""Tests for Google Sheets import parsing."""
+import csv
+import io
+import threading
+import time
+import pytest
+import pandas as pd
+from gt_guild_app.integrations.google_sheets import (
+    parse_guild_sheet,
+    parse_price_column,
+    parse_professions,
+    read_sheet_csv,
+    import_from_google_sheet_if_changed,
+    import_from_google_sheets_if_changed,
+    merge_companies,
+    parse_sheet_sources,
+    forget_last_import,
+    commit_import,
+    IMPORT_CHANGED,
+    IMPORT_UNCHANGED,
+    IMPORT_FAILED
+)
+import gt_guild_app.integrations.google_sheets as google_sheets
+
+
+MATERIALS = {'Steel', 'Iron Ore', 'Rations'}
+
+
+def good_row(good, company=None, industry=None, timezone=None, planet=None,
+             guild_max=None, guild_min=None, discount=None, fixed=None):
+    """Build a sparse sheet row using the importer's column positions."""
+    row = {0: company, 1: industry, 2: timezone, 11: good, 13: planet,
+           17: guild_max, 18: guild_min, 19: discount, 20: fixed}
+    return {k: v for k, v in row.items() if v is not None}
+
+
+HEADER = {0: 'Company Name', 1: 'Profession', 2: 'Timezone'}
+
+
+def make_csv(rows, ncols=21):
+    """Render sparse rows as CSV export bytes, with a leading title line."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['Guild Sheet'] + [''] * (ncols - 1))
+    for row in rows:
+        writer.writerow(['' if row.get(col) is None else row.get(col) for col in range(ncols)])
+    return buffer.getvalue().encode('utf-8')
+
+
+class TestParsePriceColumn:
+    """Tests for parse_price_column function."""
+
+    def test_currency_and_percent(self):
+        """Currency symbols, percent signs and thousands separators are stripped"""
+        result = parse_price_column(pd.Series(['$1,234', '15%', ' 7 ', None, '', 'abc']))
+        assert list(result) == [1234.0, 15.0, 7.0, 0.0, 0.0, 0.0]
+
+    def test_numeric_values(self):
+        """Already numeric cells pass through"""
+        result = parse_price_column(pd.Series([12.0, float('nan'), 3.5]))
+        assert list(result) == [12.0, 0.0, 3.5]
+
+
+class TestParseProfessions:
+    """Tests for parse_professions function."""
+
+    def test_separators(self):
+        """Commas, ampersands, 'and' and newlines all split professions"""
+        assert parse_professions('Agriculture, Food Production') == ['Agriculture', 'Food Production']
+        assert parse_professions('Chemistry & Science') == ['Chemistry', 'Science']
+        assert parse_professions('Metallurgy and Construction\nScience') == ['Metallurgy', 'Construction', 'Science']
+
+    def test_placeholders(self):
+        """Placeholder text is dropped"""
+        assert parse_professions('Select Profession(s)') == []
+        assert parse_professions('Unknown') == []
+
+
+class TestParseGuildSheet:
+    """Tests for parse_guild_sheet function."""
+
+    def parse(self, rows, ncols=21):
+        """Parse sparse rows through the CSV reader the importer uses."""
+        return parse_guild_sheet(read_sheet_csv(make_csv(rows, ncols)), MATERIALS)
+
+    def test_company_context_carried_forward(self):
+        """Goods rows below a company row belong to that company"""
+        result = self.parse([
+            {0: 'Intro text'},
+            HEADER,
+            good_row('Steel', company='Acme', industry='Metallurgy', timezone='UTC +01:00',
+                     planet='Seashell 1', guild_max='$1,200', guild_min='$900', discount='10%'),
+            good_row('Iron Ore', discount='5%', fixed='$20'),
+            good_row('Rations', company='Beta Co', industry='Agriculture'),
+        ])
+
+        assert [c['name'] for c in result] == ['Acme', 'Beta Co']
+        acme = result[0]
+        assert acme['timezone'] == 'UTC +01:00'
+        assert acme['professions'] == ['Metallurgy']
+        assert acme['goods'][0] == {
+            'Produced Goods': 'Steel', 'Planet Produced': 'Seashell 1', 'Guildees Pay:': 0,
+            'Live EXC Price': 0, 'Live AVG Price': 0, 'Guild Max': 1200, 'Guild Min': 900,
+            'Guild % Discount': 10, 'Guild Fixed Discount': 0
+        }
+        assert acme['goods'][1]['Guild Fixed Discount'] == 20
+        assert result[1]['timezone'] == 'UTC +00:00'
+
+    def test_skips_placeholders_and_unknown_materials(self):
+        """Placeholder goods, unknown materials and placeholder planets are dropped"""
+        result = self.parse([
+            HEADER,
+            good_row('Select Good', company='Acme', industry='Metallurgy'),
+            good_row('Unobtainium'),
+            good_row(' Steel ', planet='Select Planet'),
+        ])
+
+        assert len(result[0]['goods']) == 1
+        assert result[0]['goods'][0]['Produced Goods'] == 'Steel'
+        assert result[0]['goods'][0]['Planet Produced'] == ''
+
+    def test_additional_professions(self):
+        """Column B on rows without a company adds professions"""
+        result = self.parse([
+            HEADER,
+            good_row('Steel', company='Acme', industry='Metallurgy'),
+            {1: 'Construction', 11: 'Iron Ore'},
+            {1: 'Select Profession'},
+        ])
+
+        assert result[0]['professions'] == ['Metallurgy', 'Construction']
+
+    def test_header_row_resets_context(self):
+        """Rows after a repeated header row have no company"""
+        result = self.parse([
+            HEADER,
+            good_row('Steel', company='Acme', industry='Metallurgy'),
+            HEADER,
+            good_row('Iron Ore'),
+        ])
+
+        assert len(result) == 1
+        assert len(result[0]['goods']) == 1
+
+    def test_missing_header(self):
+        """Sheets without a 'Company Name' header return None"""
+        assert self.parse([good_row('Steel', company='Acme')]) is None
+
+    def test_fixed_discount_column_optional(self):
+        """Column U defaults to 0 when the sheet stops at column T"""
+        result = self.parse([
+            HEADER,
+            good_row('Steel', company='Acme', industry='Metallurgy', discount='10'),
+        ], ncols=20)
+
+        assert result[0]['goods'][0]['Guild Fixed Discount'] == 0
+        assert result[0]['goods'][0]['Guild % Discount'] == 10
+
+
+class TestReadSheetCsv:
+    """Tests for read_sheet_csv function."""
+
+    def test_reads_only_importer_columns(self):
+        """Only the importer's columns come back, named and as strings"""
+        data = make_csv([
+            HEADER,
+            good_row('Steel', company='Acme', industry='Metallurgy\nConstruction',
+                     guild_max='$1,200', discount='10%'),
+        ])
+
+        sheet = read_sheet_csv(data)
+
+        assert list(sheet.columns) == [
+            'company', 'industry', 'timezone', 'good', 'planet',
+            'guild_max', 'guild_min', 'guild_discount', 'guild_fixed_discount'
+        ]
+        assert sheet.loc[1, 'industry'] == 'Metallurgy\nConstruction'
+        assert sheet.loc[1, 'guild_max'] == '$1,200'
+        assert pd.isna(sheet.loc[1, 'guild_min'])
+
+    def test_optional_fixed_discount_column(self):
+        """Sheets ending at column T read column U as empty"""
+        sheet = read_sheet_csv(make_csv([HEADER], ncols=20))
+        assert sheet['guild_fixed_discount'].isna().all()
+
+    def test_too_few_columns(self):
+        """Sheets without the pricing columns cannot be imported"""
+        assert read_sheet_csv(make_csv([HEADER], ncols=15)) is None
+
+
+class TestImportIfChanged:
+    """Tests for import_from_google_sheet_if_changed function."""
+
+    URL = "https://docs.google.com/spreadsheets/d/test-sheet/edit#gid=0"
+
+    @pytest.fixture(autouse=True)
+    def sheet(self, monkeypatch):
+        """Serve sheet bytes from a mutable holder and count parses."""
+        forget_last_import()
+        holder = {'data': None, 'parses': 0}
+        original_read = google_sheets.read_sheet_csv
+
+        def counting_read(data):
+            holder['parses'] += 1
+            return original_read(data)
+
+        monkeypatch.setattr(google_sheets, 'download_sheet_csv', lambda url: holder['data'])
+        monkeypatch.setattr(google_sheets, 'read_sheet_csv', counting_read)
+        yield holder
+        forget_last_import()
+
+    def test_unchanged_bytes_skip_parse(self, sheet):
+        """Identical CSV bytes are not parsed again"""
+        sheet['data'] = make_csv([HEADER, good_row('Steel', company='Acme', industry='Metallurgy')])
+
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+        assert status == IMPORT_CHANGED
+        assert companies[0]['name'] == 'Acme'
+        commit_import([self.URL])
+
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+        assert status == IMPORT_UNCHANGED
+        assert companies is None
+        assert sheet['parses'] == 1
+
+    def test_failed_apply_is_imported_again(self, sheet):
+        """Without commit_import (the caller's apply or save failed) the same sheet stays changed"""
+        sheet['data'] = make_csv([HEADER, good_row('Steel', company='Acme', industry='Metallurgy')])
+        import_from_google_sheet_if_changed(self.URL, MATERIALS)
+
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert companies[0]['name'] == 'Acme'
+        assert sheet['parses'] == 1
+
+        commit_import([self.URL])
+        assert import_from_google_sheet_if_changed(self.URL, MATERIALS) == (None, IMPORT_UNCHANGED)
+
+    def test_ignored_column_edit_is_unchanged(self, sheet):
+        """Edits outside the imported data parse to the same result"""
+        row = good_row('Steel', company='Acme', industry='Metallurgy')
+        sheet['data'] = make_csv([HEADER, row])
+        import_from_google_sheet_if_changed(self.URL, MATERIALS)
+        commit_import([self.URL])
+
+        sheet['data'] = make_csv([HEADER, {**row, 5: 'note'}])
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+
+        assert status == IMPORT_UNCHANGED
+        assert sheet['parses'] == 2
+
+    def test_changed_data(self, sheet):
+        """A price edit is reported as changed"""
+        sheet['data'] = make_csv([HEADER, good_row('Steel', company='Acme', discount='10')])
+        import_from_google_sheet_if_changed(self.URL, MATERIALS)
+
+        sheet['data'] = make_csv([HEADER, good_row('Steel', company='Acme', discount='15')])
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert companies[0]['goods'][0]['Guild % Discount'] == 15
+
+    def test_download_failure(self, sheet):
+        """Failed downloads are reported as failed"""
+        companies, status = import_from_google_sheet_if_changed(self.URL, MATERIALS)
+        assert (companies, status) == (None, IMPORT_FAILED)
+
+
+def make_company(name, goods, professions=None, timezone='UTC +00:00'):
+    """Build a parsed company with the given goods names."""
+    professions = professions or ['Metallurgy']
+    return {
+        'name': name, 'industry': professions[0], 'professions': professions,
+        'timezone': timezone, 'local_time': 'N/A',
+        'goods': [{'Produced Goods': good, 'Planet Produced': planet} for good, planet in goods]
+    }
+
+
+class TestParseSheetSources:
+    """Tests for parse_sheet_sources function."""
+
+    def test_single_url_and_separated_string(self):
+        """Single URLs and comma/newline separated strings are split"""
+        assert parse_sheet_sources('https://a') == ['https://a']
+        assert parse_sheet_sources('https://a, https://b\nhttps://c') == ['https://a', 'https://b', 'https://c']
+        assert parse_sheet_sources('') == []
+
+    def test_tabs_expand_and_duplicates_drop(self):
+        """Tables with gids expand to one source per tab, keeping order"""
+        sources = parse_sheet_sources([
+            'https://sheet/edit#gid=0',
+            {'url': 'https://sheet/edit#gid=0', 'gids': ['0', 55]},
+            {'url': 'https://other/edit', 'gids': ['7']},
+        ])
+        assert sources == ['https://sheet/edit#gid=0', 'https://sheet/edit#gid=55', 'https://other/edit#gid=7']
+
+
+class TestMergeCompanies:
+    """Tests for merge_companies function."""
+
+    def test_earlier_source_wins_details_and_goods(self):
+        """Company details and duplicate goods come from the earlier source"""
+        first = [make_company('Acme', [('Steel', 'A')], timezone='UTC +01:00')]
+        second = [make_company('Acme', [('Steel', 'B'), ('Iron Ore', 'B')],
+                               professions=['Construction'], timezone='UTC -05:00')]
+
+        merged = merge_companies([first, second])
+
+        assert len(merged) == 1
+        acme = merged[0]
+        assert acme['timezone'] == 'UTC +01:00'
+        assert acme['professions'] == ['Metallurgy', 'Construction']
+        assert [(g['Produced Goods'], g['Planet Produced']) for g in acme['goods']] == [('Steel', 'A'), ('Iron Ore', 'B')]
+
+    def test_duplicates_within_one_source_kept(self):
+        """The same good on two rows of one source is not collapsed"""
+        merged = merge_companies([[make_company('Acme', [('Steel', 'A'), ('Steel', 'B')])], []])
+        assert len(merged[0]['goods']) == 2
+
+    def test_inputs_not_mutated(self):
+        """Merging does not modify the source company lists"""
+        first = [make_company('Acme', [('Steel', 'A')])]
+        second = [make_company('Acme', [('Iron Ore', 'B')], professions=['Construction'])]
+        merge_companies([first, second])
+        assert first[0]['professions'] == ['Metallurgy']
+        assert len(first[0]['goods']) == 1
+
+
+class TestImportMultipleSheets:
+    """Tests for import_from_google_sheets_if_changed function."""
+
+    URLS = ["https://docs.google.com/spreadsheets/d/one/edit#gid=0",
+            "https://docs.google.com/spreadsheets/d/two/edit#gid=0"]
+
+    @pytest.fixture(autouse=True)
+    def sheets(self, monkeypatch):
+        """Serve per-URL sheet bytes from a mutable dict."""
+        forget_last_import()
+        data = {}
+        monkeypatch.setattr(google_sheets, 'download_sheet_csv', lambda url: data.get(url))
+        yield data
+        forget_last_import()
+
+    def test_merges_in_source_order(self, sheets):
+        """Results are merged in the listed order"""
+        sheets[self.URLS[0]] = make_csv([HEADER, good_row('Steel', company='Acme', discount='10')])
+        sheets[self.URLS[1]] = make_csv([HEADER, good_row('Steel', company='Acme', discount='20'),
+                                         good_row('Rations', company='Beta Co')])
+
+        companies, status = import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert [c['name'] for c in companies] == ['Acme', 'Beta Co']
+        assert companies[0]['goods'][0]['Guild % Discount'] == 10
+
+    def test_one_changed_source_remerges_all(self, sheets):
+        """Unchanged sources are reused from the last import when another changes"""
+        sheets[self.URLS[0]] = make_csv([HEADER, good_row('Steel', company='Acme')])
+        sheets[self.URLS[1]] = make_csv([HEADER, good_row('Rations', company='Beta Co')])
+        import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+        commit_import(self.URLS)
+
+        assert import_from_google_sheets_if_changed(self.URLS, MATERIALS) == (None, IMPORT_UNCHANGED)
+
+        sheets[self.URLS[1]] = make_csv([HEADER, good_row('Rations', company='Beta Co', discount='5')])
+        companies, status = import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert [c['name'] for c in companies] == ['Acme', 'Beta Co']
+
+    def test_failed_source_uses_last_import(self, sheets):
+        """A source that stops responding keeps its last imported companies"""
+        sheets[self.URLS[0]] = make_csv([HEADER, good_row('Steel', company='Acme')])
+        sheets[self.URLS[1]] = make_csv([HEADER, good_row('Rations', company='Beta Co')])
+        import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+        commit_import(self.URLS)
+
+        del sheets[self.URLS[0]]
+        sheets[self.URLS[1]] = make_csv([HEADER, good_row('Rations', company='Beta Co', discount='5')])
+        companies, status = import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert [c['name'] for c in companies] == ['Acme', 'Beta Co']
+
+    def test_failures_counted_in_metrics(self, sheets):
+        """Failed sources and imports show up in the metrics"""
+        sources_before = google_sheets.SHEET_SOURCE_FAILURES.value()
+        failed_before = google_sheets.SHEET_IMPORTS.value(status=IMPORT_FAILED)
+        sheets[self.URLS[0]] = make_csv([HEADER, good_row('Steel', company='Acme')])
+
+        import_from_google_sheets_if_changed(self.URLS, MATERIALS)
+
+        assert google_sheets.SHEET_SOURCE_FAILURES.value() == sources_before + 1
+        assert google_sheets.SHEET_IMPORTS.value(status=IMPORT_FAILED) == failed_before + 1
+
+    def test_failed_source_without_history_fails(self, sheets):
+        """A source that never imported fails the whole import"""
+        sheets[self.URLS[0]] = make_csv([HEADER, good_row('Steel', company='Acme')])
+        assert import_from_google_sheets_if_changed(self.URLS, MATERIALS) == (None, IMPORT_FAILED)
+
+    def test_sources_fetched_concurrently(self, sheets, monkeypatch):
+        """Downloads overlap instead of running one after another"""
+        active = {'now': 0, 'peak': 0}
+        lock = threading.Lock()
+        payload = make_csv([HEADER, good_row('Steel', company='Acme')])
+
+        def slow_download(url):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+            time.sleep(0.05)
+            with lock:
+                active['now'] -= 1
+            return payload
+
+        monkeypatch.setattr(google_sheets, 'download_sheet_csv', slow_download)
+        urls = [f"https://docs.google.com/spreadsheets/d/s{i}/edit" for i in range(4)]
+        companies, status = import_from_google_sheets_if_changed(urls, MATERIALS)
+
+        assert status == IMPORT_CHANGED
+        assert active['peak'] > 1
@@ -0,0 +1,289 @@
+"""Tests for the public JSON exporter."""
+import gzip
+import hashlib
+import json
+import os
+import pytest
+import pyarrow as pa
+import pyarrow.parquet as pq
+from gt_guild_app.integrations.json_exporter import (
+    export_to_public_json,
+    write_json_document,
+    exported_files,
+    shard_slug,
+    build_listing_table,
+    LISTING_SCHEMA
+)
+import gt_guild_app.integrations.json_exporter as json_exporter
+
+
+def make_good(name, pay, planet=''):
+    return {
+        'Produced Goods': name, 'Planet Produced': planet, 'Guildees Pay:': pay,
+        'Live EXC Price': pay + 10, 'Live AVG Price': pay + 5, 'Guild Max': 0, 'Guild Min': 0,
+        'Guild % Discount': 10, 'Guild Fixed Discount': 0
+    }
+
+
+@pytest.fixture
+def companies():
+    return [
+        {'name': 'Beta Co', 'industry': 'Agriculture', 'professions': ['Agriculture'],
+         'timezone': 'UTC -05:00', 'local_time': 'N/A',
+         'goods': [make_good('Steel', 90.5, 'Seashell 1'), make_good('Rations', 12)]},
+        {'name': 'Acme', 'industry': 'Metallurgy', 'professions': ['Metallurgy'],
+         'timezone': 'UTC +01:00', 'local_time': 'N/A', 'goods': [make_good('Steel', 100)]},
+        {'name': 'Empty', 'industry': 'Unknown', 'professions': [], 'timezone': 'UTC +00:00',
+         'local_time': 'N/A', 'goods': []},
+    ]
+
+
+class TestWriteJsonDocument:
+    """Tests for write_json_document function."""
+
+    def test_compact_output_with_gzip_sibling(self, tmp_path):
+        """The document is compact JSON and the .gz copy decompresses to the same bytes"""
+        path = tmp_path / "doc.json"
+        written = write_json_document(path, {'status': 'success', 'count': 2},
+                                      iter([{'a': 1}, {'b': 'é'}]), precompressed=("gz",))
+
+        raw = path.read_bytes()
+        assert raw == '{"status":"success","count":2,"data":[{"a":1},{"b":"é"}]}'.encode('utf-8')
+        assert gzip.decompress((tmp_path / "doc.json.gz").read_bytes()) == raw
+        assert written == [path, tmp_path / "doc.json.gz"]
+
+    def test_empty_items(self, tmp_path):
+        """An empty item stream still writes a valid document"""
+        path = tmp_path / "doc.json"
+        write_json_document(path, {'count': 0}, [], precompressed=())
+        assert json.loads(path.read_text()) == {'count': 0, 'data': []}
+
+    def test_gzip_is_reproducible(self, tmp_path):
+        """Identical content produces identical compressed bytes"""
+        path = tmp_path / "doc.json"
+        write_json_document(path, {}, [1, 2, 3], precompressed=("gz",))
+        first = (tmp_path / "doc.json.gz").read_bytes()
+        write_json_document(path, {}, [1, 2, 3], precompressed=("gz",))
+        assert (tmp_path / "doc.json.gz").read_bytes() == first
+
+    def test_failure_keeps_previous_file(self, tmp_path):
+        """An error while streaming leaves the old export and no temp files behind"""
+        path = tmp_path / "doc.json"
+        write_json_document(path, {}, [1], precompressed=("gz",))
+
+        def broken_items():
+            yield 2
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            write_json_document(path, {}, broken_items(), precompressed=("gz",))
+
+        assert json.loads(path.read_text()) == {'data': [1]}
+        assert sorted(os.listdir(tmp_path)) == ['doc.json', 'doc.json.gz']
+
+    def test_brotli_skipped_when_unavailable(self, tmp_path, monkeypatch):
+        """The .br variant is only written when brotli is installed"""
+        monkeypatch.setattr(json_exporter, 'brotli', None)
+        written = write_json_document(tmp_path / "doc.json", {}, [], precompressed=("gz", "br"))
+        assert [p.name for p in written] == ['doc.json', 'doc.json.gz']
+
+
+class TestExportToPublicJson:
+    """Tests for export_to_public_json function."""
+
+    def test_goods_document(self, tmp_path, companies):
+        """Goods are sorted by name with listings sorted by cheapest pay"""
+        export_to_public_json(companies, str(tmp_path))
+        data = json.loads((tmp_path / "all_goods.json").read_text())
+
+        assert data['goods_count'] == 2
+        assert [g['good'] for g in data['data']] == ['Rations', 'Steel']
+        steel = data['data'][1]
+        assert steel['cheapest_company'] == 'Beta Co'
+        assert steel['cheapest_price'] == 90.5
+        assert [l['company'] for l in steel['listings']] == ['Beta Co', 'Acme']
+
+    def test_companies_document(self, tmp_path, companies):
+        """Companies without goods are left out and the rest are sorted by name"""
+        export_to_public_json(companies, str(tmp_path))
+        data = json.loads((tmp_path / "all_companies.json").read_text())
+
+        assert data['companies_count'] == 2
+        assert [c['company']['name'] for c in data['data']] == ['Acme', 'Beta Co']
+        assert [g['good'] for g in data['data'][1]['company']['goods']] == ['Rations', 'Steel']
+
+    def test_exported_files(self, tmp_path, companies):
+        """exported_files lists the exports and their compressed siblings"""
+        written = export_to_public_json(companies, str(tmp_path))
+        assert sorted(exported_files(str(tmp_path))) == sorted(written)
+        assert (tmp_path / "all_goods.json.gz") in written
+
+
+class TestIncrementalExport:
+    """Tests for content hashing and no-op detection in export_to_public_json."""
+
+    def test_unchanged_data_not_rewritten(self, tmp_path, companies):
+        """A second export of the same data writes nothing"""
+        assert export_to_public_json(companies, str(tmp_path))
+        before = (tmp_path / "all_goods.json").read_bytes()
+
+        assert export_to_public_json(companies, str(tmp_path)) == []
+        assert (tmp_path / "all_goods.json").read_bytes() == before
+
+    def test_content_hash_ignores_timestamps(self, tmp_path, companies):
+        """content_hash stays the same across writes of the same data"""
+        export_to_public_json(companies, str(tmp_path))
+        first = json.loads((tmp_path / "all_goods.json").read_text())['content_hash']
+        (tmp_path / "all_goods.json").unlink()
+
+        export_to_public_json(companies, str(tmp_path))
+        assert json.loads((tmp_path / "all_goods.json").read_text())['content_hash'] == first
+
+    def test_only_changed_document_written(self, tmp_path, companies):
+        """A local time change alone rewrites nothing; a price change rewrites both files"""
+        export_to_public_json(companies, str(tmp_path))
+
+        companies[0]['local_time'] = '3:15 PM'
+        assert export_to_public_json(companies, str(tmp_path)) == []
+
+        companies[0]['goods'][1]['Guildees Pay:'] = 8
+        written = {p.name for p in export_to_public_json(companies, str(tmp_path))}
+        assert {'all_goods.json', 'all_companies.json'} <= written
+
+        data = json.loads((tmp_path / "all_companies.json").read_text())
+        beta = data['data'][1]['company']
+        assert beta['local_time'] == '3:15 PM'
+        assert beta['goods'][0]['guildees_pay'] == 8
+
+    def test_incremental_matches_full_export(self, tmp_path, companies):
+        """Updating a warm export gives the same documents as a fresh one"""
+        warm, cold = tmp_path / "warm", tmp_path / "cold"
+        export_to_public_json(companies, str(warm))
+
+        companies[1]['goods'].append(make_good('Rations', 5, 'Abberon 4'))
+        companies[0]['timezone'] = 'UTC +02:00'
+        del companies[2]
+        companies.insert(0, {'name': 'Gamma', 'industry': 'Chemistry', 'professions': ['Chemistry'],
+                             'timezone': 'UTC +00:00', 'local_time': 'N/A', 'goods': [make_good('Steel', 90.5)]})
+        export_to_public_json(companies, str(warm))
+        json_exporter._export_state.clear()
+        export_to_public_json(companies, str(cold))
+
+        for name in ("all_goods.json", "all_companies.json"):
+            warm_doc = json.loads((warm / name).read_text())
+            cold_doc = json.loads((cold / name).read_text())
+            warm_doc.pop('last_updated'), cold_doc.pop('last_updated')
+            assert warm_doc == cold_doc
+
+    def test_external_file_change_detected(self, tmp_path, companies):
+        """A file replaced on disk (e.g. by a pull) is rewritten"""
+        export_to_public_json(companies, str(tmp_path))
+        (tmp_path / "all_goods.json").write_text('{"content_hash": "other", "data": []}')
+
+        written = export_to_public_json(companies, str(tmp_path))
+        assert [p.name for p in written][0] == 'all_goods.json'
+
+
+class TestShardedExport:
+    """Tests for per-good / per-company shards and the manifest."""
+
+    def test_shards_match_documents(self, tmp_path, companies):
+        """Each shard holds the same entry as the combined document"""
+        export_to_public_json(companies, str(tmp_path))
+        goods = json.loads((tmp_path / "all_goods.json").read_text())['data']
+        listed = json.loads((tmp_path / "all_companies.json").read_text())['data']
+
+        assert json.loads((tmp_path / "goods" / "steel.json").read_text()) == goods[1]
+        assert json.loads((tmp_path / "companies" / "beta-co.json").read_text()) == listed[1]
+        assert sorted(p.name for p in (tmp_path / "companies").iterdir()) == ['acme.json', 'beta-co.json']
+
+    def test_manifest_hashes_and_sizes(self, tmp_path, companies):
+        """The manifest lists every export file with its sha256 and size"""
+        export_to_public_json(companies, str(tmp_path))
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+
+        paths = {item['path'] for item in manifest['data']}
+        assert {'all_goods.json', 'all_goods.json.gz', 'goods/rations.json', 'companies/acme.json'} <= paths
+        assert manifest['files_count'] == len(manifest['data'])
+        for item in manifest['data']:
+            data = (tmp_path / item['path']).read_bytes()
+            assert item['sha256'] == hashlib.sha256(data).hexdigest()
+            assert item['size'] == len(data)
+
+    def test_only_changed_shards_rewritten(self, tmp_path, companies):
+        """A change to one good rewrites its shards and the manifest, not the others"""
+        export_to_public_json(companies, str(tmp_path))
+        companies[0]['goods'][1]['Guild Max'] = 50
+
+        written = {str(p.relative_to(tmp_path)) for p in export_to_public_json(companies, str(tmp_path))}
+
+        assert {'goods/rations.json', 'companies/beta-co.json', 'manifest.json'} <= written
+        assert 'goods/steel.json' not in written
+        assert 'companies/acme.json' not in written
+
+    def test_stale_shards_removed(self, tmp_path, companies):
+        """Shards of goods and companies that are gone are deleted"""
+        export_to_public_json(companies, str(tmp_path))
+        companies[0]['goods'].pop(1)
+
+        export_to_public_json(companies, str(tmp_path))
+
+        assert not (tmp_path / "goods" / "rations.json").exists()
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert 'goods/rations.json' not in {item['path'] for item in manifest['data']}
+
+    def test_slugs(self):
+        """Names become lowercase dash-separated file stems"""
+        assert shard_slug('Iron Ore') == 'iron-ore'
+        assert shard_slug("Drunkenduo's Ruthless Divident") == 'drunkenduo-s-ruthless-divident'
+        assert shard_slug('***') == 'unnamed'
+
+    def test_slug_clashes_get_suffix(self, tmp_path, companies):
+        """Different names with the same slug get distinct shard files"""
+        companies.append({'name': 'ACME', 'industry': 'X', 'professions': [], 'timezone': 'UTC +00:00',
+                          'local_time': 'N/A', 'goods': [make_good('Steel', 1)]})
+        export_to_public_json(companies, str(tmp_path))
+        assert (tmp_path / "companies" / "acme.json").exists()
+        assert (tmp_path / "companies" / "acme-2.json").exists()
+
+
+class TestListingTable:
+    """Tests for the Parquet / Arrow IPC listing table."""
+
+    def test_build_listing_table(self, companies):
+        """Rows follow all_goods.json order with the stable schema"""
+        table = build_listing_table(companies)
+
+        assert table.schema.equals(LISTING_SCHEMA)
+        assert table.column('good').to_pylist() == ['Rations', 'Steel', 'Steel']
+        assert table.column('company').to_pylist() == ['Beta Co', 'Beta Co', 'Acme']
+        assert table.column('guildees_pay').to_pylist() == [12.0, 90.5, 100.0]
+        assert table.column('professions').to_pylist()[2] == ['Metallurgy']
+
+    def test_empty_table_keeps_schema(self):
+        """No listings still produce a table with every column"""
+        assert build_listing_table([]).schema.equals(LISTING_SCHEMA)
+
+    def test_parquet_and_arrow_files(self, tmp_path, companies):
+        """Both files hold the same table and are listed in the manifest"""
+        export_to_public_json(companies, str(tmp_path))
+
+        from_parquet = pq.read_table(tmp_path / "listings.parquet")
+        with pa.memory_map(str(tmp_path / "listings.arrow")) as source:
+            from_arrow = pa.ipc.open_file(source).read_all()
+
+        assert from_parquet.equals(from_arrow)
+        assert from_parquet.num_rows == 3
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert {'listings.parquet', 'listings.arrow'} <= {item['path'] for item in manifest['data']}
+
+    def test_tables_follow_goods_changes(self, tmp_path, companies):
+        """Tables are rewritten only when the listings change"""
+        export_to_public_json(companies, str(tmp_path))
+        json_exporter._export_state.clear()
+        assert export_to_public_json(companies, str(tmp_path)) == []
+
+        companies[1]['goods'][0]['Guildees Pay:'] = 80
+        written = {p.name for p in export_to_public_json(companies, str(tmp_path))}
+        assert {'listings.parquet', 'listings.arrow'} <= written
+        assert pq.read_table(tmp_path / "listings.parquet").column('company').to_pylist()[1] == 'Acme'
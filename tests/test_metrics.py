@@ -0,0 +1,172 @@
+"""Tests for the operational metrics registry and exporters."""
+import subprocess
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from gt_guild_app.core.metrics import (
+    MetricsRegistry,
+    observe,
+    write_textfile,
+    make_metrics_server
+)
+from gt_guild_app.core import data_manager
+# The app's modules share the registry under its top-level name
+from core.metrics import GIT_COMMANDS
+
+
+@pytest.fixture
+def registry():
+    """A fresh registry, so tests do not see the app's metrics."""
+    return MetricsRegistry()
+
+
+class TestRegistry:
+    """Tests for counters, gauges and histograms in the text format."""
+
+    def test_counter_by_label(self, registry):
+        """Counters add up per label set and render one sample each."""
+        fetches = registry.counter("fetch_total", "Fetches", ["result"])
+        fetches.inc(result="ok")
+        fetches.inc(result="ok")
+        fetches.inc(result="empty")
+
+        text = registry.render()
+
+        assert "# TYPE fetch_total counter" in text
+        assert 'fetch_total{result="ok"} 2' in text
+        assert 'fetch_total{result="empty"} 1' in text
+
+    def test_counter_rejects_wrong_labels(self, registry):
+        """Missing or unknown labels are an error, not a new series."""
+        fetches = registry.counter("fetch_total", "Fetches", ["result"])
+        with pytest.raises(ValueError):
+            fetches.inc()
+        with pytest.raises(ValueError):
+            fetches.inc(result="ok", extra="x")
+
+    def test_gauge_keeps_last_value(self, registry):
+        """Gauges report the latest value."""
+        companies = registry.gauge("companies", "Companies")
+        companies.set(10)
+        companies.set(12)
+        assert "companies 12\n" in registry.render()
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        """Buckets count observations at or below their bound, plus sum and count."""
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 2.0):
+            latency.observe(value)
+
+        text = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert "latency_seconds_sum 2.55" in text
+        assert "latency_seconds_count 3" in text
+
+    def test_label_values_escaped(self, registry):
+        """Quotes in label values do not break the format."""
+        registry.counter("errors_total", "Errors", ["message"]).inc(message='say "hi"')
+        assert 'errors_total{message="say \\"hi\\""} 1' in registry.render()
+
+    def test_registering_twice_returns_same_metric(self, registry):
+        """Re-registering a name (e.g. on module reload) reuses the metric."""
+        first = registry.counter("pushes_total", "Pushes")
+        assert registry.counter("pushes_total", "Pushes") is first
+        with pytest.raises(ValueError):
+            registry.gauge("pushes_total", "Pushes")
+
+
+class TestObserve:
+    """Tests for the observe decorator."""
+
+    def test_counts_outcome_and_latency(self, registry):
+        """Each call is timed and counted by the outcome of its result."""
+        latency = registry.histogram("fetch_seconds", "Latency")
+        fetches = registry.counter("fetch_total", "Fetches", ["result"])
+        last_ok = registry.gauge("fetch_last_success", "Last success")
+
+        @observe(latency, fetches, lambda prices: "ok" if prices else "empty", on_success=last_ok)
+        def fetch(prices):
+            return prices
+
+        fetch({"Steel": 1})
+        fetch({})
+
+        assert fetches.value(result="ok") == 1
+        assert fetches.value(result="empty") == 1
+        assert latency.count() == 2
+        assert last_ok.value() is not None
+
+    def test_exception_counted_as_error(self, registry):
+        """A raising call is counted as an error and re-raised."""
+        latency = registry.histogram("push_seconds", "Latency")
+        pushes = registry.counter("push_total", "Pushes", ["result"])
+
+        @observe(latency, pushes, lambda ok: "ok")
+        def push():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            push()
+        assert pushes.value(result="error") == 1
+
+
+class TestExport:
+    """Tests for the textfile writer and the /metrics server."""
+
+    def test_write_textfile(self, registry, tmp_path):
+        """The textfile holds the rendered registry and no temporary files remain."""
+        registry.gauge("companies", "Companies").set(3)
+        path = tmp_path / "metrics" / "gt_guild.prom"
+
+        write_textfile(path, registry)
+
+        assert path.read_text() == registry.render()
+        assert [p.name for p in path.parent.iterdir()] == ["gt_guild.prom"]
+
+    def test_metrics_endpoint(self, registry):
+        """GET /metrics serves the registry; other paths are 404."""
+        registry.gauge("companies", "Companies").set(3)
+        server = make_metrics_server(0, registry=registry)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{url}/metrics") as response:
+                assert response.headers["Content-Type"].startswith("text/plain")
+                assert "companies 3" in response.read().decode()
+            with pytest.raises(urllib.error.HTTPError):
+                urllib.request.urlopen(f"{url}/other")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestRunGit:
+    """Tests for git subprocess metrics."""
+
+    def test_timeout_recorded_and_raised(self, monkeypatch, tmp_path):
+        """A git call that times out is counted as a timeout."""
+        def slow_run(*args, **kwargs):
+            raise subprocess.TimeoutExpired(args[0], kwargs.get("timeout"))
+        monkeypatch.setattr(subprocess, "run", slow_run)
+        before = GIT_COMMANDS.value(command="pull", result="timeout")
+
+        with pytest.raises(subprocess.TimeoutExpired):
+            data_manager.run_git(["pull"], cwd=tmp_path, timeout=1)
+
+        assert GIT_COMMANDS.value(command="pull", result="timeout") == before + 1
+
+    def test_nonzero_exit_counted_as_failed(self, monkeypatch, tmp_path):
+        """A non-zero exit is returned to the caller and counted as failed."""
+        monkeypatch.setattr(subprocess, "run",
+                            lambda *args, **kwargs: subprocess.CompletedProcess(args[0], 1, b"", b"nope"))
+        before = GIT_COMMANDS.value(command="commit", result="failed")
+
+        result = data_manager.run_git(["commit", "-m", "x"], cwd=tmp_path, timeout=1)
+
+        assert result.returncode == 1
+        assert GIT_COMMANDS.value(command="commit", result="failed") == before + 1
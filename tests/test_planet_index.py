@@ -0,0 +1,133 @@
+"""Tests for the planet spatial index and supplier lookups."""
+import numpy as np
+import pytest
+from gt_guild_app.business.planet_index import (
+    compile_planet_index,
+    load_planet_index,
+    nearest_planets,
+    best_planets,
+    nearest_suppliers,
+    delivery_options
+)
+
+
+MATERIALS = [{"id": 1, "name": "Ore"}, {"id": 2, "name": "Silica"}]
+
+GALAXY = {"pxToLY": 10, "hexSize": 100}
+
+
+def planet(name, x, y, **abundance):
+    """A gamedata planet at (x, y) yielding material=abundance."""
+    ids = {"Ore": 1, "Silica": 2}
+    return {"name": name, "x": x, "y": y, "tier": 1,
+            "mats": [{"id": ids[material], "ab": ab} for material, ab in abundance.items()]}
+
+
+SYSTEMS = [
+    {"name": "Vega", "planets": [planet("Vega 1", 50, 50, Ore=20), planet("Vega 2", 60, 50),
+                                 planet("Vega 10", 90, 90, Silica=5)]},
+    {"name": "Empty", "planets": None},
+    {"name": "Rigel", "planets": [planet("Rigel 1", 250, 50, Ore=90, Silica=40), planet("Rigel 2", 260, 60)]},
+    {"name": "Far", "planets": [planet("Far 1", 950, 450, Ore=90)]},
+]
+
+
+@pytest.fixture
+def index():
+    """Index of the small galaxy above."""
+    return compile_planet_index(SYSTEMS, MATERIALS, GALAXY)
+
+
+class TestCompilePlanetIndex:
+    """Tests for compile_planet_index function."""
+
+    def test_planets_and_grid(self, index):
+        """Every planet is indexed and bucketed into exactly one cell."""
+        assert len(index.names) == 6
+        assert (index.columns, index.rows) == (10, 5)
+        assert sorted(index.cell_order.tolist()) == list(range(6))
+        assert index.cell_start[-1] == 6
+
+    def test_materials_ranked_by_abundance(self, index):
+        """Planets yielding a material are kept best first."""
+        assert best_planets(index, "Ore") == [("Rigel 1", 90), ("Far 1", 90), ("Vega 1", 20)]
+        assert best_planets(index, "Ore", limit=1) == [("Rigel 1", 90)]
+        assert best_planets(index, "Unobtainium") == []
+
+    def test_catalog_loads(self):
+        """The shipped gamedata indexes every planet."""
+        index = load_planet_index()
+        assert index is not None
+        assert len(index.names) == 2052
+        assert index.px_to_ly == 45
+
+
+class TestNearestPlanets:
+    """Tests for grid nearest-neighbour queries."""
+
+    def test_closest_first_in_light_years(self, index):
+        """Neighbours are ordered by distance, converted with pxToLY."""
+        nearest = nearest_planets(index, "Vega 1", limit=3)
+        assert [name for name, _ in nearest] == ["Vega 2", "Vega 10", "Rigel 1"]
+        assert nearest[0][1] == pytest.approx(1.0)
+
+    def test_searches_beyond_empty_cells(self, index):
+        """A lone planet finds neighbours many cells away."""
+        assert nearest_planets(index, "Far 1", limit=1)[0][0] == "Rigel 2"
+
+    def test_unknown_location(self, index):
+        """Unknown planets have no neighbours."""
+        assert nearest_planets(index, "Nowhere 1") == []
+
+    def test_matches_brute_force_on_catalog(self):
+        """Grid search agrees with checking every planet."""
+        index = load_planet_index()
+        for position in range(0, len(index.names), 97):
+            distances = np.hypot(index.x - index.x[position], index.y - index.y[position])
+            distances[position] = np.inf
+            expected = [index.names[p] for p in np.lexsort((np.arange(len(distances)), distances))[:8]]
+            assert [name for name, _ in nearest_planets(index, index.names[position], 8)] == expected
+
+
+class TestSuppliers:
+    """Tests for supplier ranking by proximity."""
+
+    def test_nearest_suppliers(self, index):
+        """Only planets yielding the material, closest first."""
+        suppliers = nearest_suppliers(index, "Ore", "Vega 2", limit=2)
+        assert [(name, abundance) for name, _, abundance in suppliers] == [("Vega 1", 20), ("Rigel 1", 90)]
+        assert nearest_suppliers(index, "Ore", "Nowhere 1") == []
+        assert nearest_suppliers(index, "Unobtainium", "Vega 2") == []
+
+    def test_location_yielding_material(self, index):
+        """A delivery planet that yields the material is its own closest supplier."""
+        suppliers = nearest_suppliers(index, "Ore", "Far 1", limit=3)
+        assert [name for name, _, _ in suppliers] == ["Far 1", "Rigel 1", "Vega 1"]
+        assert suppliers[0][1] == 0
+
+    def test_suppliers_match_brute_force_on_catalog(self):
+        """Grid search over a material's planets agrees with checking all of them."""
+        index = load_planet_index()
+        material = max(index.material_planets, key=lambda name: len(index.material_planets[name][0]))
+        positions, abundance = index.material_planets[material]
+        for target in range(0, len(index.names), 131):
+            distances = np.hypot(index.x[positions] - index.x[target], index.y[positions] - index.y[target])
+            order = np.lexsort((positions, -abundance, distances))[:5]
+            expected = [(index.names[positions[i]], int(abundance[i])) for i in order]
+            suppliers = nearest_suppliers(index, material, index.names[target])
+            assert [(name, ab) for name, _, ab in suppliers] == expected
+
+    def test_delivery_options_by_system(self, index):
+        """Without a location, planets are grouped by system in number order."""
+        assert delivery_options(index, ["Vega 10", "Rigel 1", "Vega 2"]) == ["Rigel 1", "Vega 2", "Vega 10"]
+
+    def test_delivery_options_near_location(self, index):
+        """With a location, the closest planets come first and the rest by system."""
+        options = delivery_options(index, ["Far 1", "Custom Base", "Rigel 1", "Vega 1"], near="Vega 2")
+        assert options == ["Vega 1", "Rigel 1", "Far 1", "Custom Base"]
+
+    def test_delivery_options_nearby_limit(self, index):
+        """The location itself leads, then only the nearby closest planets before the rest."""
+        planets = ["Far 1", "Rigel 2", "Rigel 1", "Vega 10", "Vega 2", "Vega 1"]
+        options = delivery_options(index, planets, near="Vega 2", nearby=2)
+        assert options == ["Vega 2", "Vega 1", "Vega 10", "Far 1", "Rigel 1", "Rigel 2"]
@@ -6,7 +6,9 @@ from gt_guild_app.business.price_calculator import (
     apply_price_bounds,
     smart_round_price,
     update_live_prices,
-    calculate_all_guildees_prices
+    calculate_all_guildees_prices,
+    compile_pricing_rules,
+    round_prices
 )
 
 
@@ -178,3 +180,69 @@ class TestCalculateAllGuildeesPrices:
         
         # 100 * 0.5 = 50, but max is 60, so should be 50
         assert result.loc[0, 'Guildees Pay:'] == 50.0
+    
+    def test_fixed_discount_takes_precedence(self):
+        """Fixed discount wins over percentage discount and is not rounded"""
+        goods_df = pd.DataFrame({
+            'Live EXC Price': [1003, 1003],
+            'Guild % Discount': [10, 10],
+            'Guild Fixed Discount': [7, 0],
+            'Guild Max': [0, 0],
+            'Guild Min': [0, 0]
+        })
+        
+        result = calculate_all_guildees_prices(goods_df)
+        
+        assert result.loc[0, 'Guildees Pay:'] == 996.0
+        # 1003 * 0.9 = 902.7, rounds up to 910
+        assert result.loc[1, 'Guildees Pay:'] == 910.0
+
+
+class TestPricingRules:
+    """Tests for declarative pricing rules."""
+    
+    def test_default_tiers_match_guildees_pay(self):
+        """Default rules round up per tier"""
+        prices = round_prices([34.4, 99.2, 432.1, 4321.0, 60000.0], compile_pricing_rules())
+        assert list(prices) == [34.5, 100.0, 440.0, 4350.0, 60000.0]
+    
+    def test_tier_boundary_uses_next_tier(self):
+        """A price equal to a boundary belongs to the next tier"""
+        rules = compile_pricing_rules({"rounding": {"mode": "ceil", "tiers": [
+            {"below": 100, "step": 1}, {"below": None, "step": 50}
+        ]}})
+        assert list(round_prices([99.5, 100.0, 101.0], rules)) == [100.0, 100.0, 150.0]
+    
+    def test_percent_precedence(self):
+        """Rules can make the percentage discount win over the fixed one"""
+        rules = compile_pricing_rules({"discount_precedence": ["percent", "fixed"]})
+        goods_df = pd.DataFrame({
+            'Live EXC Price': [100, 100],
+            'Guild % Discount': [10, 0],
+            'Guild Fixed Discount': [30, 30]
+        })
+        
+        result = calculate_all_guildees_prices(goods_df, rules)
+        
+        assert result.loc[0, 'Guildees Pay:'] == 90.0
+        assert result.loc[1, 'Guildees Pay:'] == 70.0
+    
+    def test_max_bound_precedence(self):
+        """Rules can make the max bound win when both bounds apply"""
+        rules = compile_pricing_rules({"bounds_precedence": ["max", "min"]})
+        assert apply_price_bounds(100, 200, 50, rules) == 50
+        assert apply_price_bounds(100, 200, 50) == 200
+    
+    def test_smart_preset(self):
+        """Preset names can be used instead of an inline table"""
+        rules = compile_pricing_rules({"rounding": "smart"})
+        assert calculate_guildees_pay(678.3, 0, rules) == 680
+    
+    def test_invalid_rules(self):
+        """Malformed rule tables are rejected"""
+        with pytest.raises(ValueError):
+            compile_pricing_rules({"rounding": "unknown"})
+        with pytest.raises(ValueError):
+            compile_pricing_rules({"rounding": {"tiers": [{"below": 100, "step": 1}]}})
+        with pytest.raises(ValueError):
+            compile_pricing_rules({"discount_precedence": ["loyalty"]})
@@ -0,0 +1,164 @@
+"""Tests for per-rerun timing spans."""
+import io
+import pstats
+import threading
+from gt_guild_app.core.profiling import (
+    span,
+    timed,
+    trace_rerun,
+    current_trace,
+    background_spans,
+    summarize_spans
+)
+from gt_guild_app.core import profiling
+
+
+class TestSpans:
+    """Tests for span recording inside and outside a traced rerun."""
+
+    def test_nested_spans_record_depth(self):
+        """Spans inside another span are one level deeper."""
+        with trace_rerun() as trace:
+            with span("outer"):
+                with span("inner"):
+                    pass
+            with span("sibling"):
+                pass
+
+        depths = {item["name"]: item["depth"] for item in trace.spans}
+        assert depths == {"outer": 0, "inner": 1, "sibling": 0}
+        assert trace.duration is not None
+        assert all(item["duration"] >= 0 for item in trace.spans)
+
+    def test_span_recorded_when_block_raises(self):
+        """An exception still closes the span and the trace."""
+        try:
+            with trace_rerun() as trace:
+                with span("failing"):
+                    raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        assert [item["name"] for item in trace.spans] == ["failing"]
+        assert trace.duration is not None
+        assert current_trace() is None
+
+    def test_timed_decorator_uses_function_name(self):
+        """@timed() names the span after the function and keeps its result."""
+        @timed()
+        def compute():
+            return 42
+
+        with trace_rerun() as trace:
+            assert compute() == 42
+
+        assert [item["name"] for item in trace.spans] == ["compute"]
+
+    def test_spans_on_other_threads_go_to_background(self):
+        """A worker thread's spans are not attributed to the rerun."""
+        def work():
+            with span("background push"):
+                pass
+
+        with trace_rerun() as trace:
+            thread = threading.Thread(target=work, name="push-worker")
+            thread.start()
+            thread.join()
+
+        assert trace.spans == []
+        recorded = [item for item in background_spans() if item["name"] == "background push"]
+        assert recorded and recorded[-1]["thread"] == "push-worker"
+
+
+class TestTraceRerun:
+    """Tests for optional cProfile capture."""
+
+    def test_no_profile_by_default(self):
+        """Without profile=True nothing is captured."""
+        with trace_rerun() as trace:
+            pass
+        assert trace.profile is None
+        assert trace.profile_summary is None
+
+    def test_profile_is_loadable_by_pstats(self, tmp_path):
+        """Captured bytes load as a .prof file and name the profiled function."""
+        def busy():
+            return sum(range(1000))
+
+        with trace_rerun(profile=True) as trace:
+            busy()
+
+        profile_file = tmp_path / "rerun.prof"
+        profile_file.write_bytes(trace.profile)
+        stats = pstats.Stats(str(profile_file), stream=io.StringIO())
+        assert any(key[2] == "busy" for key in stats.stats)
+        assert "busy" in trace.profile_summary
+
+    def test_concurrent_captures_do_not_fail(self):
+        """A second capture while one is running skips profiling and says so."""
+        started, release = threading.Event(), threading.Event()
+        traces = {}
+
+        def first_rerun():
+            with trace_rerun(profile=True) as trace:
+                started.set()
+                release.wait(5)
+            traces["first"] = trace
+
+        worker = threading.Thread(target=first_rerun)
+        worker.start()
+        started.wait(5)
+        try:
+            with trace_rerun(profile=True) as second:
+                pass
+        finally:
+            release.set()
+            worker.join(5)
+
+        assert second.profiler_busy and second.profile is None
+        assert not traces["first"].profiler_busy and traces["first"].profile is not None
+        with trace_rerun(profile=True) as third:
+            pass
+        assert third.profile is not None
+
+    def test_other_profiling_tool_active(self, monkeypatch):
+        """When enabling cProfile fails the rerun still runs, unprofiled."""
+        class ActiveTool:
+            def enable(self):
+                raise ValueError("Another profiling tool is already active")
+
+        monkeypatch.setattr(profiling.cProfile, "Profile", ActiveTool)
+        with trace_rerun(profile=True) as trace:
+            pass
+
+        assert trace.profiler_busy and trace.profile is None
+        monkeypatch.undo()
+        with trace_rerun(profile=True) as retry:
+            pass
+        assert retry.profile is not None
+
+
+class TestSummarizeSpans:
+    """Tests for per-span totals across reruns."""
+
+    def test_totals_sorted_by_time(self):
+        """Calls, totals and per-rerun means are aggregated by span name."""
+        with trace_rerun() as first:
+            pass
+        with trace_rerun() as second:
+            pass
+        first.spans = [{"name": "stats", "start": 0, "duration": 0.1, "depth": 0},
+                       {"name": "filters", "start": 0.1, "duration": 0.5, "depth": 0}]
+        second.spans = [{"name": "filters", "start": 0, "duration": 0.3, "depth": 0}]
+
+        summary = summarize_spans([first, second])
+
+        assert [entry["name"] for entry in summary] == ["filters", "stats"]
+        assert summary[0]["calls"] == 2
+        assert summary[0]["total"] == 0.8
+        assert summary[0]["max"] == 0.5
+        assert summary[0]["mean_per_rerun"] == 0.4
+
+    def test_empty(self):
+        """No traces give no rows."""
+        assert summarize_spans([]) == []
@@ -0,0 +1,111 @@
+"""Tests for the background GitHub push worker."""
+import threading
+import time
+import pytest
+from gt_guild_app.integrations.push_worker import (
+    PushWorker,
+    PUSH_IDLE,
+    PUSH_PENDING,
+    PUSH_FAILED
+)
+
+
+class FakePush:
+    """Push function that records calls and can be told to fail."""
+
+    def __init__(self, result=(True, "ok")):
+        self.calls = 0
+        self.result = result
+        self.called = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.called.set()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def make_worker():
+    """Create started workers with short timings and stop them afterwards."""
+    workers = []
+
+    def make(push_fn, debounce=0.05, max_delay=1.0, min_interval=0.0):
+        worker = PushWorker(push_fn, debounce=debounce, max_delay=max_delay, min_interval=min_interval).start()
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.stop(timeout=2)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TestPushWorker:
+    """Tests for PushWorker class."""
+
+    def test_idle_without_changes(self, make_worker):
+        """Nothing is pushed until something changes"""
+        push = FakePush()
+        worker = make_worker(push)
+        time.sleep(0.15)
+        assert push.calls == 0
+        assert worker.status()['state'] == PUSH_IDLE
+
+    def test_burst_of_changes_pushed_once(self, make_worker):
+        """Changes arriving within the debounce window become one push"""
+        push = FakePush()
+        worker = make_worker(push, debounce=0.1)
+        for _ in range(5):
+            worker.notify_changed()
+            time.sleep(0.01)
+
+        assert worker.status()['state'] == PUSH_PENDING
+        assert wait_for(lambda: worker.status()['pushes'] == 1)
+        time.sleep(0.2)
+        assert push.calls == 1
+        assert worker.status()['last_push'] is not None
+
+    def test_min_interval_limits_pushes(self, make_worker):
+        """A change right after a push waits for the rate limit"""
+        push = FakePush()
+        worker = make_worker(push, debounce=0.0, min_interval=0.5)
+        worker.notify_changed()
+        assert wait_for(lambda: push.calls == 1)
+
+        worker.notify_changed()
+        time.sleep(0.2)
+        assert push.calls == 1
+        assert wait_for(lambda: push.calls == 2)
+
+    def test_request_push_skips_rate_limit(self, make_worker):
+        """Manual pushes go out immediately"""
+        push = FakePush()
+        worker = make_worker(push, debounce=10, min_interval=10)
+        worker.request_push()
+        assert push.called.wait(1)
+
+    def test_failure_reported_and_retried(self, make_worker):
+        """A failed push shows up in the status and is tried again"""
+        push = FakePush(result=RuntimeError("boom"))
+        worker = make_worker(push, debounce=0.0, min_interval=0.3)
+        worker.notify_changed()
+        assert wait_for(lambda: worker.status()['failures'] == 1)
+
+        status = worker.status()
+        assert status['last_result'] is False
+        assert 'boom' in status['message']
+        assert status['state'] == PUSH_FAILED
+
+        push.result = (True, "ok")
+        assert wait_for(lambda: worker.status()['pushes'] == 1)
+        assert worker.status()['state'] == PUSH_IDLE
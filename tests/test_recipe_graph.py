@@ -0,0 +1,151 @@
+"""Tests for the recipe graph and production cost rollup."""
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from gt_guild_app.business.recipe_graph import (
+    compile_recipe_graph,
+    load_recipe_graph,
+    make_or_buy,
+    price_vector,
+    production_costs,
+    add_production_cost,
+    PRODUCTION_COST_COLUMN
+)
+
+
+MATERIALS = [
+    {"id": 1, "name": "Ore", "weight": 1},
+    {"id": 2, "name": "Coal", "weight": 1},
+    {"id": 3, "name": "Plate", "weight": 2},
+    {"id": 4, "name": "Frame", "weight": 5},
+    {"id": 5, "name": "Crystal", "weight": 1},
+]
+
+
+def recipe(recipe_id, output, amount, inputs):
+    """A catalog recipe producing amount of output from (id, amount) inputs."""
+    return {"id": recipe_id, "timeMinutes": 60, "output": {"id": output, "a": amount},
+            "inputs": [{"id": mid, "a": a} for mid, a in inputs]}
+
+
+RECIPES = [
+    recipe(1, 1, 10, []),                       # Ore is mined
+    recipe(2, 2, 10, []),                       # Coal is mined
+    recipe(3, 3, 2, [(1, 4), (2, 2)]),          # 2 Plate from 4 Ore + 2 Coal
+    recipe(4, 4, 1, [(3, 3)]),                  # Frame from 3 Plate
+    recipe(5, 4, 1, [(5, 1)]),                  # ...or from 1 Crystal
+]
+
+
+def prices(**current):
+    """Price data shaped like fetch_material_prices() from name=price."""
+    return {name: {"currentPrice": price, "avgPrice": price} for name, price in current.items()}
+
+
+@pytest.fixture
+def graph():
+    """The small catalog above, compiled."""
+    return compile_recipe_graph(MATERIALS, RECIPES)
+
+
+class TestCompileRecipeGraph:
+    """Tests for compile_recipe_graph function."""
+
+    def test_padded_inputs(self, graph):
+        """Inputs are padded to the widest recipe with a zero-amount slot."""
+        assert graph.input_index.shape == (5, 2)
+        assert graph.input_amount[3].tolist() == [3, 0]
+        assert graph.input_index[3, 1] == len(MATERIALS)
+
+    def test_unknown_materials_skipped(self):
+        """Recipes using materials missing from the catalog are dropped."""
+        graph = compile_recipe_graph(MATERIALS, RECIPES + [recipe(9, 4, 1, [(99, 1)])])
+        assert 9 not in graph.recipe_ids
+
+    def test_catalog_loads(self):
+        """The shipped gamedata compiles with every recipe."""
+        graph = load_recipe_graph()
+        assert graph is not None
+        assert len(graph.recipe_ids) == 197
+        assert len(graph.material_names) == 182
+
+
+class TestMakeOrBuy:
+    """Tests for make_or_buy function."""
+
+    def test_rolls_up_through_levels(self, graph):
+        """Plate costs its inputs; Frame is costed from Plate made or bought."""
+        unit, make, _ = make_or_buy(graph, price_vector(graph, prices(Ore=10, Coal=5, Plate=100)))
+
+        plate = (4 * 10 + 2 * 5) / 2
+        assert make[2] == plate
+        assert unit[2] == plate                 # making beats buying at 100
+        assert make[3] == 3 * plate             # Crystal has no price
+
+    def test_buys_when_cheaper(self, graph):
+        """An input cheaper on the exchange is bought rather than made."""
+        _, make, _ = make_or_buy(graph, price_vector(graph, prices(Ore=10, Coal=5, Plate=4)))
+        assert make[3] == 3 * 4
+
+    def test_cheapest_recipe_chosen(self, graph):
+        """With two recipes the cheaper one sets the cost and is reported."""
+        _, make, best = make_or_buy(graph, price_vector(graph, prices(Ore=10, Coal=5, Crystal=30)))
+        assert make[3] == 30
+        assert graph.recipe_ids[best[3]] == 5
+
+    def test_raw_materials_have_no_production_cost(self, graph):
+        """Extraction recipes are not a make option."""
+        unit, make, best = make_or_buy(graph, price_vector(graph, prices(Ore=10)))
+        assert math.isinf(make[0]) and best[0] == -1
+        assert unit[0] == 10
+
+    def test_unpriced_input_is_not_costed(self, graph):
+        """A recipe with an unpriced, unmakeable input has no cost."""
+        _, make, _ = make_or_buy(graph, price_vector(graph, prices(Ore=10)))
+        assert math.isinf(make[2])
+
+    def test_cycle_settles(self):
+        """A cycle between two materials converges to the cheaper path."""
+        materials = [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}, {"id": 3, "name": "C"}]
+        recipes = [recipe(1, 1, 2, [(2, 1), (3, 1)]),   # 2 A from B + C
+                   recipe(2, 2, 1, [(1, 1)])]           # B from A
+        graph = compile_recipe_graph(materials, recipes)
+
+        unit, make, _ = make_or_buy(graph, price_vector(graph, prices(A=100, B=100, C=10)))
+
+        # A = (B + C) / 2 and B = A settle at A = B = C
+        assert unit[0] == pytest.approx(10, rel=1e-6)
+        assert make[1] == pytest.approx(10, rel=1e-6)
+
+
+class TestProductionCosts:
+    """Tests for memoized production costs and the table column."""
+
+    def test_costs_by_name(self, graph):
+        """Only materials with a costable recipe are returned."""
+        costs = production_costs(prices(Ore=10, Coal=5), graph)
+        assert costs == {"Plate": 25.0, "Frame": 75.0}
+
+    def test_memoized_per_snapshot(self, graph, monkeypatch):
+        """Equal prices reuse the rollup instead of sweeping again."""
+        from gt_guild_app.business import recipe_graph
+        first = production_costs(prices(Ore=11, Coal=5), graph)
+        monkeypatch.setattr(recipe_graph, "make_or_buy", lambda *args: pytest.fail("not memoized"))
+        assert production_costs(prices(Ore=11, Coal=5), graph) is first
+
+    def test_empty_prices(self, graph):
+        """No prices give no costs."""
+        assert production_costs({}, graph) == {}
+
+    def test_column_after_live_price(self):
+        """The column sits after Live EXC Price, blank where unknown."""
+        goods = pd.DataFrame({"Produced Goods": ["Plate", "Ore"], "Live EXC Price": [30, 10],
+                              "Live AVG Price": [31, 11]})
+
+        result = add_production_cost(goods, {"Plate": 24.6})
+
+        assert list(result.columns) == ["Produced Goods", "Live EXC Price", PRODUCTION_COST_COLUMN,
+                                        "Live AVG Price"]
+        assert result[PRODUCTION_COST_COLUMN].iloc[0] == 25
+        assert np.isnan(result[PRODUCTION_COST_COLUMN].iloc[1])
@@ -0,0 +1,134 @@
+"""Tests for session state memory accounting."""
+import sys
+import numpy as np
+import pandas as pd
+from gt_guild_app.core.session_memory import (
+    SessionMemoryTracker,
+    deep_sizeof,
+    key_family,
+    measure_state
+)
+
+
+class TestDeepSizeof:
+    """Tests for deep_sizeof function."""
+
+    def test_includes_nested_values(self):
+        """A container's size includes what it holds."""
+        goods = [{'Produced Goods': f'Material {i}', 'Guild Max': i * 1000} for i in range(100)]
+        assert deep_sizeof(goods) > sys.getsizeof(goods) + 100 * sys.getsizeof({})
+
+    def test_shared_objects_counted_once(self):
+        """The same object referenced twice adds nothing the second time."""
+        payload = 'x' * 100_000
+        assert deep_sizeof([payload, payload]) < 2 * sys.getsizeof(payload)
+
+    def test_dataframe_and_array_buffers(self):
+        """DataFrames and arrays report their data buffers."""
+        array = np.zeros(100_000)
+        assert deep_sizeof(array) >= array.nbytes
+        frame = pd.DataFrame({'price': array})
+        assert deep_sizeof(frame) >= array.nbytes
+
+    def test_objects_walked_through_attributes(self):
+        """Plain objects count what their attributes hold."""
+        class Holder:
+            def __init__(self):
+                self.data = 'y' * 50_000
+
+        assert deep_sizeof(Holder()) > 50_000
+
+
+class TestMeasureState:
+    """Tests for per-key measurement of a session state."""
+
+    def test_dynamic_keys_grouped(self):
+        """Per-company keys are reported as one family."""
+        state = {'companies': [{'name': 'Acme'}], 'show_add_good_Acme': True, 'show_add_good_Beta': False}
+
+        sizes = measure_state(state)
+
+        assert set(sizes) == {'companies', 'show_add_good_*'}
+        assert sizes['show_add_good_*']['keys'] == 2
+
+    def test_key_family(self):
+        """Only known per-company prefixes are grouped."""
+        assert key_family('tz_Acme Co') == 'tz_*'
+        assert key_family('show_add_company') == 'show_add_company'
+
+    def test_shared_value_counted_under_first_key(self):
+        """A list held by two keys is not counted twice."""
+        companies = [{'name': f'Company {i}'} for i in range(100)]
+        sizes = measure_state({'companies': companies, 'player_companies': companies})
+        assert sizes['player_companies']['bytes'] < sizes['companies']['bytes']
+
+
+class TestSessionMemoryTracker:
+    """Tests for growth tracking across samples."""
+
+    def sample(self, **families):
+        """measure_state-style sizes from name=(bytes, keys)."""
+        return {name: {'bytes': size, 'keys': keys} for name, (size, keys) in families.items()}
+
+    def test_totals_across_sessions(self):
+        """Totals add up each session's latest sample."""
+        tracker = SessionMemoryTracker()
+        tracker.record('a', self.sample(companies=(1000, 1)))
+        tracker.record('a', self.sample(companies=(2000, 1)))
+        tracker.record('b', self.sample(companies=(500, 1), tz_=(10, 3)))
+
+        totals = tracker.totals()
+
+        assert totals['companies'] == {'bytes': 2500, 'keys': 2, 'sessions': 2}
+        assert totals['tz_']['sessions'] == 1
+
+    def test_forget_closed_sessions(self):
+        """Forgotten sessions no longer count."""
+        tracker = SessionMemoryTracker()
+        tracker.record('a', self.sample(companies=(1000, 1)))
+        tracker.forget(['a'])
+        assert tracker.totals() == {}
+        assert tracker.last_sample_at('a') is None
+
+    def test_steady_growth_flagged(self):
+        """A key that keeps growing is flagged; a stable one is not."""
+        tracker = SessionMemoryTracker()
+        for step in range(6):
+            tracker.record('a', self.sample(profile_traces=(step * 100_000, 1), companies=(5_000_000, 1)))
+
+        flagged = tracker.growing_keys('a', min_bytes=250_000)
+
+        assert [entry['key'] for entry in flagged] == ['profile_traces']
+        assert flagged[0]['growth_bytes'] == 500_000
+
+    def test_growth_with_drops_not_flagged(self):
+        """A key that shrinks along the way is not a leak."""
+        tracker = SessionMemoryTracker()
+        for size in (100_000, 400_000, 200_000, 500_000, 300_000, 900_000):
+            tracker.record('a', self.sample(companies=(size, 1)))
+        assert tracker.growing_keys('a', min_bytes=1) == []
+
+    def test_growing_key_count_flagged(self):
+        """A family that keeps gaining keys is flagged even when each key is small."""
+        tracker = SessionMemoryTracker()
+        for step in range(5):
+            tracker.record('a', self.sample(**{'show_add_good_*': (step * 100, step * 40)}))
+
+        flagged = tracker.growing_keys('a', min_keys=50)
+
+        assert [entry['key'] for entry in flagged] == ['show_add_good_*']
+        assert (flagged[0]['first_keys'], flagged[0]['last_keys']) == (0, 160)
+
+    def test_too_few_samples_not_flagged(self):
+        """Growth over fewer samples than required is not judged yet."""
+        tracker = SessionMemoryTracker()
+        for step in range(3):
+            tracker.record('a', self.sample(companies=(step * 1_000_000, 1)))
+        assert tracker.growing_keys('a') == []
+
+    def test_history_is_bounded(self):
+        """Only the most recent samples are kept."""
+        tracker = SessionMemoryTracker(history=3)
+        for step in range(10):
+            tracker.record('a', self.sample(companies=(step, 1)), at=float(step))
+        assert [sample['at'] for sample in tracker.history_of('a')] == [7.0, 8.0, 9.0]
@@ -0,0 +1,87 @@
+"""Tests for the distance matrix and landed cost of guild offers."""
+import numpy as np
+import pandas as pd
+import pytest
+from gt_guild_app.business.planet_index import compile_planet_index
+from gt_guild_app.business.shipping import (
+    compute_distance_matrix,
+    load_distance_matrix,
+    distances,
+    shipping_costs,
+    landed_costs,
+    LANDED_COLUMNS
+)
+
+
+SYSTEMS = [{"name": "Line", "planets": [
+    {"name": "A 1", "x": 0, "y": 0},
+    {"name": "B 1", "x": 30, "y": 40},
+    {"name": "C 1", "x": 300, "y": 400},
+]}]
+
+
+@pytest.fixture
+def matrix():
+    """Distances between A, B and C at 10 px per light year."""
+    index = compile_planet_index(SYSTEMS, [], {"pxToLY": 10, "hexSize": 100})
+    return compute_distance_matrix(index, ["C 1", "A 1", "B 1", "Nowhere 1"])
+
+
+def listings(*offers):
+    """Listings from (company, planet, guildees pay) offers."""
+    return pd.DataFrame(offers, columns=["Company", "Planet Produced", "Guildees Pay:"])
+
+
+class TestDistanceMatrix:
+    """Tests for the precomputed distance matrix."""
+
+    def test_light_years_float32(self, matrix):
+        """Known planets only, symmetric, in light years as float32."""
+        assert matrix.planets == ("A 1", "B 1", "C 1")
+        assert matrix.light_years.dtype == np.float32
+        assert matrix.light_years[0, 1] == pytest.approx(5)
+        assert matrix.light_years[2, 0] == pytest.approx(50)
+        assert np.array_equal(matrix.light_years, matrix.light_years.T)
+
+    def test_distances_between_sets(self, matrix):
+        """Unknown origins or destinations are NaN."""
+        result = distances(matrix, ["A 1", "Exchange Station"], ["B 1", "C 1"])
+        assert result.shape == (2, 2)
+        assert result[0].tolist() == pytest.approx([5, 50])
+        assert np.isnan(result[1]).all()
+
+    def test_cached_until_planets_change(self):
+        """The catalog's matrix is reused for the same set of planets."""
+        first = load_distance_matrix(["Seashell 1", "Marble 2"])
+        assert first.light_years.shape == (2, 2)
+        assert load_distance_matrix({"Marble 2", "Seashell 1"}) is first
+        assert load_distance_matrix(["Seashell 1"]) is not first
+
+
+class TestShippingCosts:
+    """Tests for shipping and landed cost estimates."""
+
+    def test_weight_times_distance_times_rate(self, matrix):
+        """Each listing's cost to each destination scales with its weight."""
+        costs = shipping_costs(matrix, ["A 1", "B 1"], ["B 1", "C 1"], [2, 0.5], rate=3)
+        assert np.allclose(costs, [[30, 300], [0, 67.5]])
+
+    def test_sorted_by_landed_cost(self, matrix):
+        """A cheaper but distant offer loses to a nearby one."""
+        offers = listings(("Far", "C 1", 100), ("Near", "B 1", 130), ("Here", "A 1", 200))
+
+        ranked = landed_costs(offers, matrix, "A 1", weight=1, rate=2)
+
+        assert ranked["Company"].tolist() == ["Near", "Far", "Here"]
+        assert ranked["Landed Cost"].tolist() == pytest.approx([140, 200, 200])
+
+    def test_unlocated_offers_last(self, matrix):
+        """Offers from unknown planets have no landed cost and come last."""
+        offers = listings(("Exchange", "Exchange Station", 1), ("Near", "B 1", 130))
+        ranked = landed_costs(offers, matrix, "A 1", weight=1)
+        assert ranked["Company"].tolist() == ["Near", "Exchange"]
+        assert np.isnan(ranked["Landed Cost"].iloc[1])
+
+    def test_no_listings(self, matrix):
+        """No listings give an empty table with the usual columns."""
+        assert list(landed_costs(listings(), matrix, "A 1", weight=1).columns) == LANDED_COLUMNS
@@ -0,0 +1,154 @@
+"""Tests for the contract sourcing optimizer."""
+import numpy as np
+import pandas as pd
+import pytest
+from gt_guild_app.business import sourcing
+from gt_guild_app.business.planet_index import compile_planet_index
+from gt_guild_app.business.recipe_graph import compile_recipe_graph
+from gt_guild_app.business.shipping import compute_distance_matrix
+from gt_guild_app.business.sourcing import (
+    propose_sourcing,
+    apply_sourcing,
+    remaining_needs,
+    SOLVER_GREEDY,
+    SOLVER_LP,
+    LINE_COLUMNS
+)
+
+
+def contract(daily_amount, *lines):
+    """A contracts.json entry from (company, location, amount) lines."""
+    return {"daily_amount": daily_amount,
+            "lines": [{"Company": company, "Delivery Location": location, "Fulfilled Amount": amount}
+                      for company, location, amount in lines]}
+
+
+def listings(*offers):
+    """Priced guild listings from (company, good, planet, guildees pay) offers."""
+    return pd.DataFrame(offers, columns=["Company", "Produced Goods", "Planet Produced", "Guildees Pay:"])
+
+
+SYSTEMS = [{"name": "Line", "planets": [
+    {"name": "A 1", "x": 0, "y": 0},
+    {"name": "B 1", "x": 0, "y": 100},
+    {"name": "C 1", "x": 0, "y": 1000},
+]}]
+
+
+@pytest.fixture
+def matrix():
+    """Distances of 10 LY from A to B and 100 LY from A to C."""
+    index = compile_planet_index(SYSTEMS, [], {"pxToLY": 10, "hexSize": 100})
+    return compute_distance_matrix(index, ["A 1", "B 1", "C 1"])
+
+
+@pytest.fixture
+def graph():
+    """Catalog where Ore weighs 1 and Gold weighs nothing."""
+    return compile_recipe_graph([{"id": 1, "name": "Ore", "weight": 1}, {"id": 2, "name": "Gold", "weight": 0}], [])
+
+
+class TestRemainingNeeds:
+    """Tests for remaining need extraction."""
+
+    def test_fulfilled_amounts_subtracted(self):
+        """Fulfilled lines reduce the need; met contracts are dropped."""
+        needs = remaining_needs({"Acme": {"Ore": contract(100, ("X", "A 1", 30)), "Gold": contract(5, ("X", "", 5))}})
+        assert needs.good == ["Ore"]
+        assert needs.need.tolist() == [70]
+        assert needs.location == ["A 1"]
+
+
+class TestProposeSourcing:
+    """Tests for the greedy and LP solvers."""
+
+    def test_cheapest_offer_by_price(self):
+        """Without a location the cheapest priced offer gets the whole need."""
+        contracts = {"Acme": {"Ore": contract(50)}}
+        offers = listings(("Dear", "Ore", "A 1", 20), ("Cheap", "Ore", "B 1", 10), ("Free", "Ore", "A 1", 0))
+
+        plan = propose_sourcing(contracts, offers)
+
+        assert plan.lines[["Company", "Fulfilled Amount"]].values.tolist() == [["Cheap", 50]]
+        assert plan.total_cost == 500
+        assert plan.unsourced.empty
+
+    def test_landed_cost_beats_price(self, matrix, graph):
+        """A cheap offer far away loses to a nearby one once shipping is added."""
+        contracts = {"Acme": {"Ore": contract(10, ("", "A 1", 0))}}
+        offers = listings(("Far", "Ore", "C 1", 10), ("Near", "Ore", "B 1", 15))
+
+        plan = propose_sourcing(contracts, offers, matrix, graph, rate=1)
+
+        line = plan.lines.iloc[0]
+        assert (line["Company"], line["Shipping"], line["Landed Cost"]) == ("Near", 10, 25)
+        assert list(plan.lines.columns) == LINE_COLUMNS
+
+    def test_unlocated_offers_skipped_for_located_contracts(self, matrix, graph):
+        """Offers with no known planet can't be costed to a delivery location."""
+        contracts = {"Acme": {"Ore": contract(10, ("", "A 1", 0))}, "Beta": {"Ore": contract(5)}}
+        offers = listings(("Station", "Ore", "Exchange Station", 1), ("Near", "Ore", "B 1", 15))
+
+        plan = propose_sourcing(contracts, offers, matrix, graph)
+
+        assert dict(zip(plan.lines["Contract Company"], plan.lines["Company"])) == {"Acme": "Near", "Beta": "Station"}
+
+    def test_own_listings_and_unknown_goods(self):
+        """A company isn't proposed to itself; goods nobody sells stay unsourced."""
+        contracts = {"Acme": {"Ore": contract(10), "Gold": contract(3)}}
+        plan = propose_sourcing(contracts, listings(("Acme", "Ore", "A 1", 5)))
+        assert plan.lines.empty
+        assert plan.unsourced.set_index("Good")["Remaining"].to_dict() == {"Ore": 10, "Gold": 3}
+
+    def test_capacity_shared_cheapest_first(self):
+        """A limited offer is split and the rest goes to the next cheapest."""
+        contracts = {"Acme": {"Ore": contract(60)}, "Beta": {"Ore": contract(30)}}
+        offers = listings(("Cheap", "Ore", "A 1", 10), ("Mid", "Ore", "A 1", 12), ("Dear", "Ore", "A 1", 20))
+
+        plan = propose_sourcing(contracts, offers, capacities=[50, 20, np.inf])
+
+        amounts = plan.lines.groupby("Company")["Fulfilled Amount"].sum().to_dict()
+        assert amounts == {"Cheap": 50, "Mid": 20, "Dear": 20}
+        assert plan.total_cost == 50 * 10 + 20 * 12 + 20 * 20
+
+    def test_short_supply_reported(self):
+        """Need beyond every offer's capacity is left unsourced."""
+        plan = propose_sourcing({"Acme": {"Ore": contract(40)}}, listings(("Cheap", "Ore", "A 1", 10)),
+                                capacities=[25])
+        assert plan.unsourced["Remaining"].tolist() == [15]
+
+    def test_lp_falls_back_to_greedy(self, monkeypatch):
+        """Without scipy the LP mode returns the greedy plan."""
+        monkeypatch.setattr(sourcing, "linprog", None)
+        contracts = {"Acme": {"Ore": contract(10)}}
+        offers = listings(("Cheap", "Ore", "A 1", 10))
+
+        plan = propose_sourcing(contracts, offers, solver=SOLVER_LP)
+
+        assert plan.solver == SOLVER_GREEDY
+        assert plan.total_cost == 100
+
+    def test_lp_matches_greedy(self):
+        """With scipy the LP finds the same minimum cost."""
+        pytest.importorskip("scipy")
+        contracts = {"Acme": {"Ore": contract(60)}, "Beta": {"Ore": contract(30)}}
+        offers = listings(("Cheap", "Ore", "A 1", 10), ("Mid", "Ore", "A 1", 12), ("Dear", "Ore", "A 1", 20))
+
+        plan = propose_sourcing(contracts, offers, capacities=[50, 20, np.inf], solver=SOLVER_LP)
+
+        assert plan.solver == SOLVER_LP
+        assert plan.total_cost == pytest.approx(50 * 10 + 20 * 12 + 20 * 20)
+
+
+class TestApplySourcing:
+    """Tests for adding proposed lines to contracts."""
+
+    def test_lines_appended(self):
+        """Proposed lines become contract lines with whole amounts."""
+        contracts = {"Acme": {"Ore": contract(50, ("Old", "A 1", 10))}}
+        plan = propose_sourcing(contracts, listings(("Cheap", "Ore", "B 1", 10)))
+
+        assert apply_sourcing(contracts, plan.lines) == 1
+        assert contracts["Acme"]["Ore"]["lines"][-1] == {"Company": "Cheap", "Delivery Location": "A 1",
+                                                         "Fulfilled Amount": 40}
+        assert propose_sourcing(contracts, listings(("Cheap", "Ore", "B 1", 10))).lines.empty
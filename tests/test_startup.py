@@ -0,0 +1,100 @@
+"""Tests for the concurrent startup tasks."""
+import threading
+import time
+import pytest
+from gt_guild_app.integrations import startup
+from gt_guild_app.integrations.startup import (
+    start_startup_tasks,
+    ready_results,
+    pending_tasks,
+    run_shared
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_shared():
+    """Forget shared tasks between tests."""
+    startup._shared.clear()
+    yield
+    startup._shared.clear()
+
+
+def wait_done(futures):
+    for future in futures.values():
+        future.result(timeout=2)
+
+
+class TestStartStartupTasks:
+    """Tests for start_startup_tasks function."""
+
+    def test_tasks_run_concurrently(self):
+        """Three slow tasks take about as long as one"""
+        barrier = threading.Barrier(3, timeout=2)
+        tasks = {name: (lambda name=name: barrier.wait() is not None and name)
+                 for name in ('pull', 'sheets', 'prices')}
+
+        start = time.monotonic()
+        futures = start_startup_tasks(tasks)
+        wait_done(futures)
+
+        assert time.monotonic() - start < 1
+        assert {name: f.result() for name, f in futures.items()} == {'pull': 'pull', 'sheets': 'sheets', 'prices': 'prices'}
+
+    def test_failed_task_yields_none(self):
+        """Exceptions are logged and turned into a None result"""
+        futures = start_startup_tasks({'prices': lambda: 1 / 0})
+        assert futures['prices'].result(timeout=2) is None
+
+    def test_pull_shared_between_sessions(self):
+        """A second session joins the running pull instead of starting another"""
+        calls = []
+        release = threading.Event()
+
+        def pull():
+            calls.append(1)
+            release.wait(2)
+            return True
+
+        first = start_startup_tasks({'pull': pull})
+        second = start_startup_tasks({'pull': pull})
+        release.set()
+        wait_done(first)
+
+        assert first['pull'] is second['pull']
+        assert calls == [1]
+
+    def test_stale_shared_task_rerun(self):
+        """A shared task older than max_age runs again"""
+        calls = []
+        run_shared('pull', lambda: calls.append(1), max_age=0).result(timeout=2)
+        run_shared('pull', lambda: calls.append(1), max_age=0).result(timeout=2)
+        assert calls == [1, 1]
+
+
+class TestReadyResults:
+    """Tests for ready_results and pending_tasks functions."""
+
+    def test_sheets_wait_for_pull(self):
+        """The sheet import is applied only after the pull"""
+        release = threading.Event()
+        futures = start_startup_tasks({
+            'pull': lambda: release.wait(2),
+            'sheets': lambda: 'sheet data',
+            'prices': lambda: 'prices'
+        })
+        futures['sheets'].result(timeout=2)
+        futures['prices'].result(timeout=2)
+
+        assert ready_results(futures, set()) == [('prices', 'prices')]
+        assert pending_tasks(futures, {'prices'}) == ['pull', 'sheets']
+
+        release.set()
+        wait_done(futures)
+        assert ready_results(futures, {'prices'}) == [('pull', True), ('sheets', 'sheet data')]
+
+    def test_applied_tasks_skipped(self):
+        """Results already applied are not returned again"""
+        futures = start_startup_tasks({'prices': lambda: 1})
+        wait_done(futures)
+        assert ready_results(futures, {'prices'}) == []
+        assert pending_tasks(futures, {'prices'}) == []